@@ -0,0 +1,287 @@
+"""
+Offline Corpus Analyzer
+Analyzes large poem corpora outside Flask across worker processes
+
+Input files:
+    *.jsonl  one poem per line: {"id": "...", "verses": ["...", "..."]}
+    *.txt    poems separated by blank lines, one verse per line
+
+Results are appended to a JSONL file in input order. With --stats, no
+per-poem results are kept: every poem is folded into running meter,
+broken-verse and zihaf counts, and the output is one JSON summary, so
+memory stays flat whatever the corpus size. Progress (and, with --stats,
+the counts) is checkpointed, so re-running the same command after an
+interruption resumes where the previous run stopped. A run with other
+--detection or --diacritics options refuses to resume from it.
+
+Usage:
+    python analyze_corpus.py diwan.jsonl other.txt -o results.jsonl --workers 8
+    python analyze_corpus.py diwan.jsonl -o stats.json --stats --detection prefix
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+from collections import defaultdict, deque
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Tuple
+
+
+# Analysis options of a run without --detection or --diacritics
+DEFAULT_OPTIONS = {'detection': 'full', 'diacritics': 'keep'}
+
+# Service instance and analysis options owned by each worker process
+_worker_service = None
+_worker_options: Dict[str, str] = {}
+
+
+def _init_worker(warmup: bool, options: Dict[str, str] = None) -> None:
+    """Build a PyArudService and its processor in the worker process"""
+    global _worker_service, _worker_options
+    from app.services.cache import ResultCache
+    from app.services.processor_pool import ProcessorProvider
+    from app.services.pyarud_service import PyArudService
+
+    # Every poem is analysed once, so only the per-verse memo is useful
+    _worker_service = PyArudService(
+        cache=ResultCache(max_size=0),
+        processors=ProcessorProvider(warmup=warmup)
+    )
+    _worker_service.processors.preload()
+    _worker_options = options or {}
+
+
+def _check_verses(verses: List[str]) -> None:
+    for idx, verse in enumerate(verses, 1):
+        if not _worker_service.validate_verse(verse):
+            raise ValueError(f'Invalid verse at line {idx}. Please provide valid Arabic text.')
+
+
+def _analyze(item: Tuple[str, List[str]]) -> Tuple[Dict[str, Any], float]:
+    """Analyze one poem, returning its output record and elapsed seconds"""
+    poem_id, verses = item
+    started = time.perf_counter()
+    try:
+        _check_verses(verses)
+        record = {'id': poem_id, 'success': True, 'data': _worker_service.analyze_poem(verses, **_worker_options)}
+    except ValueError as err:
+        record = {'id': poem_id, 'success': False, 'error': str(err)}
+    except Exception as err:
+        record = {'id': poem_id, 'success': False, 'error': f'Analysis failed: {str(err)}'}
+    return record, time.perf_counter() - started
+
+
+def _poem_stats(item: Tuple[str, List[str]]):
+    """Analyze one poem into a CorpusStats, counting it as failed if it cannot be analysed"""
+    from app.services.corpus_stats import CorpusStats
+    _, verses = item
+    try:
+        _check_verses(verses)
+        return _worker_service.poem_stats(verses, **_worker_options)
+    except Exception:
+        stats = CorpusStats()
+        stats.add_failure()
+        return stats
+
+
+def imap_bounded(pool, func: Callable, items: Iterable, chunksize: int, window: int) -> Iterator:
+    """
+    Ordered pool.imap that reads items lazily
+
+    Pool.imap queues the whole input up front; here at most window chunks
+    are in flight, so a corpus is never held in memory.
+    """
+    items = iter(items)
+    pending = deque()
+    for chunk in iter(lambda: list(islice(items, chunksize)), []):
+        pending.append(pool.map_async(func, chunk, chunksize=len(chunk)))
+        if len(pending) >= window:
+            yield from pending.popleft().get()
+    while pending:
+        yield from pending.popleft().get()
+
+
+def read_poems(paths: List[str]) -> Iterator[Tuple[str, List[str]]]:
+    """Yield (poem id, verses) from every input file, lazily and in order"""
+    for path in paths:
+        name = os.path.basename(path)
+        with open(path, encoding='utf-8') as handle:
+            if path.endswith('.jsonl'):
+                for line_no, line in enumerate(handle, 1):
+                    if not line.strip():
+                        continue
+                    poem = json.loads(line)
+                    yield str(poem.get('id', f'{name}:{line_no}')), poem.get('verses', [])
+            else:
+                verses, start = [], 1
+                for line_no, line in enumerate(handle, 1):
+                    if line.strip():
+                        if not verses:
+                            start = line_no
+                        verses.append(line.strip())
+                    elif verses:
+                        yield f'{name}:{start}', verses
+                        verses = []
+                if verses:
+                    yield f'{name}:{start}', verses
+
+
+def load_checkpoint(path: str, inputs: List[str], mode: str = 'records',
+                    options: Dict[str, str] = None) -> Dict[str, Any]:
+    """
+    Return the saved progress for these inputs and output mode, or a fresh one
+
+    Raises:
+        SystemExit: If the saved progress was made with other analysis options,
+            so resuming would mix results of both
+    """
+    options = dict(DEFAULT_OPTIONS, **(options or {}))
+    if os.path.exists(path):
+        with open(path, encoding='utf-8') as handle:
+            checkpoint = json.load(handle)
+        if checkpoint.get('inputs') == inputs and checkpoint.get('mode', 'records') == mode:
+            saved = dict(DEFAULT_OPTIONS, **checkpoint.get('options', {}))
+            if saved != options and checkpoint.get('completed'):
+                flags = ' '.join(f'--{name} {value}' for name, value in saved.items())
+                raise SystemExit(
+                    f"Checkpoint {path} was made with {flags}; re-run with them, "
+                    f"or delete the checkpoint to start over"
+                )
+            checkpoint['options'] = options
+            return checkpoint
+        print(f"Checkpoint {path} belongs to a different run, starting over", file=sys.stderr)
+    return {'inputs': inputs, 'mode': mode, 'options': options, 'completed': 0, 'output_bytes': 0}
+
+
+def save_checkpoint(path: str, checkpoint: Dict[str, Any]) -> None:
+    """Write the checkpoint atomically"""
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as handle:
+        json.dump(checkpoint, handle)
+    os.replace(tmp_path, path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Analyze a poem corpus with PyArud')
+    parser.add_argument('inputs', nargs='+', help='.jsonl or .txt input files')
+    parser.add_argument('-o', '--output', required=True, help='JSONL file to write results to')
+    parser.add_argument('--checkpoint', help='checkpoint file (default: <output>.checkpoint)')
+    parser.add_argument('--checkpoint-every', type=int, default=100, help='poems between checkpoints')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='worker processes')
+    parser.add_argument('--chunksize', type=int, default=4, help='poems sent to a worker at a time')
+    parser.add_argument('--start-method', default='spawn', help='multiprocessing start method')
+    parser.add_argument('--warmup', action='store_true', help='warm the processor in each worker (~3.5 s)')
+    parser.add_argument('--detection', choices=('full', 'prefix'), default='full', help='meter detection mode')
+    parser.add_argument('--diacritics', choices=('keep', 'strip'), default='keep', help='diacritics mode')
+    parser.add_argument('--stats', action='store_true',
+                        help='write corpus statistics to the output instead of per-poem results')
+    args = parser.parse_args(argv)
+
+    inputs = [os.path.abspath(path) for path in args.inputs]
+    checkpoint_path = args.checkpoint or args.output + '.checkpoint'
+    options = {'detection': args.detection, 'diacritics': args.diacritics}
+    checkpoint = load_checkpoint(checkpoint_path, inputs, 'stats' if args.stats else 'records', options)
+    skip = checkpoint['completed']
+    if args.stats:
+        return _run_stats(args, inputs, checkpoint_path, checkpoint, options)
+
+    # Drop anything written after the last checkpoint
+    mode = 'r+' if skip and os.path.exists(args.output) else 'w'
+    output = open(args.output, mode, encoding='utf-8')
+    output.seek(checkpoint['output_bytes'] if mode == 'r+' else 0)
+    output.truncate()
+    if skip:
+        print(f"Resuming after {skip} poems")
+
+    poems = read_poems(inputs)
+    for _ in range(skip):
+        next(poems, None)
+
+    meter_counts = defaultdict(int)
+    meter_seconds = defaultdict(float)
+    processed = failed = 0
+    started = time.perf_counter()
+
+    context = multiprocessing.get_context(args.start_method)
+    with context.Pool(args.workers, initializer=_init_worker, initargs=(args.warmup, options)) as pool:
+        try:
+            for record, elapsed in imap_bounded(pool, _analyze, poems, args.chunksize, 2 * args.workers):
+                output.write(json.dumps(record, ensure_ascii=False) + '\n')
+                processed += 1
+                meter = record['data']['bahr'] if record['success'] else 'failed'
+                failed += not record['success']
+                meter_counts[meter] += 1
+                meter_seconds[meter] += elapsed
+
+                if processed % args.checkpoint_every == 0:
+                    output.flush()
+                    checkpoint['completed'] = skip + processed
+                    checkpoint['output_bytes'] = output.tell()
+                    save_checkpoint(checkpoint_path, checkpoint)
+        finally:
+            output.flush()
+            checkpoint['completed'] = skip + processed
+            checkpoint['output_bytes'] = output.tell()
+            save_checkpoint(checkpoint_path, checkpoint)
+            output.close()
+
+    wall = time.perf_counter() - started
+    print(f"\n{'='*60}")
+    print(f"  Analyzed {processed} poems in {wall:.1f}s "
+          f"({processed / wall if wall else 0:.2f} poems/sec, {failed} failed)")
+    print(f"{'='*60}")
+    print(f"  {'meter'.ljust(14)} {'poems':>7} {'total s':>10} {'mean ms':>10}")
+    for meter in sorted(meter_counts, key=meter_counts.get, reverse=True):
+        count = meter_counts[meter]
+        print(f"  {meter.ljust(14)} {count:>7} {meter_seconds[meter]:>10.1f} "
+              f"{meter_seconds[meter] / count * 1000:>10.1f}")
+    print()
+
+
+def _run_stats(args, inputs: List[str], checkpoint_path: str, checkpoint: Dict[str, Any],
+               options: Dict[str, str]) -> None:
+    """Fold the corpus into CorpusStats and write its summary as JSON"""
+    from app.services.corpus_stats import CorpusStats
+    skip = checkpoint['completed']
+    stats = CorpusStats.from_dict(checkpoint.get('stats', {}))
+    if skip:
+        print(f"Resuming after {skip} poems")
+
+    poems = read_poems(inputs)
+    for _ in range(skip):
+        next(poems, None)
+
+    processed = 0
+    started = time.perf_counter()
+    context = multiprocessing.get_context(args.start_method)
+    with context.Pool(args.workers, initializer=_init_worker, initargs=(args.warmup, options)) as pool:
+        try:
+            for poem_stats in imap_bounded(pool, _poem_stats, poems, args.chunksize, 2 * args.workers):
+                stats.merge(poem_stats)
+                processed += 1
+                if processed % args.checkpoint_every == 0:
+                    checkpoint.update(completed=skip + processed, stats=stats.to_dict())
+                    save_checkpoint(checkpoint_path, checkpoint)
+        finally:
+            checkpoint.update(completed=skip + processed, stats=stats.to_dict())
+            save_checkpoint(checkpoint_path, checkpoint)
+
+    summary = stats.summary()
+    with open(args.output, 'w', encoding='utf-8') as handle:
+        json.dump(summary, handle, ensure_ascii=False, indent=2)
+
+    wall = time.perf_counter() - started
+    print(f"\n{'='*60}")
+    print(f"  {summary['poems']} poems, {summary['verses']} verses in {wall:.1f}s "
+          f"({summary['failed_poems']} failed, {summary['broken_rate']:.1%} of scanned verses broken)")
+    print(f"{'='*60}")
+    print(f"  {'meter'.ljust(14)} {'poems':>7} {'verses':>8} {'share':>7} {'broken':>8}")
+    for meter, row in summary['meters'].items():
+        print(f"  {meter.ljust(14)} {row['poems']:>7} {row['verses']:>8} {row['share']:>7.1%} {row['broken_rate']:>8.1%}")
+    print()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,9 +1,35 @@
 """
 Flask Application Factory
 """
-from flask import Flask
+import time
+from flask import Flask, Request, current_app, g, request
 from flask_cors import CORS
+from app.admission import Overloaded
 from app.config import Config
+from app.serialization import CODECS, NegotiatingJSONProvider
+
+
+class APIRequest(Request):
+    """Request class honouring per-endpoint body size limits and binary bodies"""
+
+    @property
+    def max_content_length(self):
+        if not current_app:
+            return None
+        limits = current_app.config.get('ENDPOINT_MAX_CONTENT_LENGTH') or {}
+        return limits.get(self.endpoint, current_app.config['MAX_CONTENT_LENGTH'])
+
+    def get_json(self, force=False, silent=False, cache=True):
+        """Decode MessagePack/CBOR bodies as well as JSON, so request.json works for all"""
+        codec = CODECS.get(self.mimetype)
+        if codec is None:
+            return super().get_json(force=force, silent=silent, cache=cache)
+        try:
+            return codec.loads(self.get_data(cache=cache))
+        except Exception as err:
+            if silent:
+                return None
+            return self.on_json_loading_failed(err)
 
 
 def create_app(config_class=Config):
@@ -18,19 +44,56 @@ def create_app(config_class=Config):
     """
     app = Flask(__name__)
     app.config.from_object(config_class)
+    app.request_class = APIRequest
+    
+    # Content negotiation: JSON by default, MessagePack/CBOR on request
+    app.json = NegotiatingJSONProvider(app)
+    app.json.ensure_ascii = app.config.get('JSON_AS_ASCII', True)
     
     # Enable CORS for frontend communication
     CORS(app, resources={
         r"/api/*": {
             "origins": app.config['CORS_ORIGINS'],
-            "methods": ["GET", "POST", "OPTIONS"],
-            "allow_headers": ["Content-Type"]
+            "methods": ["GET", "POST", "PATCH", "DELETE", "OPTIONS"],
+            "allow_headers": ["Content-Type", "X-Request-ID"],
+            "expose_headers": ["X-Request-ID"]
         }
     })
     
     # Register blueprints
-    from app.routes import api_bp
+    from app.routes import (
+        api_bp, pyarud_service, batch_analyzer, job_manager, session_store, analysis_supervisor, admission
+    )
     app.register_blueprint(api_bp, url_prefix='/api')
+    pyarud_service.init_app(app)
+    batch_analyzer.init_app(app)
+    job_manager.init_app(app)
+    session_store.init_app(app)
+    analysis_supervisor.init_app(app)
+    admission.init_app(app)
+
+    # Request metrics and traces
+    from app import metrics
+    from app.tracing import tracer
+    tracer.init_app(app)
+    
+    @app.before_request
+    def start_request_timer():
+        g.request_started = time.perf_counter()
+    
+    @app.after_request
+    def record_request_metrics(response):
+        route = request.endpoint or 'unmatched'
+        started = g.pop('request_started', None)
+        if started is not None:
+            metrics.REQUEST_SECONDS.observe(time.perf_counter() - started, route=route)
+        if response.status_code >= 400:
+            metrics.ERRORS_TOTAL.inc(route=route, status=response.status_code)
+        return response
+    
+    @app.route('/metrics')
+    def prometheus_metrics():
+        return app.response_class(metrics.REGISTRY.render(), content_type=metrics.CONTENT_TYPE)
     
     # Health check endpoint
     @app.route('/health')
@@ -42,6 +105,17 @@ def create_app(config_class=Config):
     def not_found(error):
         return {'error': 'Resource not found'}, 404
     
+    @app.errorhandler(413)
+    def payload_too_large(error):
+        return {'error': 'Request body too large'}, 413
+    
+    @app.errorhandler(Overloaded)
+    def overloaded(error):
+        # 429: this client is over its rate; 503: the server is saturated
+        status = 429 if error.reason == 'rate_limited' else 503
+        message = 'Too many requests' if status == 429 else 'Server busy, try again later'
+        return {'error': message}, status, {'Retry-After': str(error.retry_after)}
+
     @app.errorhandler(500)
     def internal_error(error):
         return {'error': 'Internal server error'}, 500
@@ -0,0 +1,223 @@
+"""
+Admission control for the analysis routes
+A concurrency limit with a bounded wait queue, and per-client token buckets
+"""
+import math
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional
+
+from app import tracing
+
+
+class Overloaded(Exception):
+    """The request was not admitted; retry_after is a hint in seconds"""
+
+    def __init__(self, reason: str, retry_after: float):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = max(1, math.ceil(retry_after))
+
+
+class ConcurrencyLimiter:
+    """
+    At most max_active analyses at once, at most max_queue waiting for a turn
+
+    A request arriving when the queue is full, or still waiting after
+    queue_timeout, is rejected at once instead of slowing everyone down.
+    Retry-After is estimated from the average time a slot is held.
+    """
+
+    def __init__(self, max_active: int = 0, max_queue: int = 0, queue_timeout: float = 10.0):
+        """
+        Args:
+            max_active: Concurrent analyses (0 = unlimited)
+            max_queue: Requests allowed to wait for a slot
+            queue_timeout: Seconds a request may wait before it is rejected
+        """
+        self.max_active = max_active
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.active = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.rejected = {'queue_full': 0, 'queue_timeout': 0}
+        self._hold_seconds = 1.0  # moving average of slot hold time
+        self._cond = threading.Condition()
+
+    @contextmanager
+    def slot(self) -> Iterator[None]:
+        """Hold a slot for the with-block; raises Overloaded when none is available"""
+        started = self.acquire()
+        try:
+            yield
+        finally:
+            self.release(started)
+
+    def acquire(self) -> float:
+        """Take a slot, waiting in the queue if needed; returns the start time for release"""
+        queued = None
+        with self._cond:
+            if self.max_active and self.active >= self.max_active:
+                if self.waiting >= self.max_queue:
+                    self.rejected['queue_full'] += 1
+                    raise Overloaded('queue_full', self._retry_after())
+                queued = time.perf_counter()
+                self.waiting += 1
+                deadline = time.monotonic() + self.queue_timeout
+                try:
+                    while self.active >= self.max_active:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            self.rejected['queue_timeout'] += 1
+                            raise Overloaded('queue_timeout', self._retry_after())
+                        self._cond.wait(remaining)
+                finally:
+                    self.waiting -= 1
+            self.active += 1
+            self.admitted += 1
+        if queued is not None:
+            tracing.record_span('admission_queue', queued, time.perf_counter() - queued)
+        return time.monotonic()
+
+    def release(self, started: float) -> None:
+        """Give a slot back and wake one waiting request"""
+        with self._cond:
+            self.active -= 1
+            self._hold_seconds += 0.2 * (time.monotonic() - started - self._hold_seconds)
+            self._cond.notify()
+
+    def _retry_after(self) -> float:
+        # Time for the queue ahead to drain through the active slots
+        return self._hold_seconds * (self.waiting + 1) / max(self.max_active, 1)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'max_active': self.max_active,
+            'max_queue': self.max_queue,
+            'active': self.active,
+            'queue_depth': self.waiting,
+            'admitted': self.admitted,
+            'rejected': dict(self.rejected)
+        }
+
+
+class RateLimiter:
+    """
+    Token bucket per client: rate tokens per second, bursts of up to burst
+
+    Buckets of the least recently seen clients are dropped past max_clients;
+    a dropped client starts again with a full bucket.
+    """
+
+    def __init__(self, rate: float = 0, burst: int = 1, max_clients: int = 10000):
+        """
+        Args:
+            rate: Tokens added per second (0 = no rate limit)
+            burst: Bucket capacity
+            max_clients: Buckets kept in memory
+        """
+        self.rate = rate
+        self.burst = max(burst, 1)
+        self.max_clients = max_clients
+        self.rejected = 0
+        self._buckets: 'OrderedDict[str, list]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def check(self, client: str, cost: float = 1) -> float:
+        """
+        Take cost tokens from the client's bucket
+
+        Returns:
+            0 if the request may proceed, otherwise seconds until it could
+        """
+        if not self.rate:
+            return 0.0
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.pop(client, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - updated) * self.rate)
+            wait = 0.0
+            if tokens >= cost:
+                tokens -= cost
+            else:
+                wait = (cost - tokens) / self.rate
+                self.rejected += 1
+            self._buckets[client] = [tokens, now]
+            if len(self._buckets) > self.max_clients:
+                self._buckets.popitem(last=False)
+        return wait
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'rate_per_second': self.rate,
+            'burst': self.burst,
+            'clients': len(self._buckets),
+            'rejected': self.rejected
+        }
+
+
+class AdmissionController:
+    """Concurrency limiter and per-client rate limiter configured from the app"""
+
+    def __init__(self):
+        self.limiter = ConcurrencyLimiter()
+        self.rates = RateLimiter()
+        self.client_header: Optional[str] = None
+
+    def init_app(self, app) -> None:
+        """Configure the limits from the Flask application config"""
+        self.limiter = ConcurrencyLimiter(
+            max_active=app.config.get('ADMISSION_MAX_ACTIVE', 0),
+            max_queue=app.config.get('ADMISSION_MAX_QUEUE', 0),
+            queue_timeout=app.config.get('ADMISSION_QUEUE_TIMEOUT', 10.0)
+        )
+        self.rates = RateLimiter(
+            rate=app.config.get('RATE_LIMIT_PER_MINUTE', 0) / 60.0,
+            burst=app.config.get('RATE_LIMIT_BURST', 1)
+        )
+        self.client_header = app.config.get('ADMISSION_CLIENT_HEADER') or None
+
+    def client_id(self, request) -> str:
+        """
+        The client a request counts against
+
+        Behind a proxy this is the last address of client_header, the one
+        the nearest proxy added (earlier ones are set by the client).
+        """
+        if self.client_header:
+            forwarded = request.headers.get(self.client_header)
+            if forwarded:
+                return forwarded.split(',')[-1].strip()
+        return request.remote_addr or 'unknown'
+
+    def check_rate(self, request, cost: float = 1) -> None:
+        """Raise Overloaded('rate_limited') if the client is over its rate"""
+        wait = self.rates.check(self.client_id(request), cost)
+        if wait:
+            raise Overloaded('rate_limited', wait)
+
+    def slot(self):
+        """Context manager holding one analysis slot"""
+        return self.limiter.slot()
+
+    def acquire(self) -> Callable[[], None]:
+        """
+        Take a slot for a response that outlives the view (a stream)
+
+        Returns:
+            Function releasing the slot; calls after the first do nothing
+        """
+        started = self.limiter.acquire()
+        released = threading.Event()
+
+        def release():
+            if not released.is_set():
+                released.set()
+                self.limiter.release(started)
+        return release
+
+    def stats(self) -> Dict[str, Any]:
+        return {'concurrency': self.limiter.stats(), 'rate_limit': self.rates.stats()}
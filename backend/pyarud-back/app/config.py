@@ -24,6 +24,88 @@ class Config:
     
     # PyArud Settings
     MAX_VERSES_PER_REQUEST = int(os.environ.get('MAX_VERSES_PER_REQUEST', '50'))
+    VALIDATE_MAX_VERSES = int(os.environ.get('VALIDATE_MAX_VERSES', '1000'))  # /api/validate/batch
+
+    # Prefix Meter Detection Settings (detection="prefix")
+    METER_PREFIX_VERSES = int(os.environ.get('METER_PREFIX_VERSES', '5'))  # verses that vote on the meter
+    METER_PREFIX_CONFIDENCE = float(os.environ.get('METER_PREFIX_CONFIDENCE', '0.6'))  # vote share to lock it
+    METER_FAIL_SCORE = float(os.environ.get('METER_FAIL_SCORE', '0.6'))  # below this a later verse votes too
+
+    # Analysis Time Budgets (0 = no limit; checked before every pyarud call)
+    ANALYSIS_TIMEOUT = float(os.environ.get('ANALYSIS_TIMEOUT', '25'))  # /api/analyze, batches, sessions; below the client's 30 s
+    ANALYSIS_STREAM_TIMEOUT = float(os.environ.get('ANALYSIS_STREAM_TIMEOUT', '600'))  # /api/analyze/stream
+
+    # Admission Control (analysis, batch and session routes; limits are per process)
+    # Analyses run in the request's process and hold the GIL, so more than one at a time only interleaves them
+    ADMISSION_MAX_ACTIVE = int(os.environ.get('ADMISSION_MAX_ACTIVE', '1')) or os.cpu_count() or 1  # 0 = one per CPU
+    ADMISSION_MAX_QUEUE = int(os.environ.get('ADMISSION_MAX_QUEUE', '8'))  # requests waiting for a slot
+    ADMISSION_QUEUE_TIMEOUT = float(os.environ.get('ADMISSION_QUEUE_TIMEOUT', '10'))  # seconds, then 503
+    RATE_LIMIT_PER_MINUTE = float(os.environ.get('RATE_LIMIT_PER_MINUTE', '60'))  # per client, 0 = no limit
+    RATE_LIMIT_BURST = int(os.environ.get('RATE_LIMIT_BURST', '20'))
+    ADMISSION_CLIENT_HEADER = os.environ.get('ADMISSION_CLIENT_HEADER', '')  # e.g. X-Forwarded-For behind a proxy
+
+    # Request Tracing (JSON lines on stdout, logger "pyarud.trace")
+    TRACE_ENABLED = os.environ.get('TRACE_ENABLED', 'True').lower() == 'true'
+    TRACE_SAMPLE_RATE = float(os.environ.get('TRACE_SAMPLE_RATE', '0.01'))  # share of requests logged
+    TRACE_SLOW_MS = float(os.environ.get('TRACE_SLOW_MS', '2000'))  # always log slower requests, 0 = off
+
+    # Request Profiling (?profile=1 or X-Profile: 1 on /api/analyze)
+    PROFILING_ENABLED = os.environ.get('PROFILING_ENABLED', 'False').lower() == 'true'
+    PROFILING_TOKEN = os.environ.get('PROFILING_TOKEN', '')  # required in X-Profile-Token when set
+    PROFILING_DIR = os.environ.get('PROFILING_DIR', '')  # write .prof files here when set
+    PROFILING_TOP_FUNCTIONS = int(os.environ.get('PROFILING_TOP_FUNCTIONS', '25'))
+    PROFILING_SORT = os.environ.get('PROFILING_SORT', 'tottime')  # tottime | cumtime
+
+    # Analysis Cache Settings
+    ANALYSIS_CACHE_SIZE = int(os.environ.get('ANALYSIS_CACHE_SIZE', '256'))  # 0 disables the cache
+    ANALYSIS_CACHE_TTL = int(os.environ.get('ANALYSIS_CACHE_TTL', '3600'))  # seconds, 0 = no expiry
+    VERSE_CACHE_SIZE = int(os.environ.get('VERSE_CACHE_SIZE', '4096'))  # per-verse scans and meter votes
+    ANALYSIS_HTTP_MAX_AGE = int(os.environ.get('ANALYSIS_HTTP_MAX_AGE', '86400'))  # GET /api/analyze/<digest>
+
+    # Processor Lifecycle Settings
+    PROCESSOR_PRELOAD = os.environ.get('PROCESSOR_PRELOAD', 'True').lower() == 'true'  # build in create_app
+    # ...in a background thread, so create_app returns at once
+    PROCESSOR_PRELOAD_BACKGROUND = os.environ.get('PROCESSOR_PRELOAD_BACKGROUND', 'True').lower() == 'true'
+    # Scan a verse per meter (~3.5 s); off, since it does not make later scans faster (bench_startup)
+    PROCESSOR_WARMUP = os.environ.get('PROCESSOR_WARMUP', 'False').lower() == 'true'
+
+    # Batch Analysis Settings
+    BATCH_MAX_POEMS = int(os.environ.get('BATCH_MAX_POEMS', '100'))
+    BATCH_MAX_WORKERS = int(os.environ.get('BATCH_MAX_WORKERS', '0'))  # 0 = one per CPU
+    BATCH_START_METHOD = os.environ.get('BATCH_START_METHOD', 'spawn')
+    BATCH_MAX_CONTENT_LENGTH = int(os.environ.get('BATCH_MAX_CONTENT_LENGTH', str(1024 * 1024)))
+
+    # Background Job Settings
+    JOB_DB_PATH = os.environ.get('JOB_DB_PATH')  # defaults to <instance>/jobs.sqlite3
+    JOB_WORKERS = int(os.environ.get('JOB_WORKERS', '2'))
+    JOB_START_METHOD = os.environ.get('JOB_START_METHOD', 'spawn')
+    JOB_MAX_VERSES = int(os.environ.get('JOB_MAX_VERSES', '5000'))
+    JOB_MAX_CONTENT_LENGTH = int(os.environ.get('JOB_MAX_CONTENT_LENGTH', str(2 * 1024 * 1024)))
+    JOB_PAGE_SIZE = int(os.environ.get('JOB_PAGE_SIZE', '50'))
+    JOB_RETENTION_SECONDS = int(os.environ.get('JOB_RETENTION_SECONDS', str(7 * 24 * 3600)))  # 0 = forever
+
+    # Corpus Statistics Settings (/api/corpus/stats; poems are limited by JOB_MAX_VERSES)
+    CORPUS_STATS_MAX_CONTENT_LENGTH = int(os.environ.get('CORPUS_STATS_MAX_CONTENT_LENGTH', str(64 * 1024 * 1024)))
+    CORPUS_STATS_TIMEOUT = float(os.environ.get('CORPUS_STATS_TIMEOUT', '3600'))  # 0 = no limit
+
+    # Editing Session Settings (/api/sessions)
+    SESSION_CACHE_SIZE = int(os.environ.get('SESSION_CACHE_SIZE', '256'))  # live sessions per process
+    SESSION_TTL = int(os.environ.get('SESSION_TTL', '1800'))  # idle seconds before a session expires
+    SESSION_MAX_VERSES = int(os.environ.get('SESSION_MAX_VERSES', '200'))
+    SESSION_MAX_CONTENT_LENGTH = int(os.environ.get('SESSION_MAX_CONTENT_LENGTH', str(128 * 1024)))
+
+    # Meter Registry Settings
+    BAHR_CACHE_MAX_AGE = int(os.environ.get('BAHR_CACHE_MAX_AGE', '86400'))  # Cache-Control max-age, seconds
+
+    # Per-endpoint overrides of MAX_CONTENT_LENGTH
+    ENDPOINT_MAX_CONTENT_LENGTH = {
+        'api.analyze_batch': BATCH_MAX_CONTENT_LENGTH,
+        'api.create_job': JOB_MAX_CONTENT_LENGTH,
+        'api.corpus_stats': CORPUS_STATS_MAX_CONTENT_LENGTH,
+        'api.validate_verses_bulk': BATCH_MAX_CONTENT_LENGTH,
+        'api.create_session': SESSION_MAX_CONTENT_LENGTH,
+        'api.update_session': SESSION_MAX_CONTENT_LENGTH
+    }
 
 
 class DevelopmentConfig(Config):
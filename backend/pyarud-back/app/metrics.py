@@ -0,0 +1,228 @@
+"""
+Lightweight Prometheus-style metrics
+
+Metrics are plain in-process counters and histograms updated under a lock;
+nothing runs in the background, and rendering the text exposition format
+only happens when /metrics is scraped. Each server process keeps its own
+values, so scrape every gunicorn worker (or run a single worker) to see the
+full picture.
+"""
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Latency buckets in seconds: sub-millisecond stages up to multi-minute analyses
+LATENCY_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+    1, 2.5, 5, 10, 30, 60, 120, 300
+)
+VERSE_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 5000)
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = '') -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Monotonically increasing value per label set"""
+
+    kind = 'counter'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = tuple(str(labels.get(name, '')) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels: str) -> float:
+        key = tuple(str(labels.get(name, '')) for name in self.labelnames)
+        return self._values.get(key, 0)
+
+    def samples(self) -> Iterator[str]:
+        with self._lock:
+            values = list(self._values.items())
+        for key, value in values:
+            yield f'{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}'
+
+
+class Histogram:
+    """Cumulative bucketed distribution per label set"""
+
+    kind = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # label key -> [per-bucket counts (+Inf last), sum, count]
+        self._series: Dict[Tuple[str, ...], list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = tuple(str(labels.get(name, '')) for name in self.labelnames)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def count(self, **labels: str) -> int:
+        key = tuple(str(labels.get(name, '')) for name in self.labelnames)
+        series = self._series.get(key)
+        return series[2] if series else 0
+
+    def samples(self) -> Iterator[str]:
+        with self._lock:
+            series = [(key, list(counts), total, count) for key, (counts, total, count) in self._series.items()]
+        for key, counts, total, count in series:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += bucket_count
+                le = f'le="{_format_value(float(bound)) if bound != float("inf") else "+Inf"}"'
+                yield f'{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}'
+            yield f'{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(total)}'
+            yield f'{self.name}_count{_format_labels(self.labelnames, key)} {count}'
+
+
+class Registry:
+    """Collection of metrics plus callbacks sampled at scrape time"""
+
+    def __init__(self):
+        self._metrics: List = []
+        self._collectors: List[Callable[[], Iterable[Tuple[str, str, str, Dict[str, str], float]]]] = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def register_collector(self, collector: Callable) -> None:
+        """
+        Add a callback yielding (name, type, help, labels, value) tuples
+
+        Collectors expose state owned elsewhere (cache counters, queue
+        depths) without having to mirror it into metric objects.
+        """
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        """Return every metric in the Prometheus text exposition format"""
+        lines = []
+        for metric in self._metrics:
+            lines.append(f'# HELP {metric.name} {metric.documentation}')
+            lines.append(f'# TYPE {metric.name} {metric.kind}')
+            lines.extend(metric.samples())
+
+        # Group collected samples by name: a metric's samples must be contiguous
+        collected: Dict[str, list] = {}
+        for collector in self._collectors:
+            for name, kind, documentation, labels, value in collector():
+                entry = collected.setdefault(name, [f'# HELP {name} {documentation}', f'# TYPE {name} {kind}'])
+                entry.append(f'{name}{_format_labels(list(labels), list(labels.values()))} {_format_value(value)}')
+        for entry in collected.values():
+            lines.extend(entry)
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry()
+
+STAGE_SECONDS = REGISTRY.register(Histogram(
+    'pyarud_stage_seconds', 'Time spent in each analysis stage', ['stage']
+))
+REQUEST_SECONDS = REGISTRY.register(Histogram(
+    'pyarud_request_seconds', 'End-to-end latency of API requests', ['route']
+))
+REQUEST_VERSES = REGISTRY.register(Histogram(
+    'pyarud_request_verses', 'Verses submitted per analysis request', ['route'], buckets=VERSE_BUCKETS
+))
+METER_TOTAL = REGISTRY.register(Counter(
+    'pyarud_meter_total', 'Analysed poems per detected meter', ['meter']
+))
+ERRORS_TOTAL = REGISTRY.register(Counter(
+    'pyarud_errors_total', 'API responses with an error status by route', ['route', 'status']
+))
+
+
+# Called as listener(name, started, seconds) after every stage; started is a perf_counter() value
+_stage_listeners: List[Callable[[str, float, float], None]] = []
+
+
+def add_stage_listener(listener: Callable[[str, float, float], None]) -> None:
+    """Also report every stage timing to listener (request profiles and traces)"""
+    _stage_listeners.append(listener)
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Time the with-block into pyarud_stage_seconds{stage=name} and the stage listeners"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        _record_stage(name, started, time.perf_counter() - started)
+
+
+def _record_stage(name: str, started: float, seconds: float) -> None:
+    STAGE_SECONDS.observe(seconds, stage=name)
+    for listener in _stage_listeners:
+        listener(name, started, seconds)
+
+
+class StageTimer:
+    """
+    A stage run in several pieces, recorded once as a whole
+
+    For work interleaved with other work, like the scans of a streamed
+    analysis between the events it sends: the pieces timed with part() are
+    added up, and record() reports the total as one stage that started
+    with the first piece.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.started: Optional[float] = None
+        self.seconds = 0.0
+
+    @contextmanager
+    def part(self) -> Iterator[None]:
+        """Add the time of the with-block to the stage"""
+        started = time.perf_counter()
+        if self.started is None:
+            self.started = started
+        try:
+            yield
+        finally:
+            self.seconds += time.perf_counter() - started
+
+    def record(self) -> None:
+        """Report the stage, unless no piece of it ran"""
+        if self.started is not None:
+            _record_stage(self.name, self.started, self.seconds)
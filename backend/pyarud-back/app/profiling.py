@@ -0,0 +1,171 @@
+"""
+On-demand request profiling
+
+A profiled request runs under cProfile and collects the timings of every
+metrics.stage() it passes through. The report lists the stages and the
+functions where the time went, and the raw profile can be written to disk
+for offline tools (snakeviz, flameprof, gprof2dot). Nothing is recorded
+for requests that do not ask for it.
+"""
+import contextvars
+import cProfile
+import hmac
+import os
+import pstats
+import sysconfig
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+from app import metrics
+
+
+PROFILE_MODES = {'1': 'inline', 'true': 'inline', 'inline': 'inline', 'only': 'only'}
+SORT_KEYS = ('tottime', 'cumtime')
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STDLIB_DIR = sysconfig.get_paths()['stdlib']
+
+_current: contextvars.ContextVar = contextvars.ContextVar('pyarud_profile', default=None)
+# Only one profiler can be active per interpreter
+_active = threading.Lock()
+
+
+class ProfilingDenied(Exception):
+    """Profiling was asked for with a missing or wrong token"""
+
+
+class ProfilingBusy(Exception):
+    """Another request of this process is being profiled"""
+
+
+class RequestProfile:
+    """Stage timings and a cProfile profile of one request"""
+
+    def __init__(self):
+        self.id = uuid.uuid4().hex[:12]
+        self.stages: Dict[str, List[float]] = {}  # name -> [seconds, calls]
+        self.profiler = cProfile.Profile()
+        self.wall_seconds = 0.0
+
+    def add_stage(self, name: str, seconds: float) -> None:
+        entry = self.stages.setdefault(name, [0.0, 0])
+        entry[0] += seconds
+        entry[1] += 1
+
+    def report(self, limit: int = 25, sort: str = 'tottime') -> Dict[str, Any]:
+        """
+        Summarise the profile
+
+        Args:
+            limit: Functions listed
+            sort: 'tottime' (time in the function itself) or 'cumtime'
+                (including its callees)
+        """
+        stats = pstats.Stats(self.profiler)
+        rows = []
+        for (filename, line, name), (_, calls, tottime, cumtime, _) in stats.stats.items():
+            rows.append({
+                'function': f'{_location(filename)}:{line}({name})',
+                'calls': calls,
+                'tottime': round(tottime, 6),
+                'cumtime': round(cumtime, 6)
+            })
+        rows.sort(key=lambda row: row[sort], reverse=True)
+        return {
+            'id': self.id,
+            'wall_seconds': round(self.wall_seconds, 6),
+            'stages': {
+                name: {'seconds': round(seconds, 6), 'calls': calls}
+                for name, (seconds, calls) in self.stages.items()
+            },
+            'functions': rows[:limit],
+            'total_calls': stats.total_calls
+        }
+
+    def dump(self, directory: str, prefix: str = 'request') -> str:
+        """Write the raw profile (pstats format) under directory; returns the path"""
+        os.makedirs(directory, exist_ok=True)
+        stamp = time.strftime('%Y%m%dT%H%M%S', time.gmtime())
+        path = os.path.join(directory, f'{prefix}-{stamp}-{self.id}.prof')
+        self.profiler.dump_stats(path)
+        return path
+
+
+def _location(filename: str) -> str:
+    """Shorten a code path to the part after site-packages, the backend or the stdlib directory"""
+    if filename.startswith(BACKEND_DIR + os.sep):
+        return os.path.relpath(filename, BACKEND_DIR)
+    _, found, tail = filename.rpartition('site-packages' + os.sep)
+    if found:
+        return tail
+    if filename.startswith(STDLIB_DIR + os.sep):
+        return os.path.relpath(filename, STDLIB_DIR)
+    return filename
+
+
+def requested(request, config) -> Optional[str]:
+    """
+    The profiling mode a request asks for
+
+    The "profile" query parameter or X-Profile header selects "inline"
+    (profile next to the result) or "only" (profile instead of it). The
+    flag is ignored unless PROFILING_ENABLED is set.
+
+    Raises:
+        ProfilingDenied: If PROFILING_TOKEN is set and X-Profile-Token does not match
+    """
+    flag = request.args.get('profile') or request.headers.get('X-Profile')
+    if not flag or not config.get('PROFILING_ENABLED', False):
+        return None
+    mode = PROFILE_MODES.get(flag.lower())
+    if mode is None:
+        return None
+    token = config.get('PROFILING_TOKEN')
+    if token and not hmac.compare_digest(request.headers.get('X-Profile-Token', ''), token):
+        raise ProfilingDenied('Profiling not authorized')
+    return mode
+
+
+def current() -> Optional[RequestProfile]:
+    """The profile of the request being handled, if it asked for one"""
+    return _current.get()
+
+
+def record_stage(name: str, started: float, seconds: float) -> None:
+    """Add a stage timing to the current profile (no-op when not profiling)"""
+    request_profile = _current.get()
+    if request_profile is not None:
+        request_profile.add_stage(name, seconds)
+
+
+metrics.add_stage_listener(record_stage)
+
+
+@contextmanager
+def profile() -> Iterator[RequestProfile]:
+    """
+    Profile the with-block
+
+    Stage timings are those of this thread. On Python 3.12+ cProfile also
+    sees other threads, so profile on an otherwise idle process.
+
+    Raises:
+        ProfilingBusy: If another profile is running in this process
+    """
+    if not _active.acquire(blocking=False):
+        raise ProfilingBusy('Another request is being profiled')
+    request_profile = RequestProfile()
+    token = _current.set(request_profile)
+    started = time.perf_counter()
+    try:
+        request_profile.profiler.enable()
+        try:
+            yield request_profile
+        finally:
+            request_profile.profiler.disable()
+    finally:
+        request_profile.wall_seconds = time.perf_counter() - started
+        _current.reset(token)
+        _active.release()
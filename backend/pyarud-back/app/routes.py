@@ -1,20 +1,97 @@
 """
 API Routes Blueprint
 """
-from flask import Blueprint, request, jsonify
-from app.services import PyArudService
-from marshmallow import Schema, fields, ValidationError
+import functools
+import json
+import os
+import socket
+import time
+from contextlib import closing, nullcontext
+from flask import Blueprint, Response, request, jsonify, stream_with_context
+from app import metrics, profiling, tracing
+from app.admission import AdmissionController, Overloaded
+from app.serialization import CODECS, negotiate
+from app.services import PyArudService, meters
+from app.services.pyarud_service import DETECTION_MODES, VERSE_FIELDS, VIEWS
+from app.services.batch import BatchAnalyzer
+from app.services.corpus_stats import CorpusStats
+from app.services.jobs import JobManager
+from app.services.normalization import DIACRITICS_MODES
+from app.services.sessions import SessionStore
+from app.services.supervisor import AnalysisCancelled, AnalysisSupervisor, AnalysisTimeout
+from app.services.validation import first_invalid, validate_verses
+from marshmallow import Schema, fields, validate, ValidationError, EXCLUDE
+from werkzeug.exceptions import RequestEntityTooLarge
 
 
 # Create blueprint
 api_bp = Blueprint('api', __name__)
 
-# Initialize service
+# Initialize services
 pyarud_service = PyArudService()
+batch_analyzer = BatchAnalyzer(pyarud_service)
+job_manager = JobManager(pyarud_service)
+session_store = SessionStore(pyarud_service)
+analysis_supervisor = AnalysisSupervisor(pyarud_service)
+admission = AdmissionController()
+
+
+def _service_metrics():
+    """Expose cache and processor counters on /metrics"""
+    for name, cache in (('analysis', pyarud_service.cache), ('verse', pyarud_service.verse_cache)):
+        stats = cache.stats()
+        yield 'pyarud_cache_entries', 'gauge', 'Entries held per cache', {'cache': name}, stats['size']
+        for event in ('hits', 'misses', 'evictions', 'expirations'):
+            yield (
+                'pyarud_cache_events_total', 'counter', 'Cache lookups and removals per cache',
+                {'cache': name, 'event': event}, stats[event]
+            )
+    stats = pyarud_service.processors.stats()
+    yield 'pyarud_processor_instances', 'gauge', 'ArudhProcessor instances built', {}, stats['instances']
+    yield 'pyarud_processor_idle', 'gauge', 'ArudhProcessor instances waiting for a request', {}, stats['idle']
+    yield 'pyarud_processor_leases_total', 'counter', 'Processor leases handed out', {}, stats['leases']
+    stats = analysis_supervisor.stats()
+    for reason, count in (('timeout', stats['timeouts']), ('cancelled', stats['cancellations'])):
+        yield (
+            'pyarud_analysis_aborted_total', 'counter', 'Supervised analyses stopped before finishing',
+            {'reason': reason}, count
+        )
+    stats = admission.stats()
+    yield 'pyarud_admission_active', 'gauge', 'Analyses holding an admission slot', {}, stats['concurrency']['active']
+    yield (
+        'pyarud_admission_queue_depth', 'gauge', 'Requests waiting for an admission slot', {},
+        stats['concurrency']['queue_depth']
+    )
+    rejected = dict(stats['concurrency']['rejected'], rate_limited=stats['rate_limit']['rejected'])
+    for reason, count in rejected.items():
+        yield (
+            'pyarud_admission_rejected_total', 'counter', 'Requests turned away by admission control',
+            {'reason': reason}, count
+        )
+
+
+metrics.REGISTRY.register_collector(_service_metrics)
 
 
 # Request validation schema
-class AnalyzePoemSchema(Schema):
+class ResponseViewSchema(Schema):
+    """Response shape options shared by the analysis and session endpoints"""
+    view = fields.Str(load_default='full', validate=validate.OneOf(list(VIEWS)))
+    verse_fields = fields.List(
+        fields.Str(),
+        data_key='fields',
+        load_default=None,
+        validate=validate.ContainsOnly(VERSE_FIELDS)
+    )
+
+
+class AnalysisOptionsSchema(ResponseViewSchema):
+    """Detection, normalization and response shape options shared by the analysis endpoints"""
+    detection = fields.Str(load_default='full', validate=validate.OneOf(DETECTION_MODES))
+    diacritics = fields.Str(load_default='keep', validate=validate.OneOf(DIACRITICS_MODES))
+
+
+class AnalyzePoemSchema(AnalysisOptionsSchema):
     """Schema for poem analysis request"""
     verses = fields.List(
         fields.Str(required=True),
@@ -24,16 +101,191 @@ class AnalyzePoemSchema(Schema):
     )
 
 
+class BatchAnalyzeSchema(AnalysisOptionsSchema):
+    """Schema for batch analysis request"""
+    poems = fields.List(
+        fields.Dict(),
+        required=True,
+        validate=lambda x: len(x) > 0,
+        error_messages={'required': 'Poems are required'}
+    )
+
+
+class CorpusStatsSchema(Schema):
+    """Query parameters of corpus statistics"""
+    detection = fields.Str(load_default='full', validate=validate.OneOf(DETECTION_MODES))
+    diacritics = fields.Str(load_default='keep', validate=validate.OneOf(DIACRITICS_MODES))
+    progress = fields.Int(load_default=0, validate=validate.Range(min=0))
+
+
+class SessionSchema(ResponseViewSchema):
+    """Schema for opening an editing session"""
+    verses = fields.List(
+        fields.Str(required=True),
+        required=True,
+        validate=lambda x: len(x) > 0,
+        error_messages={'required': 'Verses are required'}
+    )
+
+
+class ValidateVersesSchema(Schema):
+    """Schema for bulk verse validation"""
+    verses = fields.List(
+        fields.Raw(required=True),
+        required=True,
+        validate=lambda x: len(x) > 0,
+        error_messages={'required': 'Verses are required'}
+    )
+
+
+class VerseChangeSchema(Schema):
+    """One edited line of a session"""
+    index = fields.Int(required=True, validate=validate.Range(min=0))
+    verse = fields.Str(required=True)
+
+
+class SessionUpdateSchema(Schema):
+    """Schema for the edits sent to a session"""
+    changes = fields.List(fields.Nested(VerseChangeSchema), required=True)
+    verse_count = fields.Int(load_default=None, validate=validate.Range(min=1))
+
+
+def _check_verses(verses, max_verses=None):
+    """
+    Apply the per-request verse limits
+
+    Args:
+        verses: Submitted verse lines
+        max_verses: Verse limit (defaults to MAX_VERSES_PER_REQUEST)
+
+    Returns:
+        Error message, or None when the verses are acceptable
+    """
+    from flask import current_app
+    if max_verses is None:
+        max_verses = current_app.config.get('MAX_VERSES_PER_REQUEST', 50)
+    if len(verses) > max_verses:
+        return f'Maximum {max_verses} verses allowed per request'
+
+    invalid = first_invalid(validate_verses(verses))
+    if invalid is not None:
+        return _invalid_verse_error(invalid.index)
+
+    return None
+
+
+def _invalid_verse_error(index):
+    """Error message for the invalid line at 0-based index"""
+    return f'Invalid verse at line {index + 1}. Please provide valid Arabic text.'
+
+
+def _rate_limited(view):
+    """Answer 429 before running view when the client is over RATE_LIMIT_PER_MINUTE"""
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        admission.check_rate(request)
+        return view(*args, **kwargs)
+    return wrapper
+
+
+def _profiled(view):
+    """
+    Run view under the profiler when the request asks for it (see app.profiling)
+
+    The report is added to the response body as "profile"; with
+    "profile=only" it replaces "data".
+    """
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        from flask import current_app
+        config = current_app.config
+        try:
+            mode = profiling.requested(request, config)
+            if mode is None:
+                return view(*args, **kwargs)
+            with profiling.profile() as request_profile:
+                response = current_app.make_response(view(*args, **kwargs))
+        except profiling.ProfilingDenied as err:
+            return jsonify({
+                'success': False,
+                'error': str(err)
+            }), 403
+        except profiling.ProfilingBusy as err:
+            return jsonify({
+                'success': False,
+                'error': str(err)
+            }), 409
+        
+        sort = config.get('PROFILING_SORT', 'tottime')
+        report = request_profile.report(
+            config.get('PROFILING_TOP_FUNCTIONS', 25), sort if sort in profiling.SORT_KEYS else 'tottime'
+        )
+        if config.get('PROFILING_DIR'):
+            path = request_profile.dump(config['PROFILING_DIR'], request.endpoint.rpartition('.')[2])
+            report['dump'] = os.path.basename(path)
+        if response.status_code == 304:
+            return response
+        
+        codec = CODECS.get(response.mimetype)
+        body = codec.loads(response.get_data()) if codec else response.get_json()
+        if mode == 'only':
+            body.pop('data', None)
+        body['profile'] = report
+        profiled = jsonify(body)
+        profiled.status_code = response.status_code
+        profiled.cache_control.no_store = True
+        return profiled
+    return wrapper
+
+
+def _analysis_slot(key):
+    """
+    Admission slot for computing the result cached under key
+
+    Cached results are served without one, so repeats are never queued
+    behind fresh analyses. Raises Overloaded (503) when no slot frees up.
+    """
+    if key in pyarud_service.cache:
+        return nullcontext()
+    return admission.slot()
+
+
+def _client_disconnected(environ):
+    """
+    Whether the client of this request has closed its connection
+
+    Peeks at the request socket without blocking: an orderly close reads
+    as b''. Servers that do not expose the socket are assumed connected.
+    """
+    sock = environ.get('gunicorn.socket') or environ.get('werkzeug.socket')
+    if sock is None:
+        return False
+    try:
+        return sock.recv(1, socket.MSG_PEEK | getattr(socket, 'MSG_DONTWAIT', 0)) == b''
+    except (BlockingIOError, InterruptedError):
+        return False
+    except ConnectionError:
+        return True
+    except (OSError, ValueError):
+        return False
+
+
 # ==================== API Routes ====================
 
 @api_bp.route('/analyze', methods=['POST'])
+@_rate_limited
+@_profiled
 def analyze_poem():
     """
     Analyze a poem using PyArud
     
     Request JSON:
     {
-        "verses": ["verse1", "verse2", ...]
+        "verses": ["verse1", "verse2", ...],
+        "view": "full",                       # optional: compact | standard | full
+        "fields": ["sadr", "ajuz", "score"],  # optional: overrides view
+        "detection": "full",                  # optional: full | prefix
+        "diacritics": "keep"                  # optional: keep | strip
     }
     
     Response JSON:
@@ -41,42 +293,689 @@ def analyze_poem():
         "success": true,
         "data": {
             "bahr": "المتقارب",
-            "verses_analysis": [...]
+            "verses_analysis": [...],
+            "detection": {...}                # only with "detection": "prefix"
         }
     }
+    
+    "prefix" detection finds the bahr from the first verses and scans the
+    rest against it alone, falling back to full detection when the prefix
+    is inconclusive or later verses disagree.
+    
+    Verses are normalized before analysis: tatweel and invisible characters
+    are dropped, letter variants folded and whitespace collapsed, so "sadr"
+    and "ajuz" hold the normalized text. "diacritics": "strip" also drops
+    the diacritics, so every vocalisation of a poem shares one analysis.
+    
+    The ETag is a hash of the normalized verses and options, so resending a
+    poem with "If-None-Match" returns 304 without re-analysing it, and
+    Content-Location points at the cacheable GET /api/analyze/<digest>.
+    
+    An analysis running longer than ANALYSIS_TIMEOUT is stopped and answered
+    with 504; "data" then holds the verses completed so far (or null) with
+    "complete": false.
+    
+    Admission control answers 429 when the client is over its rate limit and
+    503 when every analysis slot is busy and the wait queue is full, both
+    with Retry-After.
+    
+    With PROFILING_ENABLED, "?profile=1" (or "X-Profile: 1") analyses the
+    poem in-process past every cache under cProfile and adds a "profile"
+    with stage timings and the slowest functions; "?profile=only" returns
+    the profile without "data".
     """
     try:
         # Validate request data
-        schema = AnalyzePoemSchema()
-        data = schema.load(request.json)
+        with metrics.stage('parse'):
+            payload = request.json
+        with metrics.stage('schema'):
+            schema = AnalyzePoemSchema()
+            data = schema.load(payload)
         
         verses = data['verses']
+        metrics.REQUEST_VERSES.observe(len(verses), route='analyze')
         
-        # Validate verse count
-        from flask import current_app
-        max_verses = current_app.config.get('MAX_VERSES_PER_REQUEST', 50)
-        if len(verses) > max_verses:
+        # Validate verse count and each verse
+        with metrics.stage('validate_verse'):
+            error = _check_verses(verses)
+        if error:
             return jsonify({
                 'success': False,
-                'error': f'Maximum {max_verses} verses allowed per request'
+                'error': error
             }), 400
         
-        # Validate each verse
-        for idx, verse in enumerate(verses, 1):
-            if not pyarud_service.validate_verse(verse):
+        digest = pyarud_service.poem_digest(verses, data['diacritics'])
+        
+        key = pyarud_service.result_key(digest, data['view'], data['verse_fields'], data['detection'])
+        tracing.annotate(
+            verse_count=len(verses), detection=data['detection'], diacritics=data['diacritics'],
+            cache='hit' if key in pyarud_service.cache else 'miss'
+        )
+        environ = request.environ
+        
+        def build():
+            if profiling.current() is not None:
+                # Profile the whole pipeline in this process, past the caches
+                with admission.slot():
+                    result = pyarud_service.uncached().analyze_poem(
+                        verses, view=data['view'], fields=data['verse_fields'], detection=data['detection'],
+                        diacritics=data['diacritics']
+                    )
+            else:
+                # Analyze poem within ANALYSIS_TIMEOUT, once admitted
+                with tracing.span('analyze'), _analysis_slot(key):
+                    result = analysis_supervisor.analyze(
+                        verses, view=data['view'], fields=data['verse_fields'], detection=data['detection'],
+                        cancelled=lambda: _client_disconnected(environ), diacritics=data['diacritics']
+                    )
+            metrics.METER_TOTAL.inc(meter=result['bahr'])
+            tracing.annotate(meter=result['bahr'])
+            
+            with metrics.stage('serialize'):
                 return jsonify({
+                    'success': True,
+                    'data': result
+                })
+        
+        response = _conditional_response(key, build)
+        if response.status_code == 304:
+            tracing.annotate(cache='not_modified')
+        response.headers['Content-Location'] = _analysis_url(
+            digest, data['view'], data['verse_fields'], data['detection']
+        )
+        return response
+        
+    except (RequestEntityTooLarge, Overloaded):
+        raise
+        
+    except AnalysisTimeout as err:
+        return jsonify({
+            'success': False,
+            'error': str(err),
+            'data': err.partial
+        }), 504
+        
+    except AnalysisCancelled as err:
+        # Nobody is listening any more; the status only shows up in logs and metrics
+        return jsonify({
+            'success': False,
+            'error': str(err)
+        }), 499
+        
+    except ValidationError as err:
+        return jsonify({
+            'success': False,
+            'error': 'Invalid request format',
+            'details': err.messages
+        }), 400
+        
+    except ValueError as err:
+        return jsonify({
+            'success': False,
+            'error': str(err)
+        }), 400
+        
+    except Exception as err:
+        return jsonify({
+            'success': False,
+            'error': f'Analysis failed: {str(err)}'
+        }), 500
+
+
+def _analysis_url(digest, view, verse_fields, detection='full'):
+    """URL of the GET variant of an analysis"""
+    from flask import url_for
+    params = {}
+    if verse_fields:
+        params['fields'] = ','.join(verse_fields)
+    elif view != 'full':
+        params['view'] = view
+    if detection != 'full':
+        params['detection'] = detection
+    return url_for('api.get_analysis', digest=digest, **params)
+
+
+@api_bp.route('/analyze/<digest>', methods=['GET'])
+def get_analysis(digest):
+    """
+    Get the analysis of a previously submitted poem by its content hash
+    
+    The digest is the ETag of a POST /api/analyze response (without view
+    suffix), also given in its Content-Location header. Query parameters
+    "view", "fields" (comma-separated) and "detection" work as in
+    POST /api/analyze.
+    Responses are immutable for a digest and sent with a public
+    Cache-Control, so proxies and CDNs can serve repeats.
+    
+    Response JSON: same as POST /api/analyze, or 404 when the poem is not
+    (or no longer) known to the server
+    """
+    try:
+        fields_param = request.args.get('fields')
+        data = AnalysisOptionsSchema().load({
+            'view': request.args.get('view', 'full'),
+            'fields': fields_param.split(',') if fields_param else None,
+            'detection': request.args.get('detection', 'full')
+        })
+        
+        key = pyarud_service.result_key(digest, data['view'], data['verse_fields'], data['detection'])
+        
+        def build():
+            with _analysis_slot(key), analysis_supervisor.budget():
+                result = pyarud_service.analyze_digest(
+                    digest, view=data['view'], fields=data['verse_fields'], detection=data['detection']
+                )
+            if result is None:
+                response = jsonify({
+                    'success': False,
+                    'error': 'Unknown poem; submit it with POST /api/analyze first'
+                })
+                response.status_code = 404
+                return response
+            return jsonify({
+                'success': True,
+                'data': result
+            })
+        
+        from flask import current_app
+        response = _conditional_response(key, build, current_app.config.get('ANALYSIS_HTTP_MAX_AGE', 86400))
+        if response.status_code == 404:
+            # Not cacheable: the poem may be submitted later
+            del response.headers['ETag']
+            response.cache_control.public = False
+            response.cache_control.max_age = None
+            response.cache_control.no_store = True
+        return response
+        
+    except Overloaded:
+        raise
+        
+    except AnalysisTimeout as err:
+        return jsonify({
+            'success': False,
+            'error': str(err)
+        }), 504
+        
+    except AnalysisCancelled as err:
+        return jsonify({
+            'success': False,
+            'error': str(err)
+        }), 499
+        
+    except ValidationError as err:
+        return jsonify({
+            'success': False,
+            'error': 'Invalid request format',
+            'details': err.messages
+        }), 400
+        
+    except Exception as err:
+        return jsonify({
+            'success': False,
+            'error': f'Analysis failed: {str(err)}'
+        }), 500
+
+
+@api_bp.route('/analyze/stream', methods=['POST'])
+@_rate_limited
+def analyze_poem_stream():
+    """
+    Analyze a poem and stream results verse by verse
+    
+    Request JSON: same as /api/analyze
+    
+    Response: NDJSON (application/x-ndjson), one event per line, or
+    Server-Sent Events when the request sends "Accept: text/event-stream":
+    {"event": "meter", "bahr": "mutakareb", "meter_ar": "المتقارب", "verse_count": 2}
+    {"event": "verse", "data": {...}}
+    {"event": "done", "verse_count": 2}
+    
+    With "detection": "prefix" a second "meter" event may arrive mid-stream
+    when later verses overturn the prefix meter; verses received before it
+    are superseded by the ones that follow.
+    
+    A failure after streaming has started is reported as
+    {"event": "error", "error": "..."} and ends the stream; running out of
+    ANALYSIS_STREAM_TIMEOUT adds "status": 504.
+    
+    The admission slot is held until the stream ends; 429 and 503 are
+    answered as in /api/analyze, before any event is sent.
+    """
+    try:
+        data = AnalyzePoemSchema().load(request.json)
+        verses = data['verses']
+        
+        error = _check_verses(verses)
+        if error:
+            return jsonify({
+                'success': False,
+                'error': error
+            }), 400
+        
+    except RequestEntityTooLarge:
+        raise
+        
+    except ValidationError as err:
+        return jsonify({
+            'success': False,
+            'error': 'Invalid request format',
+            'details': err.messages
+        }), 400
+    
+    use_sse = request.accept_mimetypes.best_match(
+        ['application/x-ndjson', 'text/event-stream']
+    ) == 'text/event-stream'
+    
+    def encode(event):
+        payload = json.dumps(event, ensure_ascii=False)
+        if use_sse:
+            return f"event: {event['event']}\ndata: {payload}\n\n"
+        return payload + '\n'
+    
+    key = pyarud_service.cache_key(
+        verses, data['view'], data['verse_fields'], data['detection'], data['diacritics']
+    )
+    release = None if key in pyarud_service.cache else admission.acquire()
+    environ = request.environ
+    
+    def generate():
+        # Closing the events (the client went away) stops a supervised analysis
+        events = analysis_supervisor.iter_analysis(
+            verses, view=data['view'], fields=data['verse_fields'], detection=data['detection'],
+            cancelled=lambda: _client_disconnected(environ), diacritics=data['diacritics']
+        )
+        try:
+            with closing(events):
+                for event in events:
+                    yield encode(event)
+        except AnalysisCancelled:
+            return
+        except AnalysisTimeout as err:
+            yield encode({'event': 'error', 'error': str(err), 'status': 504})
+        except Exception as err:
+            yield encode({'event': 'error', 'error': str(err)})
+    
+    response = Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream' if use_sse else 'application/x-ndjson',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+    if release is not None:
+        # Closed by the server once the stream is finished or abandoned
+        response.call_on_close(release)
+    return response
+
+
+@api_bp.route('/analyze/batch', methods=['POST'])
+@_rate_limited
+def analyze_batch():
+    """
+    Analyze many poems in parallel
+    
+    Request JSON:
+    {
+        "poems": [
+            {"id": "client-id-1", "verses": ["verse1", "verse2", ...]},
+            ...
+        ],
+        "view": "compact",     # optional, applies to every poem (see /api/analyze)
+        "detection": "prefix", # optional, likewise
+        "diacritics": "strip"  # optional, likewise
+    }
+    
+    Response JSON (results keep the request order; a failing poem only
+    fails its own entry):
+    {
+        "success": true,
+        "data": {
+            "count": 2,
+            "results": [
+                {"id": "client-id-1", "success": true, "data": {...}},
+                {"id": "client-id-2", "success": false, "error": "..."}
+            ]
+        }
+    }
+    """
+    try:
+        data = BatchAnalyzeSchema().load(request.json)
+        poems = data['poems']
+        
+        from flask import current_app
+        max_poems = current_app.config.get('BATCH_MAX_POEMS', 100)
+        if len(poems) > max_poems:
+            return jsonify({
+                'success': False,
+                'error': f'Maximum {max_poems} poems allowed per batch'
+            }), 400
+        
+        # Validate every poem on its own so one bad item does not fail the batch
+        results = [None] * len(poems)
+        accepted = []
+        for idx, poem in enumerate(poems):
+            try:
+                item = AnalyzePoemSchema(unknown=EXCLUDE).load(poem)
+            except ValidationError as err:
+                results[idx] = {
                     'success': False,
-                    'error': f'Invalid verse at line {idx}. Please provide valid Arabic text.'
-                }), 400
+                    'error': 'Invalid request format',
+                    'details': err.messages
+                }
+                continue
+            error = _check_verses(item['verses'])
+            if error:
+                results[idx] = {'success': False, 'error': error}
+                continue
+            accepted.append((idx, item['verses']))
+        
+        # The whole batch holds one admission slot
+        with admission.slot():
+            analyzed = batch_analyzer.analyze(
+                [verses for _, verses in accepted],
+                view=data['view'], fields=data['verse_fields'], detection=data['detection'],
+                diacritics=data['diacritics']
+            )
+        for (idx, _), result in zip(accepted, analyzed):
+            results[idx] = result
+        
+        for poem, result in zip(poems, results):
+            result['id'] = poem.get('id')
+        
+        return jsonify({
+            'success': True,
+            'data': {
+                'count': len(results),
+                'results': results
+            }
+        }), 200
+        
+    except (RequestEntityTooLarge, Overloaded):
+        raise
+        
+    except ValidationError as err:
+        return jsonify({
+            'success': False,
+            'error': 'Invalid request format',
+            'details': err.messages
+        }), 400
+        
+    except Exception as err:
+        return jsonify({
+            'success': False,
+            'error': f'Batch analysis failed: {str(err)}'
+        }), 500
+
+
+@api_bp.route('/corpus/stats', methods=['POST'])
+@_rate_limited
+def corpus_stats():
+    """
+    Meter distribution, broken-verse rate and zihaf frequencies of a corpus
+    
+    Request body: NDJSON, one poem per line, as read by analyze_corpus.py
+    {"id": "p1", "verses": ["verse1", "verse2", ...]}
+    
+    Query parameters: "detection" and "diacritics" as in /api/analyze, and
+    "progress=N" for a progress event every N poems.
+    
+    Response: NDJSON
+    {"event": "progress", "poems": 100, "failed_poems": 1}
+    {"event": "stats", "data": {"poems": ..., "broken_rate": ..., "meters": {...}}}
+    
+    Poems are read from the request body, analysed and folded into running
+    counts one at a time; no verses_analysis is built, so memory stays flat
+    whatever the corpus size. A line that is not a valid poem (limited to
+    JOB_MAX_VERSES verses) counts in "failed_poems". The stream holds one
+    admission slot; after CORPUS_STATS_TIMEOUT it ends with
+    {"event": "error", "status": 504, "data": {...counts so far}}.
+    """
+    try:
+        options = CorpusStatsSchema().load(request.args)
+        # Raises 413 for a body over CORPUS_STATS_MAX_CONTENT_LENGTH
+        lines = request.stream
+        
+    except RequestEntityTooLarge:
+        raise
+        
+    except ValidationError as err:
+        return jsonify({
+            'success': False,
+            'error': 'Invalid request format',
+            'details': err.messages
+        }), 400
+    
+    from flask import current_app
+    max_verses = current_app.config.get('JOB_MAX_VERSES', 5000)
+    timeout = current_app.config.get('CORPUS_STATS_TIMEOUT', 0)
+    release = admission.acquire()
+    
+    def encode(event):
+        return json.dumps(event, ensure_ascii=False) + '\n'
+    
+    def generate():
+        stats = CorpusStats()
+        deadline = time.monotonic() + timeout if timeout else None
+        for line in lines:
+            if not line.strip():
+                continue
+            if deadline is not None and time.monotonic() >= deadline:
+                yield encode({
+                    'event': 'error',
+                    'error': f'Corpus statistics exceeded {timeout:g} seconds',
+                    'status': 504,
+                    'data': stats.summary()
+                })
+                return
+            try:
+                verses = AnalyzePoemSchema(unknown=EXCLUDE).load(json.loads(line))['verses']
+                if _check_verses(verses, max_verses):
+                    raise ValueError('invalid poem')
+                stats.merge(pyarud_service.poem_stats(
+                    verses, detection=options['detection'], diacritics=options['diacritics']
+                ))
+            except Exception:
+                stats.add_failure()
+            if options['progress'] and stats.poems % options['progress'] == 0:
+                yield encode({'event': 'progress', 'poems': stats.poems, 'failed_poems': stats.failed_poems})
+        yield encode({'event': 'stats', 'data': stats.summary()})
+    
+    response = Response(
+        stream_with_context(generate()),
+        mimetype='application/x-ndjson',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+    response.call_on_close(release)
+    return response
+
+
+@api_bp.route('/jobs', methods=['POST'])
+@_rate_limited
+def create_job():
+    """
+    Queue a poem of any length for background analysis
+    
+    Request JSON: same as /api/analyze, limited by JOB_MAX_VERSES
+    instead of MAX_VERSES_PER_REQUEST
+    
+    Response JSON (202):
+    {
+        "success": true,
+        "data": {
+            "job_id": "3f2c...",
+            "status": "queued",
+            "status_url": "/api/jobs/3f2c..."
+        }
+    }
+    """
+    try:
+        data = AnalyzePoemSchema().load(request.json)
+        verses = data['verses']
         
-        # Analyze poem
-        result = pyarud_service.analyze_poem(verses)
+        from flask import current_app
+        error = _check_verses(verses, current_app.config.get('JOB_MAX_VERSES', 5000))
+        if error:
+            return jsonify({
+                'success': False,
+                'error': error
+            }), 400
+        
+        job_id = job_manager.submit(
+            verses, view=data['view'], fields=data['verse_fields'], detection=data['detection'],
+            diacritics=data['diacritics']
+        )
         
         return jsonify({
             'success': True,
-            'data': result
+            'data': {
+                'job_id': job_id,
+                'status': 'queued',
+                'status_url': f'/api/jobs/{job_id}'
+            }
+        }), 202
+        
+    except RequestEntityTooLarge:
+        raise
+        
+    except ValidationError as err:
+        return jsonify({
+            'success': False,
+            'error': 'Invalid request format',
+            'details': err.messages
+        }), 400
+        
+    except Exception as err:
+        return jsonify({
+            'success': False,
+            'error': f'Could not queue job: {str(err)}'
+        }), 500
+
+
+@api_bp.route('/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """
+    Get a job's status, progress and a page of its results
+    
+    Query parameters: offset (default 0), limit (default JOB_PAGE_SIZE)
+    
+    Response JSON:
+    {
+        "success": true,
+        "data": {
+            "job": {
+                "id": "3f2c...",
+                "status": "running",
+                "bahr": "taweel",
+                "meter_ar": "الطويل",
+                "verse_count": 120,
+                "verses_done": 40,
+                "progress": 0.3333,
+                ...
+            },
+            "results": [...],
+            "offset": 0,
+            "limit": 50,
+            "next_offset": 40
+        }
+    }
+    
+    next_offset is null once every verse of a finished job has been returned.
+    """
+    try:
+        job = job_manager.store.get(job_id)
+        if job is None:
+            return jsonify({
+                'success': False,
+                'error': 'Job not found'
+            }), 404
+        
+        from flask import current_app
+        page_size = current_app.config.get('JOB_PAGE_SIZE', 50)
+        offset = max(request.args.get('offset', 0, type=int), 0)
+        limit = min(max(request.args.get('limit', page_size, type=int), 1), page_size * 10)
+        
+        results = job_manager.store.results(job_id, offset, limit)
+        next_offset = offset + len(results)
+        if job['status'] in ('completed', 'failed') and next_offset >= job['verses_done']:
+            next_offset = None
+        
+        return jsonify({
+            'success': True,
+            'data': {
+                'job': job,
+                'results': results,
+                'offset': offset,
+                'limit': limit,
+                'next_offset': next_offset
+            }
         }), 200
         
+    except Exception as err:
+        return jsonify({
+            'success': False,
+            'error': str(err)
+        }), 500
+
+
+@api_bp.route('/sessions', methods=['POST'])
+@_rate_limited
+def create_session():
+    """
+    Analyze a poem and keep it server-side for live editing
+    
+    Request JSON: "verses" plus the optional "view"/"fields" of
+    /api/analyze, up to SESSION_MAX_VERSES verses
+    
+    Response JSON (201):
+    {
+        "success": true,
+        "data": {
+            "session_id": "9b1e...",
+            "bahr": "mutakareb",
+            "meter_ar": "المتقارب",
+            "verses_analysis": [...]
+        }
+    }
+    
+    Limited to ANALYSIS_TIMEOUT like /api/analyze: 504 when over budget.
+    """
+    try:
+        data = SessionSchema().load(request.json)
+        verses = data['verses']
+        
+        from flask import current_app
+        error = _check_verses(verses, current_app.config.get('SESSION_MAX_VERSES', 200))
+        if error:
+            return jsonify({
+                'success': False,
+                'error': error
+            }), 400
+        
+        environ = request.environ
+        with admission.slot(), analysis_supervisor.budget(cancelled=lambda: _client_disconnected(environ)):
+            session_id, result = session_store.create(verses, view=data['view'], fields=data['verse_fields'])
+        
+        response = jsonify({
+            'success': True,
+            'data': dict(result, session_id=session_id)
+        })
+        response.status_code = 201
+        response.headers['Location'] = f'/api/sessions/{session_id}'
+        return response
+        
+    except (RequestEntityTooLarge, Overloaded):
+        raise
+        
+    except AnalysisTimeout as err:
+        return jsonify({
+            'success': False,
+            'error': str(err)
+        }), 504
+        
+    except AnalysisCancelled as err:
+        return jsonify({
+            'success': False,
+            'error': str(err)
+        }), 499
+        
     except ValidationError as err:
         return jsonify({
             'success': False,
@@ -97,35 +996,235 @@ def analyze_poem():
         }), 500
 
 
-@api_bp.route('/bahr/<bahr_name>', methods=['GET'])
-def get_bahr_info(bahr_name):
+@api_bp.route('/sessions/<session_id>', methods=['PATCH'])
+@_rate_limited
+def update_session(session_id):
     """
-    Get information about a specific bahr (meter)
+    Apply edits to a session and return only what changed
+    
+    Request JSON:
+    {
+        "changes": [{"index": 3, "verse": "edited line"}, ...],
+        "verse_count": 12    # optional: new line count, drops trailing lines
+    }
+    
+    An index equal to the current line count appends a line. Only changed
+    verses are re-scanned; the meter is re-voted only when an edited verse
+    no longer fits it.
     
     Response JSON:
     {
         "success": true,
         "data": {
-            "name": "المتقارب",
-            "pattern": "فعولن فعولن فعولن فعولن"
+            "bahr": "mutakareb",
+            "meter_ar": "المتقارب",
+            "meter_changed": false,
+            "verse_count": 12,
+            "verses": [...]    # rescanned entries, every entry if meter_changed
         }
     }
+    
+    An unknown or expired session returns 404; clients then open a new one.
+    An update over ANALYSIS_TIMEOUT returns 504 and leaves the session as
+    it was.
     """
     try:
-        info = pyarud_service.get_bahr_info(bahr_name)
+        data = SessionUpdateSchema().load(request.json)
+        
+        changes = data['changes']
+        invalid = first_invalid(validate_verses(change['verse'] for change in changes))
+        if invalid is not None:
+            return jsonify({
+                'success': False,
+                'error': _invalid_verse_error(changes[invalid.index]['index'])
+            }), 400
+        
+        from flask import current_app
+        max_verses = current_app.config.get('SESSION_MAX_VERSES', 200)
+        last_line = max([change['index'] + 1 for change in data['changes']] + [data['verse_count'] or 0])
+        if last_line > max_verses:
+            return jsonify({
+                'success': False,
+                'error': f'Maximum {max_verses} verses allowed per request'
+            }), 400
+        
+        environ = request.environ
+        with admission.slot(), analysis_supervisor.budget(cancelled=lambda: _client_disconnected(environ)):
+            delta = session_store.update(session_id, data['changes'], data['verse_count'])
+        if delta is None:
+            return jsonify({
+                'success': False,
+                'error': 'Session not found or expired'
+            }), 404
         
         return jsonify({
             'success': True,
-            'data': info
+            'data': delta
         }), 200
         
-    except Exception as err:
+    except (RequestEntityTooLarge, Overloaded):
+        raise
+        
+    except AnalysisTimeout as err:
         return jsonify({
             'success': False,
             'error': str(err)
+        }), 504
+        
+    except AnalysisCancelled as err:
+        return jsonify({
+            'success': False,
+            'error': str(err)
+        }), 499
+        
+    except ValidationError as err:
+        return jsonify({
+            'success': False,
+            'error': 'Invalid request format',
+            'details': err.messages
+        }), 400
+        
+    except ValueError as err:
+        return jsonify({
+            'success': False,
+            'error': str(err)
+        }), 400
+        
+    except Exception as err:
+        return jsonify({
+            'success': False,
+            'error': f'Analysis failed: {str(err)}'
         }), 500
 
 
+@api_bp.route('/sessions/<session_id>', methods=['GET'])
+def get_session(session_id):
+    """Get a session's current analysis, shaped like /api/analyze's data"""
+    result = session_store.get(session_id)
+    if result is None:
+        return jsonify({
+            'success': False,
+            'error': 'Session not found or expired'
+        }), 404
+    
+    return jsonify({
+        'success': True,
+        'data': result
+    }), 200
+
+
+@api_bp.route('/sessions/<session_id>', methods=['DELETE'])
+def delete_session(session_id):
+    """Close a session"""
+    if not session_store.delete(session_id):
+        return jsonify({
+            'success': False,
+            'error': 'Session not found or expired'
+        }), 404
+    
+    return jsonify({
+        'success': True
+    }), 200
+
+
+def _conditional_response(etag, build, max_age=None):
+    """
+    Answer with 304 when If-None-Match matches etag, otherwise with build()
+
+    The ETag combines etag with the negotiated format, and build only runs
+    when the client does not already hold this representation.
+    
+    Args:
+        etag: Content validator (registry digest or poem hash)
+        build: Callable returning the full response
+        max_age: Public Cache-Control max-age in seconds, if cacheable
+    """
+    from flask import current_app
+    etag = f"{etag}-{negotiate().rsplit('/', 1)[1]}"
+    if request.if_none_match.contains(etag):
+        response = current_app.response_class(status=304)
+        response.vary.add('Accept')
+    else:
+        response = build()
+    response.set_etag(etag)
+    if max_age is not None:
+        response.cache_control.public = True
+        response.cache_control.max_age = max_age
+    return response
+
+
+@api_bp.route('/bahr/<bahr_name>', methods=['GET'])
+def get_bahr_info(bahr_name):
+    """
+    Get information about a specific bahr (meter)
+    
+    The name may be the pyarud key, the Arabic or English name, or a
+    common transliteration ("mutakareb", "المتقارب", "Mutaqarib").
+    
+    Response JSON:
+    {
+        "success": true,
+        "data": {
+            "key": "mutakareb",
+            "name": "المتقارب",
+            "name_en": "Mutaqarib",
+            "feet": ["فعولن", "فعولن", "فعولن", "فعولن"],
+            "pattern": "فعولن فعولن فعولن فعولن",
+            "template": "11010110101101011010",
+            "aliases": [...]
+        }
+    }
+    
+    Unknown names answer 404 {"success": false, "error": "Unknown bahr: <name>"}.
+    Before the meter registry they answered 200 with "pattern": "غير معروف";
+    clients checking that pattern must check the status code instead.
+    """
+    info = pyarud_service.get_bahr_info(bahr_name)
+    if 'key' not in info:
+        return jsonify({
+            'success': False,
+            'error': f'Unknown bahr: {bahr_name}'
+        }), 404
+    
+    from flask import current_app
+    return _conditional_response(
+        meters.ETAGS[info['key']],
+        lambda: jsonify({
+            'success': True,
+            'data': info
+        }),
+        current_app.config.get('BAHR_CACHE_MAX_AGE', 86400)
+    )
+
+
+@api_bp.route('/bahrs', methods=['GET'])
+def list_bahrs():
+    """
+    Get the catalog of all sixteen meters
+    
+    Response JSON:
+    {
+        "success": true,
+        "data": {
+            "count": 16,
+            "bahrs": [{"key": "taweel", "name": "الطويل", ...}, ...]
+        }
+    }
+    """
+    from flask import current_app
+    return _conditional_response(
+        meters.CATALOG_ETAG,
+        lambda: jsonify({
+            'success': True,
+            'data': {
+                'count': len(meters.CATALOG),
+                'bahrs': meters.CATALOG
+            }
+        }),
+        current_app.config.get('BAHR_CACHE_MAX_AGE', 86400)
+    )
+
+
 @api_bp.route('/validate', methods=['POST'])
 def validate_verse():
     """
@@ -166,6 +1265,84 @@ def validate_verse():
         }), 500
 
 
+@api_bp.route('/validate/batch', methods=['POST'])
+def validate_verses_bulk():
+    """
+    Validate many verses in one request
+    
+    Request JSON:
+    {
+        "verses": ["verse1", "verse2", ...]    # up to VALIDATE_MAX_VERSES
+    }
+    
+    Response JSON:
+    {
+        "success": true,
+        "data": {
+            "count": 2,
+            "valid_count": 1,
+            "all_valid": false,
+            "results": [
+                {
+                    "index": 0,
+                    "is_valid": true,
+                    "length": 27,
+                    "arabic_ratio": 1.0,
+                    "diacritics_coverage": 0.4,
+                    "separator": "***",
+                    "error": null
+                },
+                ...
+            ]
+        }
+    }
+    
+    Every line is checked with the rules of /api/validate; an invalid line
+    does not fail the request.
+    """
+    try:
+        data = ValidateVersesSchema().load(request.json)
+        verses = data['verses']
+        
+        from flask import current_app
+        max_verses = current_app.config.get('VALIDATE_MAX_VERSES', 1000)
+        if len(verses) > max_verses:
+            return jsonify({
+                'success': False,
+                'error': f'Maximum {max_verses} verses allowed per request'
+            }), 400
+        
+        with metrics.stage('validate_verse'):
+            results = [item._asdict() for item in validate_verses(verses)]
+        valid_count = sum(item['is_valid'] for item in results)
+        
+        return jsonify({
+            'success': True,
+            'data': {
+                'count': len(results),
+                'valid_count': valid_count,
+                'all_valid': valid_count == len(results),
+                'results': results
+            }
+        }), 200
+        
+    except RequestEntityTooLarge:
+        raise
+        
+    except ValidationError as err:
+        return jsonify({
+            'success': False,
+            'error': 'Invalid request format',
+            'details': err.messages
+        }), 400
+        
+    except Exception as err:
+        return jsonify({
+            'success': False,
+            'error': str(err)
+        }), 500
+
+
 @api_bp.route('/status', methods=['GET'])
 def api_status():
     """
@@ -175,7 +1352,11 @@ def api_status():
     {
         "status": "running",
         "version": "1.0.0",
-        "service": "PyArud API"
+        "service": "PyArud API",
+        "cache": {"hits": 0, "misses": 0, "evictions": 0, ...},
+        "verse_cache": {"hits": 0, "misses": 0, "evictions": 0, ...},
+        "processor": {"warm": true, "instances": 1, ...},
+        "admission": {"concurrency": {"active": 1, "queue_depth": 0, ...}, "rate_limit": {...}}
     }
     """
     return jsonify({
@@ -184,8 +1365,24 @@ def api_status():
         'service': 'PyArud API',
         'endpoints': {
             'analyze': '/api/analyze [POST]',
+            'analysis': '/api/analyze/<digest> [GET]',
+            'analyze_stream': '/api/analyze/stream [POST]',
+            'analyze_batch': '/api/analyze/batch [POST]',
+            'corpus_stats': '/api/corpus/stats [POST]',
+            'jobs': '/api/jobs [POST]',
+            'job_status': '/api/jobs/<job_id> [GET]',
+            'sessions': '/api/sessions [POST]',
+            'session': '/api/sessions/<session_id> [GET, PATCH, DELETE]',
             'bahr_info': '/api/bahr/<bahr_name> [GET]',
+            'bahrs': '/api/bahrs [GET]',
             'validate': '/api/validate [POST]',
-            'status': '/api/status [GET]'
-        }
+            'validate_batch': '/api/validate/batch [POST]',
+            'status': '/api/status [GET]',
+            'metrics': '/metrics [GET]'
+        },
+        'cache': pyarud_service.cache.stats(),
+        'verse_cache': pyarud_service.verse_cache.stats(),
+        'processor': pyarud_service.processors.stats(),
+        'supervisor': analysis_supervisor.stats(),
+        'admission': admission.stats()
     }), 200
@@ -0,0 +1,74 @@
+"""
+Response and request body formats
+
+JSON is always available. MessagePack (msgpack) and CBOR (cbor2) are used
+when their packages are installed, chosen per request from the Accept header
+for responses and from Content-Type for request bodies.
+"""
+from typing import Any, Callable, Dict, NamedTuple
+
+from flask import has_request_context, request
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - optional dependency
+    msgpack = None
+
+try:
+    import cbor2
+except ImportError:  # pragma: no cover - optional dependency
+    cbor2 = None
+
+
+JSON_MIMETYPE = 'application/json'
+
+
+class Codec(NamedTuple):
+    """Encoder/decoder pair for one media type"""
+    mimetype: str
+    dumps: Callable[[Any], bytes]
+    loads: Callable[[bytes], Any]
+
+
+# Binary codecs keyed by every media type they answer to
+CODECS: Dict[str, Codec] = {}
+
+if msgpack is not None:
+    _msgpack = Codec(
+        'application/msgpack',
+        lambda obj: msgpack.packb(obj, use_bin_type=True),
+        lambda data: msgpack.unpackb(data, raw=False)
+    )
+    CODECS['application/msgpack'] = CODECS['application/x-msgpack'] = _msgpack
+
+if cbor2 is not None:
+    CODECS['application/cbor'] = Codec('application/cbor', cbor2.dumps, cbor2.loads)
+
+
+def negotiate() -> str:
+    """Return the response media type the current request prefers"""
+    offered = [JSON_MIMETYPE] + list(CODECS)
+    return request.accept_mimetypes.best_match(offered, default=JSON_MIMETYPE)
+
+
+class NegotiatingJSONProvider(DefaultJSONProvider):
+    """
+    JSON provider whose responses follow the Accept header
+
+    jsonify() and dict/list return values both go through response(), so
+    every endpoint can answer in a binary format without changes. JSON is
+    returned unless a binary type is preferred, which keeps browsers and
+    the React frontend on JSON.
+    """
+
+    def response(self, *args, **kwargs):
+        mimetype = negotiate() if has_request_context() else JSON_MIMETYPE
+        codec = CODECS.get(mimetype)
+        if codec is None:
+            response = super().response(*args, **kwargs)
+        else:
+            obj = self._prepare_response_obj(args, kwargs)
+            response = self._app.response_class(codec.dumps(obj), mimetype=codec.mimetype)
+        response.vary.add('Accept')
+        return response
@@ -0,0 +1,157 @@
+"""
+Batch analysis fanned out across worker processes
+"""
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, List, Optional
+
+from app.services.supervisor import AnalysisTimeout, Budget, bounded
+
+
+# Service instance owned by each worker process
+_worker_service = None
+
+
+def _init_worker(warmup: bool, prefix=None) -> None:
+    """Build a PyArudService and its processor in the worker process"""
+    global _worker_service
+    from app.services.processor_pool import ProcessorProvider
+    from app.services.pyarud_service import PyArudService
+
+    _worker_service = PyArudService(processors=ProcessorProvider(warmup=warmup), prefix=prefix)
+    _worker_service.processors.preload()
+
+
+def _analyze_in_worker(verses: List[str], view: str = 'full', fields: Optional[List[str]] = None,
+                       detection: str = 'full', diacritics: str = 'keep',
+                       timeout: float = 0, deadline: Optional[float] = None) -> Dict[str, Any]:
+    """
+    Analyze one poem, turning failures into an error entry
+
+    deadline is a time.time() value, comparable across processes; a poem
+    still scanning at the batch's deadline fails with the timeout error.
+    """
+    budget = None
+    if deadline is not None:
+        budget = Budget(timeout, deadline=time.monotonic() + deadline - time.time())
+    try:
+        with bounded(budget):
+            return {
+                'success': True,
+                'data': _worker_service.analyze_poem(
+                    verses, view=view, fields=fields, detection=detection, diacritics=diacritics
+                )
+            }
+    except AnalysisTimeout as err:
+        return {'success': False, 'error': str(err)}
+    except ValueError as err:
+        return {'success': False, 'error': str(err)}
+    except Exception as err:
+        return {'success': False, 'error': f'Analysis failed: {str(err)}'}
+
+
+class BatchAnalyzer:
+    """Analyzes many poems in parallel on a process pool"""
+
+    def __init__(self, service, max_workers: Optional[int] = None,
+                 start_method: str = 'spawn', warmup: bool = False, timeout: float = 0):
+        """
+        Args:
+            service: PyArudService whose result cache is consulted and filled
+            max_workers: Worker process count (None or 0 uses the CPU count)
+            start_method: multiprocessing start method for the workers
+            warmup: Warm each worker's processor on startup
+            timeout: Seconds allowed per batch (0 = no limit)
+        """
+        self.service = service
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.start_method = start_method
+        self.warmup = warmup
+        self.timeout = timeout
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def init_app(self, app) -> None:
+        """Configure the analyzer from the Flask application config"""
+        self.shutdown()
+        self.max_workers = app.config.get('BATCH_MAX_WORKERS') or os.cpu_count() or 1
+        self.start_method = app.config.get('BATCH_START_METHOD', 'spawn')
+        self.warmup = app.config.get('PROCESSOR_WARMUP', False)
+        self.timeout = app.config.get('ANALYSIS_TIMEOUT', 0)
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context(self.start_method),
+                    initializer=_init_worker,
+                    initargs=(self.warmup, self.service.prefix)
+                )
+            return self._executor
+
+    def analyze(self, poems: List[List[str]], view: str = 'full',
+                fields: Optional[List[str]] = None, detection: str = 'full',
+                diacritics: str = 'keep') -> List[Dict[str, Any]]:
+        """
+        Analyze a list of poems with the same view/fields, detection and diacritics modes
+
+        Poems already in the service's result cache are answered directly; the
+        rest are dispatched to the process pool, and their results remembered
+        by the service like its own, so GET /api/analyze/<digest> finds them. Each result is either
+        {'success': True, 'data': ...} or {'success': False, 'error': ...},
+        in the same order as the input, so one failing poem never affects
+        the others. Poems not finished within self.timeout of the call fail
+        with the timeout error.
+        """
+        results: List[Optional[Dict[str, Any]]] = [None] * len(poems)
+        pending = {}
+
+        for idx, verses in enumerate(poems):
+            try:
+                key = self.service.cache_key(verses, view, fields, detection, diacritics)
+            except ValueError as err:
+                results[idx] = {'success': False, 'error': str(err)}
+                continue
+            cached = self.service.cache.get(key)
+            if cached is not None:
+                results[idx] = {'success': True, 'data': cached}
+            else:
+                pending[idx] = key
+
+        if pending:
+            executor = self._get_executor()
+            deadline = time.time() + self.timeout if self.timeout else None
+            futures = {
+                idx: executor.submit(
+                    _analyze_in_worker, poems[idx], view, fields, detection, diacritics, self.timeout, deadline
+                )
+                for idx in pending
+            }
+            broken = False
+            for idx, future in futures.items():
+                try:
+                    results[idx] = future.result()
+                except BrokenProcessPool as err:
+                    broken = True
+                    results[idx] = {'success': False, 'error': f'Analysis failed: {str(err)}'}
+                except Exception as err:
+                    results[idx] = {'success': False, 'error': f'Analysis failed: {str(err)}'}
+                if results[idx]['success']:
+                    self.service.remember(poems[idx], results[idx]['data'], view, fields, detection, diacritics)
+            if broken:
+                # A worker died; start a fresh pool on the next batch
+                self.shutdown()
+
+        return results
+
+    def shutdown(self) -> None:
+        """Stop the worker processes, if started"""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
@@ -0,0 +1,218 @@
+"""
+Corpus statistics
+Folds scanned verses into running counts per meter and foot position, so a
+corpus of any size is summarised in constant memory
+"""
+from collections import Counter
+from typing import Any, Dict, Optional, Tuple
+
+from app.services import meters
+
+
+HEMISTICHS = ('sadr', 'ajuz')
+
+# Foot statuses of pyarud's sadr_analysis/ajuz_analysis that break a verse
+BROKEN_STATUSES = ('broken', 'missing', 'extra_bits')
+
+# Zihaf or ellah of each allowed foot form, per meter class:
+# {(hemistich index, foot position, pattern): name}
+_zihaf_names: Dict[type, Dict[Tuple[int, int, str], str]] = {}
+
+
+def zihaf_names(bahr_cls) -> Dict[Tuple[int, int, str], str]:
+    """
+    Name the zihaf (or ellah) behind every allowed foot form of a pyarud meter
+
+    pyarud reports the form a foot matched as a bit pattern; this maps it
+    back to the change that produces it from the meter's definition, e.g.
+    'qabadh', or 'salim' for the unchanged foot. Forms several changes
+    produce get their names joined with '|'. Returns {} for anything that
+    is not a pyarud Bahr class.
+    """
+    if bahr_cls in _zihaf_names:
+        return _zihaf_names[bahr_cls]
+    names: Dict[Tuple[int, int, str], set] = {}
+    try:
+        bahr = bahr_cls()
+        for shatr in range(2):
+            hashw = bahr.get_shatr_hashw_combinations(shatr)
+            for position, forms in enumerate(hashw):
+                for form in forms:
+                    key = (shatr, position, str(form))
+                    names.setdefault(key, set()).add(_change_name(form.applied_ella_zehaf_class))
+            endings = bahr.arod_dharbs_map
+            if isinstance(endings, dict) and not bahr.only_one_shatr:
+                endings = endings if shatr == 0 else {cls for classes in endings.values() for cls in classes}
+            for change in endings:
+                try:
+                    form = change(bahr.last_tafeela).modified_tafeela
+                except AssertionError:
+                    continue
+                names.setdefault((shatr, len(hashw), str(form)), set()).add(_change_name(change))
+    except Exception:
+        names = {}
+    _zihaf_names[bahr_cls] = {key: '|'.join(sorted(value)) for key, value in names.items()}
+    return _zihaf_names[bahr_cls]
+
+
+def _change_name(change) -> str:
+    if change is None or change.__name__ == 'NoZehafNorEllah':
+        return 'salim'
+    return change.__name__.lower()
+
+
+def _meter_tally() -> Dict[str, Any]:
+    return {
+        'poems': 0,
+        'verses': 0,
+        'scanned_verses': 0,
+        'broken_verses': 0,
+        'score_sum': 0.0,
+        # hemistich -> foot position -> {'status': Counter, 'zihaf': Counter}
+        'feet': {hemistich: {} for hemistich in HEMISTICHS}
+    }
+
+
+class CorpusStats:
+    """
+    Running meter, broken-verse and zihaf counts
+
+    Counts grow with the number of meters, foot positions and foot forms,
+    never with the number of poems or verses. Tallies of separately
+    analysed poems (or worker processes) are combined with merge().
+    """
+
+    def __init__(self):
+        self.poems = 0
+        self.failed_poems = 0
+        self.meters: Dict[str, Dict[str, Any]] = {}
+
+    def add_poem(self, meter: Optional[str], verse_count: int) -> None:
+        """Count a poem and its verses under its detected meter ('unknown' when none was found)"""
+        tally = self._tally(meter)
+        tally['poems'] += 1
+        tally['verses'] += verse_count
+        self.poems += 1
+
+    def add_failure(self) -> None:
+        """Count a poem that could not be analysed"""
+        self.failed_poems += 1
+        self.poems += 1
+
+    def add_verse(
+        self, meter: Optional[str], verse_data: Dict[str, Any],
+        names: Optional[Dict[Tuple[int, int, str], str]] = None
+    ) -> None:
+        """
+        Fold one scanned verse into its meter's counts
+
+        Args:
+            meter: Meter the verse was scanned against
+            verse_data: pyarud's details of the verse
+            names: zihaf_names() of the meter; foot patterns are counted as is without it
+        """
+        tally = self._tally(meter)
+        tally['scanned_verses'] += 1
+        tally['score_sum'] += verse_data.get('score') or 0
+        broken = False
+        for shatr, hemistich in enumerate(HEMISTICHS):
+            for foot in verse_data.get(f'{hemistich}_analysis') or ():
+                position = foot.get('foot_index', 0)
+                status = foot.get('status', 'unknown')
+                counts = tally['feet'][hemistich].get(position)
+                if counts is None:
+                    counts = tally['feet'][hemistich][position] = {'status': Counter(), 'zihaf': Counter()}
+                counts['status'][status] += 1
+                if status in BROKEN_STATUSES:
+                    broken = True
+                elif status == 'ok':
+                    # Only a foot that scans shows which form the poet used
+                    pattern = foot.get('expected_pattern', '')
+                    counts['zihaf'][(names or {}).get((shatr, position, pattern), pattern)] += 1
+        tally['broken_verses'] += broken
+
+    def merge(self, other: 'CorpusStats') -> None:
+        """Add the counts of another CorpusStats to this one"""
+        self.poems += other.poems
+        self.failed_poems += other.failed_poems
+        for meter, theirs in other.meters.items():
+            ours = self.meters.setdefault(meter, _meter_tally())
+            for key in ('poems', 'verses', 'scanned_verses', 'broken_verses', 'score_sum'):
+                ours[key] += theirs[key]
+            for hemistich in HEMISTICHS:
+                for position, counts in theirs['feet'][hemistich].items():
+                    mine = ours['feet'][hemistich].setdefault(
+                        position, {'status': Counter(), 'zihaf': Counter()}
+                    )
+                    mine['status'].update(counts['status'])
+                    mine['zihaf'].update(counts['zihaf'])
+
+    def _tally(self, meter: Optional[str]) -> Dict[str, Any]:
+        key = (meter or 'unknown').lower()
+        tally = self.meters.get(key)
+        if tally is None:
+            tally = self.meters[key] = _meter_tally()
+        return tally
+
+    def summary(self) -> Dict[str, Any]:
+        """Totals and per-meter distribution, broken-verse rate and foot histograms"""
+        verses = sum(tally['verses'] for tally in self.meters.values())
+        scanned = sum(tally['scanned_verses'] for tally in self.meters.values())
+        broken = sum(tally['broken_verses'] for tally in self.meters.values())
+        by_meter = {}
+        for meter, tally in sorted(self.meters.items(), key=lambda item: (-item[1]['verses'], item[0])):
+            by_meter[meter] = {
+                'meter_ar': meters.translate(meter),
+                'poems': tally['poems'],
+                'verses': tally['verses'],
+                'share': round(tally['verses'] / verses, 4) if verses else 0.0,
+                'broken_verses': tally['broken_verses'],
+                'broken_rate': _rate(tally['broken_verses'], tally['scanned_verses']),
+                'mean_score': _rate(tally['score_sum'], tally['scanned_verses']),
+                'feet': {
+                    hemistich: [
+                        {
+                            'position': position,
+                            'status': dict(counts['status'].most_common()),
+                            'zihaf': dict(counts['zihaf'].most_common())
+                        }
+                        for position, counts in sorted(tally['feet'][hemistich].items())
+                    ]
+                    for hemistich in HEMISTICHS
+                }
+            }
+        return {
+            'poems': self.poems,
+            'failed_poems': self.failed_poems,
+            'verses': verses,
+            'scanned_verses': scanned,
+            'broken_verses': broken,
+            'broken_rate': _rate(broken, scanned),
+            'meters': by_meter
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Raw counts, JSON-serializable (e.g. for a checkpoint)"""
+        return {'poems': self.poems, 'failed_poems': self.failed_poems, 'meters': self.meters}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'CorpusStats':
+        """Rebuild a CorpusStats from to_dict() output, also after a JSON round trip"""
+        stats = cls()
+        stats.poems = data.get('poems', 0)
+        stats.failed_poems = data.get('failed_poems', 0)
+        for meter, tally in data.get('meters', {}).items():
+            restored = dict(tally, feet={hemistich: {} for hemistich in HEMISTICHS})
+            for hemistich in HEMISTICHS:
+                for position, counts in tally['feet'][hemistich].items():
+                    restored['feet'][hemistich][int(position)] = {
+                        'status': Counter(counts['status']),
+                        'zihaf': Counter(counts['zihaf'])
+                    }
+            stats.meters[meter] = restored
+        return stats
+
+
+def _rate(part: float, whole: int) -> float:
+    return round(part / whole, 4) if whole else 0.0
+
@@ -0,0 +1,349 @@
+"""
+Background analysis jobs backed by a SQLite job store
+"""
+import json
+import multiprocessing
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import closing
+from typing import Any, Callable, Dict, List, Optional
+
+
+# Service instance owned by each job worker process
+_worker_service = None
+
+# Verses written to the store per transaction while a job runs
+RESULT_FLUSH_SIZE = 10
+
+# Error of a running job whose process went away
+INTERRUPTED = 'Job interrupted by a server restart; submit the poem again'
+
+
+def _process_alive(pid: Optional[int]) -> bool:
+    """Whether a process with this pid still runs on this host"""
+    if pid is None:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class JobStore:
+    """
+    SQLite-backed storage for jobs and their per-verse results
+
+    Every operation opens its own connection, so a store can be shared by
+    request threads, worker processes and separate gunicorn workers. Each
+    job records the pid of the process that queued it (owner), so jobs
+    left behind by a process that died can be found.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS jobs (
+            id TEXT PRIMARY KEY,
+            status TEXT NOT NULL,
+            created_at REAL NOT NULL,
+            updated_at REAL NOT NULL,
+            input TEXT NOT NULL,
+            verse_count INTEGER,
+            verses_done INTEGER NOT NULL DEFAULT 0,
+            bahr TEXT,
+            meter_ar TEXT,
+            error TEXT,
+            options TEXT,
+            owner INTEGER
+        );
+        CREATE TABLE IF NOT EXISTS job_results (
+            job_id TEXT NOT NULL,
+            verse_number INTEGER NOT NULL,
+            data TEXT NOT NULL,
+            PRIMARY KEY (job_id, verse_number)
+        );
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.executescript(self.SCHEMA)
+            # Stores created before options and owner existed
+            columns = {row['name'] for row in conn.execute('PRAGMA table_info(jobs)')}
+            for column, kind in (('options', 'TEXT'), ('owner', 'INTEGER')):
+                if column not in columns:
+                    conn.execute(f'ALTER TABLE jobs ADD COLUMN {column} {kind}')
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def create(self, verses: List[str], options: Optional[Dict[str, Any]] = None,
+               owner: Optional[int] = None) -> str:
+        """Store a new queued job and return its id"""
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                'INSERT INTO jobs (id, status, created_at, updated_at, input, options, owner) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (job_id, 'queued', now, now, json.dumps(verses, ensure_ascii=False),
+                 json.dumps(options or {}), owner)
+            )
+        return job_id
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Return the job's status and progress, or None if unknown"""
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                'SELECT id, status, created_at, updated_at, verse_count, verses_done, bahr, meter_ar, error '
+                'FROM jobs WHERE id = ?',
+                (job_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        job['progress'] = (
+            round(job['verses_done'] / job['verse_count'], 4) if job['verse_count'] else 0.0
+        )
+        return job
+
+    def get_input(self, job_id: str) -> List[str]:
+        """Return the verses submitted with the job"""
+        with closing(self._connect()) as conn:
+            row = conn.execute('SELECT input FROM jobs WHERE id = ?', (job_id,)).fetchone()
+        return json.loads(row['input']) if row else []
+
+    def get_options(self, job_id: str) -> Dict[str, Any]:
+        """Return the analysis options submitted with the job"""
+        with closing(self._connect()) as conn:
+            row = conn.execute('SELECT options FROM jobs WHERE id = ?', (job_id,)).fetchone()
+        return json.loads(row['options']) if row and row['options'] else {}
+
+    def orphaned(self, alive: Callable[[Optional[int]], bool] = _process_alive) -> List[Dict[str, Any]]:
+        """Return the queued and running jobs whose owner process is gone"""
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT id, status, owner FROM jobs WHERE status IN ('queued', 'running')"
+            ).fetchall()
+        return [dict(row) for row in rows if not alive(row['owner'])]
+
+    def claim(self, job_id: str, owner: int, previous: Optional[int]) -> bool:
+        """Make owner the job's owner, unless another process took it from previous first"""
+        with closing(self._connect()) as conn, conn:
+            return conn.execute(
+                'UPDATE jobs SET owner = ?, updated_at = ? WHERE id = ? AND owner IS ?',
+                (owner, time.time(), job_id, previous)
+            ).rowcount == 1
+
+    def update(self, job_id: str, **fields: Any) -> None:
+        """Set job columns (status, verse_count, bahr, meter_ar, error)"""
+        columns = ', '.join(f'{name} = ?' for name in fields)
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                f'UPDATE jobs SET {columns}, updated_at = ? WHERE id = ?',
+                (*fields.values(), time.time(), job_id)
+            )
+
+    def add_results(self, job_id: str, verses: List[Dict[str, Any]]) -> None:
+        """Append analysed verses and advance the job's progress"""
+        with closing(self._connect()) as conn, conn:
+            # Numbered by position: verse_number is not part of every view
+            done = conn.execute('SELECT verses_done FROM jobs WHERE id = ?', (job_id,)).fetchone()[0]
+            conn.executemany(
+                'INSERT OR REPLACE INTO job_results (job_id, verse_number, data) VALUES (?, ?, ?)',
+                [(job_id, done + number, json.dumps(verse, ensure_ascii=False))
+                 for number, verse in enumerate(verses, 1)]
+            )
+            conn.execute(
+                'UPDATE jobs SET verses_done = verses_done + ?, updated_at = ? WHERE id = ?',
+                (len(verses), time.time(), job_id)
+            )
+
+    def clear_results(self, job_id: str) -> None:
+        """Drop the job's analysed verses and reset its progress"""
+        with closing(self._connect()) as conn, conn:
+            conn.execute('DELETE FROM job_results WHERE job_id = ?', (job_id,))
+            conn.execute('UPDATE jobs SET verses_done = 0, updated_at = ? WHERE id = ?', (time.time(), job_id))
+
+    def results(self, job_id: str, offset: int, limit: int) -> List[Dict[str, Any]]:
+        """Return a page of analysed verses ordered by verse number"""
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                'SELECT data FROM job_results WHERE job_id = ? ORDER BY verse_number LIMIT ? OFFSET ?',
+                (job_id, limit, offset)
+            ).fetchall()
+        return [json.loads(row['data']) for row in rows]
+
+    def purge(self, older_than: float) -> int:
+        """Delete jobs last updated before the given timestamp"""
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                'DELETE FROM job_results WHERE job_id IN (SELECT id FROM jobs WHERE updated_at < ?)',
+                (older_than,)
+            )
+            return conn.execute('DELETE FROM jobs WHERE updated_at < ?', (older_than,)).rowcount
+
+
+def _init_worker(warmup: bool, prefix=None) -> None:
+    """Build a PyArudService and its processor in the worker process"""
+    global _worker_service
+    from app.services.cache import ResultCache
+    from app.services.processor_pool import ProcessorProvider
+    from app.services.pyarud_service import PyArudService
+
+    _worker_service = PyArudService(
+        cache=ResultCache(max_size=0),
+        processors=ProcessorProvider(warmup=warmup),
+        prefix=prefix
+    )
+    _worker_service.processors.preload()
+
+
+def _run_job(db_path: str, job_id: str) -> None:
+    """Analyze a stored job, writing progress and results back to the store"""
+    store = JobStore(db_path)
+    store.update(job_id, status='running')
+    try:
+        pending, written = [], False
+        for event in _worker_service.iter_analysis(store.get_input(job_id), **store.get_options(job_id)):
+            if event['event'] == 'meter':
+                # With prefix detection a second meter supersedes the verses before it
+                if written:
+                    store.clear_results(job_id)
+                pending, written = [], False
+                store.update(
+                    job_id, bahr=event['bahr'], meter_ar=event['meter_ar'], verse_count=event['verse_count']
+                )
+            elif event['event'] == 'verse':
+                pending.append(event['data'])
+                if len(pending) >= RESULT_FLUSH_SIZE:
+                    store.add_results(job_id, pending)
+                    pending, written = [], True
+        if pending:
+            store.add_results(job_id, pending)
+        store.update(job_id, status='completed')
+    except Exception as err:
+        store.update(job_id, status='failed', error=str(err))
+
+
+class JobManager:
+    """
+    Queues jobs in the store and runs them on a background process pool
+
+    The first time a process uses the store, it takes over the jobs of
+    processes that are gone (a restart, a crash, a recycled worker): queued
+    jobs are queued again, running ones are failed with INTERRUPTED.
+    """
+
+    def __init__(self, service=None, db_path: Optional[str] = None, max_workers: int = 2,
+                 start_method: str = 'spawn', warmup: bool = False, retention: float = 0):
+        """
+        Args:
+            service: PyArudService whose prefix detection settings the workers use
+                (default: PrefixDetection's defaults)
+            db_path: SQLite file for the job store (created on first use)
+            max_workers: Background worker processes
+            start_method: multiprocessing start method for the workers
+            warmup: Warm each worker's processor on startup
+            retention: Seconds finished jobs are kept (0 keeps them forever)
+        """
+        self.service = service
+        self.db_path = db_path
+        self.max_workers = max_workers
+        self.start_method = start_method
+        self.warmup = warmup
+        self.retention = retention
+        self._store: Optional[JobStore] = None
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def init_app(self, app) -> None:
+        """Configure the manager from the Flask application config"""
+        self.shutdown()
+        self.db_path = app.config.get('JOB_DB_PATH') or os.path.join(app.instance_path, 'jobs.sqlite3')
+        self.max_workers = app.config.get('JOB_WORKERS', 2)
+        self.start_method = app.config.get('JOB_START_METHOD', 'spawn')
+        self.warmup = app.config.get('PROCESSOR_WARMUP', False)
+        self.retention = app.config.get('JOB_RETENTION_SECONDS', 0)
+        self._store = None
+
+    @property
+    def store(self) -> JobStore:
+        with self._lock:
+            opened = self._store is None
+            if opened:
+                self._store = JobStore(self.db_path)
+            store = self._store
+        if opened:
+            self.recover(store)
+        return store
+
+    def recover(self, store: JobStore) -> Dict[str, int]:
+        """Take over the orphaned jobs of the store, returning how many were requeued and failed"""
+        recovered = {'requeued': 0, 'failed': 0}
+        owner = os.getpid()
+        for job in store.orphaned():
+            if not store.claim(job['id'], owner, job['owner']):
+                continue  # another process took it over first
+            if job['status'] == 'queued':
+                self._queue(store, job['id'])
+                recovered['requeued'] += 1
+            else:
+                store.update(job['id'], status='failed', error=INTERRUPTED)
+                recovered['failed'] += 1
+        return recovered
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context(self.start_method),
+                    initializer=_init_worker,
+                    initargs=(self.warmup, self.service.prefix if self.service is not None else None)
+                )
+            return self._executor
+
+    def submit(self, verses: List[str], view: str = 'full', fields: Optional[List[str]] = None,
+               detection: str = 'full', diacritics: str = 'keep') -> str:
+        """Store a job for these verses and analysis options, queue it and return its id"""
+        store = self.store
+        if self.retention:
+            store.purge(time.time() - self.retention)
+        options = {'view': view, 'fields': fields, 'detection': detection, 'diacritics': diacritics}
+        job_id = store.create(verses, options, owner=os.getpid())
+        self._queue(store, job_id)
+        return job_id
+
+    def _queue(self, store: JobStore, job_id: str) -> None:
+        try:
+            future = self._get_executor().submit(_run_job, store.path, job_id)
+        except BrokenProcessPool:
+            # A worker died; start a fresh pool and retry once
+            self.shutdown()
+            future = self._get_executor().submit(_run_job, store.path, job_id)
+        future.add_done_callback(lambda done: self._finished(store, job_id, done))
+
+    @staticmethod
+    def _finished(store: JobStore, job_id: str, future) -> None:
+        # _run_job records its own errors, so an exception here means its worker process died
+        if not future.cancelled() and future.exception() is not None:
+            store.update(job_id, status='failed', error=f'Job worker failed: {future.exception()}')
+
+    def shutdown(self) -> None:
+        """Stop the worker processes, if started"""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
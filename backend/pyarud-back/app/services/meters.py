@@ -0,0 +1,137 @@
+"""
+Meter Registry
+The sixteen Khalilian meters, built once at import and never modified
+"""
+import hashlib
+import json
+import unicodedata
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, NamedTuple, Optional, Tuple
+
+
+# Prosodic template of each foot: 1 = moving letter, 0 = sakin
+FOOT_TEMPLATES: Mapping[str, str] = MappingProxyType({
+    'فعولن': '11010',
+    'فاعلن': '10110',
+    'مفاعيلن': '1101010',
+    'مستفعلن': '1010110',
+    'متفاعلن': '1110110',
+    'مفاعلتن': '1101110',
+    'فاعلاتن': '1011010',
+    'مفعولات': '1010101',
+    'مفتعلن': '101110',
+    'مفعلات': '101101',
+})
+
+
+class Meter(NamedTuple):
+    """One meter and the ways clients may refer to it"""
+    key: str                 # pyarud meter name
+    name_ar: str
+    name_en: str
+    feet: Tuple[str, ...]    # feet of one hemistich
+    pattern: str             # feet joined with spaces
+    template: str            # binary template of one hemistich
+    aliases: Tuple[str, ...]
+
+
+# (pyarud key, Arabic name, English name, hemistich feet, extra aliases)
+_DEFINITIONS = (
+    ('taweel', 'الطويل', 'Tawil', ('فعولن', 'مفاعيلن', 'فعولن', 'مفاعيلن'), ('tawil',)),
+    ('madeed', 'المديد', 'Madid', ('فاعلاتن', 'فاعلن', 'فاعلاتن'), ('madid',)),
+    ('baseet', 'البسيط', 'Basit', ('مستفعلن', 'فاعلن', 'مستفعلن', 'فاعلن'), ('basit',)),
+    ('wafer', 'الوافر', 'Wafir', ('مفاعلتن', 'مفاعلتن', 'فعولن'), ('wafir',)),
+    ('kamel', 'الكامل', 'Kamil', ('متفاعلن', 'متفاعلن', 'متفاعلن'), ('kamil', 'kāmil')),
+    ('hazaj', 'الهزج', 'Hazaj', ('مفاعيلن', 'مفاعيلن'), ()),
+    ('rajaz', 'الرجز', 'Rajaz', ('مستفعلن', 'مستفعلن', 'مستفعلن'), ()),
+    ('ramal', 'الرمل', 'Ramal', ('فاعلاتن', 'فاعلاتن', 'فاعلاتن'), ()),
+    ('saree', 'السريع', "Sari'", ('مستفعلن', 'مستفعلن', 'فاعلن'), ('sari', 'sarea')),
+    ('munsareh', 'المنسرح', 'Munsarih', ('مستفعلن', 'مفعولات', 'مفتعلن'), ('munsarih',)),
+    ('khafeef', 'الخفيف', 'Khafif', ('فاعلاتن', 'مستفعلن', 'فاعلاتن'), ('khafif',)),
+    ('mudhare', 'المضارع', "Mudari'", ('مفاعيلن', 'فاعلاتن'), ('mudari', 'mudarae')),
+    ('muqtadheb', 'المقتضب', 'Muqtadab', ('مفعلات', 'مستفعلن'), ('muqtadab',)),
+    ('mujtath', 'المجتث', 'Mujtath', ('مستفعلن', 'فاعلاتن'), ('mujtathth',)),
+    ('mutakareb', 'المتقارب', 'Mutaqarib', ('فعولن', 'فعولن', 'فعولن', 'فعولن'), ('mutaqarib', 'mutaqareb')),
+    ('mutadarak', 'المتدارك', 'Mutadarik', ('فاعلن', 'فاعلن', 'فاعلن', 'فاعلن'), ('mutadarik', 'mutadarek', 'khabab')),
+)
+
+
+def normalize(name: str) -> str:
+    """
+    Fold a meter name to its lookup key
+
+    Case, Latin accents, Arabic diacritics and tatweel, separators and the
+    Arabic definite article are ignored, so 'Kāmil', 'KAMIL', 'الكامل' and
+    'كامل' all normalize to a key of the same meter.
+    """
+    decomposed = unicodedata.normalize('NFKD', name.strip())
+    folded = ''.join(
+        char for char in decomposed
+        if not unicodedata.combining(char) and char not in " -_'ـ"
+    ).casefold()
+    return folded[2:] if folded.startswith('ال') else folded
+
+
+def _build():
+    meters = {}
+    index = {}
+    for key, name_ar, name_en, feet, extra in _DEFINITIONS:
+        meter = Meter(
+            key=key,
+            name_ar=name_ar,
+            name_en=name_en,
+            feet=feet,
+            pattern=' '.join(feet),
+            template=''.join(FOOT_TEMPLATES[foot] for foot in feet),
+            aliases=(key, name_ar, name_en) + extra
+        )
+        meters[key] = meter
+        for alias in meter.aliases:
+            # Exact spellings hit the index without normalizing
+            index[alias] = meter
+            index[normalize(alias)] = meter
+    return MappingProxyType(meters), MappingProxyType(index)
+
+
+METERS, _INDEX = _build()
+
+
+def lookup(name: str) -> Optional[Meter]:
+    """Return the meter for any key, Arabic/English name or alias, or None"""
+    meter = _INDEX.get(name)
+    if meter is None and isinstance(name, str):
+        meter = _INDEX.get(normalize(name))
+    return meter
+
+
+def translate(name: str) -> str:
+    """Return the Arabic name of a meter, or the name unchanged if it is unknown"""
+    meter = lookup(name)
+    return meter.name_ar if meter else name
+
+
+def _info(meter: Meter) -> Dict[str, Any]:
+    return {
+        'key': meter.key,
+        'name': meter.name_ar,
+        'name_en': meter.name_en,
+        'feet': list(meter.feet),
+        'pattern': meter.pattern,
+        'template': meter.template,
+        'aliases': list(meter.aliases)
+    }
+
+
+# API payloads, shared by every request: callers must not modify them
+INFO: Mapping[str, Dict[str, Any]] = MappingProxyType({key: _info(meter) for key, meter in METERS.items()})
+CATALOG: Tuple[Dict[str, Any], ...] = tuple(INFO.values())
+
+
+def _etag(payload: Any) -> str:
+    canonical = json.dumps(payload, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()[:32]
+
+
+# Strong validators: they only change when the registry itself does
+ETAGS: Mapping[str, str] = MappingProxyType({key: _etag(info) for key, info in INFO.items()})
+CATALOG_ETAG = _etag(CATALOG)
@@ -0,0 +1,122 @@
+"""
+Arabic text normalization
+Folds the spellings of a verse that scan identically into one text, so the
+processor input and the poem cache key do not depend on how it was typed
+"""
+import re
+import unicodedata
+from typing import Dict, Iterable, List, Optional, Pattern, Tuple, Union
+
+
+# What happens to diacritics (harakat, tanwin, shadda, sukun, dagger alef):
+# 'keep' analyses and keys the verse as vocalised, 'strip' removes them from
+# both, so every vocalisation of a verse shares one analysis
+DIACRITICS_MODES = ('keep', 'strip')
+
+# Joins the hemistichs of a poem so it is normalized with one translate call;
+# a noncharacter that the tables and NFC leave alone
+BULK_SEPARATOR = '\uffff'
+
+# Dropped: tatweel, soft hyphen, Arabic letter mark, zero-width characters,
+# directional marks, embeddings and isolates, word joiner and BOM
+IGNORED = (
+    0x00AD, 0x061C, 0x0640, *range(0x200B, 0x2010), *range(0x202A, 0x202F),
+    *range(0x2060, 0x2065), *range(0x2066, 0x206A), 0xFEFF
+)
+
+# Other code points for the same letter; the hamza forms are kept apart
+# since the processor tells hamzat al-wasl (bare alef) from a written hamza
+LETTER_VARIANTS = {
+    0x0671: 'ا',  # alef wasla
+    0x0672: 'أ',  # alef with wavy hamza above
+    0x0673: 'إ',  # alef with wavy hamza below
+    0x06A9: 'ك',  # keheh
+    0x06AA: 'ك',  # swash kaf
+    0x06C1: 'ه',  # heh goal
+    0x06CC: 'ي',  # farsi yeh
+}
+
+# Code points given an identity entry in the tables: str.translate raises
+# and catches a KeyError for every character missing from a dict, which
+# made translating Arabic text three times slower
+IDENTITY_RANGES = (range(0x0000, 0x0800), range(0x2000, 0x2070), range(0xFB50, 0xFF00))
+
+# Removed in 'strip' mode. Combining madda and hamza (U+0653-U+0655) are
+# letter parts, composed with their alef, waw or yeh by NFC instead.
+DIACRITICS = (*range(0x064B, 0x0653), *range(0x0656, 0x0660), 0x0670)
+
+
+def _build_table(strip_diacritics: bool) -> Tuple[Dict[int, Union[int, str, None]], Pattern]:
+    """The translate table of a mode and a pattern matching the characters it changes"""
+    table: Dict[int, Union[int, str, None]] = dict.fromkeys(IGNORED)
+    table.update(
+        (code, ' ') for code in range(0x3001)
+        if chr(code).isspace() and code != 0x20 and code not in table
+    )
+    table.update(LETTER_VARIANTS)
+    if strip_diacritics:
+        table.update(dict.fromkeys(DIACRITICS))
+
+    # Presentation forms (ligatures such as lam-alef, isolated and final
+    # shapes) become their base letters, normalized in turn
+    base = dict(table)
+    for code in (*range(0xFB50, 0xFE00), *range(0xFE70, 0xFEFF)):
+        expanded = unicodedata.normalize('NFKC', chr(code))
+        if expanded != chr(code):
+            table[code] = expanded.translate(base).strip()
+
+    changed = re.compile('[%s]' % ''.join(re.escape(chr(code)) for code in sorted(table)))
+    for codes in IDENTITY_RANGES:
+        for code in codes:
+            table.setdefault(code, code)
+    return table, changed
+
+
+TABLES, CHANGED = {}, {}
+for _mode in DIACRITICS_MODES:
+    TABLES[_mode], CHANGED[_mode] = _build_table(strip_diacritics=_mode == 'strip')
+
+
+def check_mode(diacritics: str) -> None:
+    """Raise ValueError for an unknown diacritics mode"""
+    if diacritics not in TABLES:
+        raise ValueError(f"Unknown diacritics mode '{diacritics}'. Use one of: {', '.join(DIACRITICS_MODES)}")
+
+
+def normalize_text(text: str, diacritics: str = 'keep') -> str:
+    """
+    Normalize one hemistich
+
+    Drops tatweel and invisible formatting characters, folds letter and
+    presentation-form variants, composes decomposed hamza and madda, orders
+    stacked diacritics canonically (NFC) and collapses whitespace.
+    """
+    check_mode(diacritics)
+    return ' '.join(unicodedata.normalize('NFC', _translate(text, diacritics)).split())
+
+
+def _translate(text: str, diacritics: str) -> str:
+    # Clean text, the common case, is only searched, about ten times faster
+    if CHANGED[diacritics].search(text) is None:
+        return text
+    return text.translate(TABLES[diacritics])
+
+
+def normalize_pairs(
+    pairs: Iterable[Tuple[str, str]], diacritics: str = 'keep'
+) -> List[Tuple[str, str]]:
+    """Normalize every (sadr, ajuz) pair of a poem, joined into one text"""
+    check_mode(diacritics)
+    flat = [part for pair in pairs for part in pair]
+    text = unicodedata.normalize('NFC', _translate(BULK_SEPARATOR.join(flat), diacritics))
+    parts = text.split(BULK_SEPARATOR)
+    if len(parts) != len(flat):
+        # A hemistich contained the separator itself
+        parts = [normalize_text(part, diacritics) for part in flat]
+    elif (
+        '  ' in text or ' ' + BULK_SEPARATOR in text or BULK_SEPARATOR + ' ' in text
+        or text.startswith(' ') or text.endswith(' ')
+    ):
+        # Every whitespace character is a space by now
+        parts = [' '.join(part.split()) for part in parts]
+    return list(zip(parts[0::2], parts[1::2]))
@@ -0,0 +1,149 @@
+"""
+Lifecycle management for pyarud's ArudhProcessor
+"""
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+
+# Verse scanned against every meter while warming a processor
+WARMUP_VERSE = ('يا ليلُ الصَّبُّ متى غَدُهُ', 'أقيامُ الساعةِ مَوْعِدُهُ')
+
+
+def arudh_processor():
+    """Build pyarud's ArudhProcessor, importing pyarud on first use"""
+    from pyarud.processor import ArudhProcessor
+    return ArudhProcessor()
+
+
+class ProcessorProvider:
+    """
+    Pool of warmed ArudhProcessor instances
+
+    Building a processor precomputes the pattern tables of every meter, so
+    instances are built once and reused across requests. A processor is
+    leased to a single thread at a time and returned to the pool afterwards;
+    a new one is only built when every existing instance is in use. This
+    keeps a single-threaded worker on one processor while remaining safe
+    under threaded servers.
+
+    Requests never wait for a warm-up: a processor built for a request is
+    not warmed, and preload's warm-up stops as soon as a request is waiting
+    for a processor. preload(background=True) builds the first processor in
+    a thread, so the server starts at once; a request arriving meanwhile
+    waits for that build instead of starting a second one.
+    """
+
+    def __init__(self, factory: Optional[Callable[[], Any]] = None, warmup: bool = True):
+        """
+        Args:
+            factory: Callable returning a new processor (default: arudh_processor)
+            warmup: Scan WARMUP_VERSE against every meter after construction
+        """
+        self.factory = factory or arudh_processor
+        self.warmup = warmup
+        self._idle: List[Any] = []
+        self._lock = threading.Condition()
+        self._preloading: Optional[int] = None  # pid of the process running a background preload
+        self._waiting = 0  # leases waiting for a processor
+        self.instances = 0
+        self.leases = 0
+        self.build_seconds = 0.0
+        self.warmup_seconds = 0.0
+        self.warmed_meters = 0
+
+    @contextmanager
+    def lease(self) -> Iterator[Any]:
+        """Borrow a processor for the duration of the with-block"""
+        with self._lock:
+            self._waiting += 1
+            try:
+                while not self._idle and self._preloading == os.getpid():
+                    self._lock.wait()
+            finally:
+                self._waiting -= 1
+            processor = self._idle.pop() if self._idle else None
+            self.leases += 1
+        if processor is None:
+            # Not warmed: the request builds what it needs as it scans
+            processor = self._build(warmup=False)
+        try:
+            yield processor
+        finally:
+            with self._lock:
+                self._idle.append(processor)
+
+    def preload(self, background: bool = False) -> None:
+        """
+        Build and warm one processor ahead of the first request
+
+        Args:
+            background: Build it in a daemon thread and return at once
+        """
+        with self._lock:
+            if self._idle or self.instances or self._preloading == os.getpid():
+                return
+            if background:
+                self._preloading = os.getpid()
+        if background:
+            threading.Thread(target=self._preload, name='processor-preload', daemon=True).start()
+        else:
+            self._preload()
+
+    def _preload(self) -> None:
+        try:
+            processor = self._build(warmup=self.warmup)
+            with self._lock:
+                self._idle.append(processor)
+        finally:
+            with self._lock:
+                self._preloading = None
+                self._lock.notify_all()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until a background preload has finished; returns False on timeout"""
+        with self._lock:
+            return self._lock.wait_for(lambda: self._preloading != os.getpid(), timeout)
+
+    @property
+    def is_warm(self) -> bool:
+        """Whether at least one built processor is available"""
+        return self.instances > 0
+
+    def _build(self, warmup: bool):
+        started = time.perf_counter()
+        processor = self.factory()
+        built = time.perf_counter()
+
+        warmed_meters = 0
+        if warmup:
+            for meter_name in getattr(processor, 'meter_classes', {}):
+                if self._waiting:
+                    break  # a request needs this processor now
+                processor.process_poem([WARMUP_VERSE], meter_name=meter_name)
+                warmed_meters += 1
+        finished = time.perf_counter()
+
+        with self._lock:
+            self.instances += 1
+            self.build_seconds += built - started
+            self.warmup_seconds += finished - built
+            self.warmed_meters = max(self.warmed_meters, warmed_meters)
+        return processor
+
+    def stats(self) -> Dict[str, Any]:
+        """Return warm state and construction timings"""
+        with self._lock:
+            return {
+                'warm': self.instances > 0,
+                'preloading': self._preloading is not None,
+                'instances': self.instances,
+                'idle': len(self._idle),
+                'leases': self.leases,
+                'warmup_enabled': self.warmup,
+                'warmed_meters': self.warmed_meters,
+                'build_seconds': round(self.build_seconds, 4),
+                'warmup_seconds': round(self.warmup_seconds, 4)
+            }
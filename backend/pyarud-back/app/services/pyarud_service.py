@@ -1,161 +1,578 @@
-from typing import Dict, List, Any
-from pyarud.processor import ArudhProcessor
+import hashlib
+from collections import Counter
+from typing import Dict, Iterator, List, Any, NamedTuple, Optional, Tuple
+from app.metrics import StageTimer, stage
+from app.services import meters
+from app.services.cache import ResultCache
+from app.services.corpus_stats import CorpusStats, zihaf_names
+from app.services.normalization import normalize_pairs
+from app.services.segmenter import split_verses
+from app.services.supervisor import AnalysisCancelled, AnalysisTimeout, check_budget
+from app.services.validation import diagnose_verse
+from app.services.processor_pool import ProcessorProvider
+
+
+# Every field a verse entry can carry, in output order
+VERSE_FIELDS = (
+    'verse_number', 'original_verse', 'sadr', 'ajuz', 'bahr',
+    'tafila', 'zihaaf', 'is_valid', 'status', 'score', 'details'
+)
+
+# Verse fields built for each response view; 'full' is the original payload
+VIEWS = {
+    'compact': ('verse_number', 'sadr', 'ajuz', 'is_valid', 'status', 'score'),
+    'standard': (
+        'verse_number', 'original_verse', 'sadr', 'ajuz', 'bahr',
+        'tafila', 'zihaaf', 'is_valid', 'status', 'score'
+    ),
+    'full': (
+        'verse_number', 'original_verse', 'sadr', 'ajuz', 'bahr',
+        'tafila', 'zihaaf', 'is_valid', 'status', 'details'
+    ),
+}
+
+# How the bahr is found: 'full' votes with every verse, 'prefix' with the first few
+DETECTION_MODES = ('full', 'prefix')
+
+
+class PrefixDetection(NamedTuple):
+    """Settings of prefix meter detection"""
+    verses: int = 5           # verses that vote on the meter
+    confidence: float = 0.6   # share of those votes needed to lock the meter
+    fail_score: float = 0.6   # a verse scoring below this under the locked meter votes too
 
 
 class PyArudService:
     """Service class for PyArud poetry analysis"""
 
-    @staticmethod
-    def analyze_poem(verses: List[str]) -> Dict[str, Any]:
-        if not verses or not isinstance(verses, list):
-            raise ValueError("Verses must be a non-empty list")
+    def __init__(
+        self,
+        cache: Optional[ResultCache] = None,
+        verse_cache: Optional[ResultCache] = None,
+        processors: Optional[ProcessorProvider] = None,
+        prefix: Optional[PrefixDetection] = None
+    ):
+        self.cache = cache if cache is not None else ResultCache()
+        self.verse_cache = verse_cache if verse_cache is not None else ResultCache(max_size=4096)
+        self.processors = processors if processors is not None else ProcessorProvider()
+        self.prefix = prefix if prefix is not None else PrefixDetection()
 
-        # Filter out empty verses
-        verses = [v.strip() for v in verses if v.strip()]
-        if not verses:
-            raise ValueError("No valid verses provided")
+    def init_app(self, app) -> None:
+        """Configure the service from the Flask application config"""
+        self.cache = ResultCache(
+            max_size=app.config.get('ANALYSIS_CACHE_SIZE', 256),
+            ttl=app.config.get('ANALYSIS_CACHE_TTL')
+        )
+        self.verse_cache = ResultCache(
+            max_size=app.config.get('VERSE_CACHE_SIZE', 4096),
+            ttl=app.config.get('ANALYSIS_CACHE_TTL')
+        )
+        self.processors = ProcessorProvider(warmup=app.config.get('PROCESSOR_WARMUP', False))
+        self.prefix = PrefixDetection(
+            verses=app.config.get('METER_PREFIX_VERSES', 5),
+            confidence=app.config.get('METER_PREFIX_CONFIDENCE', 0.6),
+            fail_score=app.config.get('METER_FAIL_SCORE', 0.6)
+        )
+        if app.config.get('PROCESSOR_PRELOAD', True):
+            # Build and warm a processor before the first request
+            self.processors.preload(background=app.config.get('PROCESSOR_PRELOAD_BACKGROUND', False))
+
+    def analyze_poem(
+        self, verses: List[str], view: str = 'full', fields: Optional[List[str]] = None,
+        detection: str = 'full', diacritics: str = 'keep'
+    ) -> Dict[str, Any]:
+        """
+        Analyze a poem
+
+        Args:
+            verses: Input lines, one verse (or hemistich) per line
+            view: Response view, see VIEWS
+            fields: Verse fields to build, overriding view
+            detection: 'full' finds the bahr from every verse; 'prefix' finds it
+                from the first few, scans the rest against it alone and falls
+                back to 'full' when the prefix is inconclusive or later verses
+                disagree. Prefix results carry a 'detection' summary.
+            diacritics: 'keep' analyses the verses as vocalised; 'strip' drops
+                their diacritics first, so every vocalisation of a verse
+                shares one cached analysis
+        """
+        selected = self.resolve_fields(view, fields)
+        self._check_detection(detection)
+        with stage('split'):
+            poem_verses = self._prepare_verses(verses, diacritics)
+        return self._analyze_pairs(poem_verses, self._poem_key(poem_verses), selected, detection)
+
+    def analyze_digest(
+        self, digest: str, view: str = 'full', fields: Optional[List[str]] = None,
+        detection: str = 'full'
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Analyze a previously submitted poem addressed by its content hash
+
+        Returns:
+            The analysis, or None if the poem is no longer remembered
+        """
+        selected = self.resolve_fields(view, fields)
+        self._check_detection(detection)
+        cached = self.cache.get(self._result_key(digest, selected, detection))
+        if cached is not None:
+            return cached
+        poem_verses = self.verse_cache.get(('poem', digest))
+        if poem_verses is None:
+            return None
+        return self._analyze_pairs(poem_verses, digest, selected, detection)
+
+    def _analyze_pairs(
+        self, poem_verses: List[Tuple[str, str]], digest: str, selected: Tuple[str, ...],
+        detection: str = 'full'
+    ) -> Dict[str, Any]:
+        with stage('cache_lookup'):
+            cache_key = self._result_key(digest, selected, detection)
+            cached = self.cache.get(cache_key)
+        if cached is not None:
+            return cached
 
         try:
-            processor = ArudhProcessor()
-            poem_verses = []
-
-            i = 0
-            while i < len(verses):
-                verse = verses[i].strip()
-                parts = None
-                for separator in ['***', '،', '،،', '  ']:
-                    if separator in verse:
-                        parts = verse.split(separator, 1)
-                        if len(parts) == 2:
-                            poem_verses.append((parts[0].strip(), parts[1].strip()))
-                            break
-                if not parts:
-                    if i + 1 < len(verses):
-                        poem_verses.append((verse, verses[i + 1].strip()))
-                        i += 1
-                    else:
-                        poem_verses.append((verse, verse))
-                i += 1
-
-            # Process the poem
-            analysis = processor.process_poem(poem_verses)
-
-            # Normalize meter name for robustness
-            meter_en = (analysis.get('meter') or 'unknown').lower()
-            results = {
-                'bahr': meter_en,
-                'meter_ar': PyArudService._translate_meter(meter_en),
-                'verses_analysis': []
+            with stage('process_poem'), self.processors.lease() as processor:
+                meter, verse_details, summary = self._scan_poem(processor, poem_verses, detection)
+
+            with stage('shape'):
+                results = self._empty_results(meter, summary)
+
+                # Process each verse
+                for idx, (pair, verse_data) in enumerate(verse_details, 1):
+                    results['verses_analysis'].append(
+                        self._shape_verse(idx, pair, verse_data, results['meter_ar'], selected)
+                    )
+
+        except (AnalysisTimeout, AnalysisCancelled):
+            raise
+        except Exception as e:
+            raise Exception(f"PyArud analysis failed: {str(e)}")
+
+        self.cache.set(cache_key, results)
+        # Keep the verses so the result can be rebuilt from its digest alone
+        self.verse_cache.set(('poem', digest), poem_verses)
+        return results
+
+    def _scan_verses(
+        self, processor, poem_verses: List[Tuple[str, str]]
+    ) -> Tuple[Optional[str], List[Tuple[Tuple[str, str], Dict]]]:
+        """
+        Detect the poem meter and scan every verse against it
+
+        Returns:
+            Tuple of (meter name or None, [(verse pair, pyarud details), ...])
+        """
+        meter, verse_details, _ = self._scan_poem(processor, poem_verses)
+        return meter, verse_details
+
+    def _scan_poem(
+        self, processor, poem_verses: List[Tuple[str, str]], detection: str = 'full'
+    ) -> Tuple[Optional[str], List[Tuple[Tuple[str, str], Dict]], Optional[Dict[str, Any]]]:
+        """
+        Collect the events of _iter_detection into its final outcome
+
+        Returns:
+            Tuple of (meter name or None, [(verse pair, pyarud details), ...],
+            prefix detection summary or None)
+        """
+        meter, verse_details, summary = None, [], None
+        for event in self._iter_detection(processor, poem_verses, detection):
+            if event[0] == 'meter':
+                # A later meter restarts the scan
+                _, meter, summary = event
+                verse_details = []
+            else:
+                verse_details.append(event[1:])
+        return meter, verse_details, summary
+
+    def _iter_detection(
+        self, processor, poem_verses: List[Tuple[str, str]], detection: str = 'full'
+    ) -> Iterator[Tuple]:
+        """
+        Find the meter and scan the verses against it
+
+        Yields ('meter', meter, summary) followed by ('verse', pair, details)
+        for each scanned verse. In prefix mode a verse scoring below
+        fail_score votes like the prefix did; if that takes the majority away
+        from the locked meter, a second 'meter' event follows with the fully
+        detected meter and every verse is scanned again.
+        """
+        summary = None
+        if detection == 'prefix':
+            sampled = min(self.prefix.verses, len(poem_verses))
+            votes = self._count_votes(processor, poem_verses[:sampled])
+            locked, confidence = None, 0.0
+            if votes:
+                locked, count = votes.most_common(1)[0]
+                confidence = count / sampled
+            summary = {
+                'mode': 'prefix',
+                'verses_sampled': sampled,
+                'confidence': round(confidence, 4),
+                'rechecked': 0,
+                'fallback': None
             }
 
-            # Process each verse
-            for idx, verse_data in enumerate(analysis.get('verses', []), 1):
-                original_verse = f"{poem_verses[idx-1][0]} *** {poem_verses[idx-1][1]}"
-                tafila_list = []
-                zihaaf_list = []
-                is_broken = False
-
-                # Process sadr
-                if 'sadr' in verse_data:
-                    sadr_feet = verse_data['sadr'].get('feet', [])
-                    for foot in sadr_feet:
-                        tafila_list.append({
-                            'pattern': foot.get('pattern', ''),
-                            'status': foot.get('status', 'unknown'),
-                            'text': foot.get('text', '')
-                        })
-                        if foot.get('status') in ['broken', 'missing']:
-                            is_broken = True
-                        if foot.get('variation'):
-                            zihaaf_list.append(foot.get('variation'))
-
-                # Process ajuz
-                if 'ajuz' in verse_data:
-                    ajuz_feet = verse_data['ajuz'].get('feet', [])
-                    for foot in ajuz_feet:
-                        tafila_list.append({
-                            'pattern': foot.get('pattern', ''),
-                            'status': foot.get('status', 'unknown'),
-                            'text': foot.get('text', '')
-                        })
-                        if foot.get('status') in ['broken', 'missing']:
-                            is_broken = True
-                        if foot.get('variation'):
-                            zihaaf_list.append(foot.get('variation'))
-
-                verse_result = {
-                    'verse_number': idx,
-                    'original_verse': original_verse,
-                    'sadr': poem_verses[idx-1][0],
-                    'ajuz': poem_verses[idx-1][1],
-                    'bahr': results['meter_ar'],
-                    'tafila': tafila_list,
-                    'zihaaf': zihaaf_list,
-                    'is_valid': not is_broken,
-                    'status': 'صحيح' if not is_broken else 'مكسور',
-                    'details': verse_data
-                }
-
-                results['verses_analysis'].append(verse_result)
-
-            return results
+            if locked is not None and confidence >= self.prefix.confidence:
+                yield 'meter', locked, summary
+                overturned = False
+                for pair, verse_data in self._iter_scans(processor, poem_verses, locked):
+                    yield 'verse', pair, verse_data
+                    if verse_data['verse_index'] < sampled:
+                        continue  # already voted
+                    if (verse_data.get('score') or 0) >= self.prefix.fail_score:
+                        continue
+                    summary['rechecked'] += 1
+                    vote = self._vote(processor, pair)
+                    if vote is not None:
+                        votes[vote] += 1
+                    if votes.most_common(1)[0][0] != locked:
+                        overturned = True
+                        break
+                if not overturned:
+                    return
+                summary = dict(summary, fallback='disagreement')
+            else:
+                summary = dict(summary, fallback='low_confidence')
+
+        meter = self._detect_meter(processor, poem_verses)
+        yield 'meter', meter, summary
+        if meter is not None:
+            for pair, verse_data in self._iter_scans(processor, poem_verses, meter):
+                yield 'verse', pair, verse_data
+
+    def _detect_meter(self, processor, poem_verses: List[Tuple[str, str]]) -> Optional[str]:
+        """Return the meter most verses vote for, as process_poem would"""
+        votes = self._count_votes(processor, poem_verses)
+        if not votes:
+            return None
+        return votes.most_common(1)[0][0]
+
+    def _count_votes(self, processor, poem_verses: List[Tuple[str, str]]) -> Counter:
+        """Count the meter each verse is detected in on its own"""
+        votes = Counter()
+        for pair in poem_verses:
+            meter = self._vote(processor, pair)
+            if meter is not None:
+                votes[meter] += 1
+        return votes
+
+    def _vote(self, processor, pair: Tuple[str, str]) -> Optional[str]:
+        """
+        Return the meter one verse is detected in on its own, searching every meter
+
+        Each (sadr, ajuz) pair's vote is memoized, so a resubmitted poem only
+        runs the prosody engine on verses that changed.
+        """
+        meter = self.verse_cache.get(('vote',) + pair)
+        if meter is None:
+            check_budget()
+            single = processor.process_poem([pair])
+            meter = single.get('meter')
+            if not meter:
+                return None
+            self.verse_cache.set(('vote',) + pair, meter)
+            # A verse analysed alone is already scanned against its own meter
+            self.verse_cache.set(('scan', meter) + pair, single['verses'][0])
+        return meter
+
+    def _iter_scans(
+        self, processor, poem_verses: List[Tuple[str, str]], meter: str
+    ) -> Iterator[Tuple[Tuple[str, str], Dict]]:
+        """
+        Scan each verse against meter, yielding (pair, details) as soon as it is ready
+
+        Scans are memoized per (meter, sadr, ajuz); with a forced meter
+        process_poem treats verses independently, so scanning one at a time
+        gives the same result as scanning the whole poem at once.
+        """
+        for i, pair in enumerate(poem_verses):
+            verse_data = self.verse_cache.get(('scan', meter) + pair)
+            if verse_data is None:
+                check_budget()
+                analysis = processor.process_poem([pair], meter_name=meter)
+                if not analysis.get('verses'):
+                    continue
+                verse_data = analysis['verses'][0]
+                self.verse_cache.set(('scan', meter) + pair, verse_data)
+            # Cached scans carry the index of the poem they were computed in
+            yield pair, dict(verse_data, verse_index=i)
+
+    @staticmethod
+    def _shape_verse(
+        idx: int, pair: Tuple[str, str], verse_data: Dict, meter_ar: str,
+        fields: Tuple[str, ...] = VIEWS['full']
+    ) -> Dict[str, Any]:
+        """Build the API representation of one analysed verse, with only the requested fields"""
+        feet = []
+        for part in ('sadr', 'ajuz'):
+            if part in verse_data:
+                feet.extend(verse_data[part].get('feet', []))
+        is_broken = any(foot.get('status') in ['broken', 'missing'] for foot in feet)
+
+        shaped = {}
+        for field in fields:
+            if field == 'verse_number':
+                shaped['verse_number'] = idx
+            elif field == 'original_verse':
+                shaped['original_verse'] = f"{pair[0]} *** {pair[1]}"
+            elif field == 'sadr':
+                shaped['sadr'] = pair[0]
+            elif field == 'ajuz':
+                shaped['ajuz'] = pair[1]
+            elif field == 'bahr':
+                shaped['bahr'] = meter_ar
+            elif field == 'tafila':
+                shaped['tafila'] = [
+                    {
+                        'pattern': foot.get('pattern', ''),
+                        'status': foot.get('status', 'unknown'),
+                        'text': foot.get('text', '')
+                    }
+                    for foot in feet
+                ]
+            elif field == 'zihaaf':
+                shaped['zihaaf'] = [foot.get('variation') for foot in feet if foot.get('variation')]
+            elif field == 'is_valid':
+                shaped['is_valid'] = not is_broken
+            elif field == 'status':
+                shaped['status'] = 'صحيح' if not is_broken else 'مكسور'
+            elif field == 'score':
+                shaped['score'] = verse_data.get('score')
+            elif field == 'details':
+                shaped['details'] = verse_data
+        return shaped
+
+    @staticmethod
+    def resolve_fields(view: str = 'full', fields: Optional[List[str]] = None) -> Tuple[str, ...]:
+        """
+        Return the verse fields to build for a response view
+
+        An explicit fields list takes precedence over the view; fields are
+        returned in VERSE_FIELDS order so equal selections share a cache key.
+        """
+        if fields:
+            return tuple(field for field in VERSE_FIELDS if field in fields)
+        if view not in VIEWS:
+            raise ValueError(f"Unknown view '{view}'. Use one of: {', '.join(VIEWS)}")
+        return VIEWS[view]
 
+    @staticmethod
+    def _check_detection(detection: str) -> None:
+        if detection not in DETECTION_MODES:
+            raise ValueError(f"Unknown detection '{detection}'. Use one of: {', '.join(DETECTION_MODES)}")
+
+    @staticmethod
+    def _result_key(poem_key: str, fields: Tuple[str, ...], detection: str = 'full') -> str:
+        """Cache key of a result shaped with these fields (the full view keeps the bare poem key)"""
+        key = poem_key if fields == VIEWS['full'] else f"{poem_key}:{','.join(fields)}"
+        return key if detection == 'full' else f"{key};{detection}"
+
+    def iter_analysis(
+        self, verses: List[str], view: str = 'full', fields: Optional[List[str]] = None,
+        detection: str = 'full', diacritics: str = 'keep'
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Analyze a poem incrementally
+
+        Yields a 'meter' event once the bahr is known, then one 'verse' event
+        per verse as soon as it has been scanned, and a final 'done' event.
+        Verse payloads are identical to the entries of analyze_poem's
+        verses_analysis, and the completed result is stored in the cache.
+        With detection='prefix' a second 'meter' event may follow some verses
+        when the prefix meter is overturned; the verses sent so far are then
+        superseded by the ones that follow it.
+
+        The stages are those of analyze_poem; process_poem and shape are
+        each recorded once, adding up the time spent between events.
+        """
+        selected = self.resolve_fields(view, fields)
+        self._check_detection(detection)
+        with stage('split'):
+            poem_verses = self._prepare_verses(verses, diacritics)
+            poem_key = self._poem_key(poem_verses)
+        with stage('cache_lookup'):
+            cache_key = self._result_key(poem_key, selected, detection)
+            cached = self.cache.get(cache_key)
+        if cached is not None:
+            yield self._meter_event(cached, len(cached['verses_analysis']))
+            for verse_result in cached['verses_analysis']:
+                yield {'event': 'verse', 'data': verse_result}
+            yield {'event': 'done', 'verse_count': len(cached['verses_analysis'])}
+            return
+
+        scanning, shaping = StageTimer('process_poem'), StageTimer('shape')
+        try:
+            with self.processors.lease() as processor:
+                results = None
+                scans = self._iter_detection(processor, poem_verses, detection)
+                while True:
+                    with scanning.part():
+                        event = next(scans, None)
+                    if event is None:
+                        break
+                    with shaping.part():
+                        if event[0] == 'meter':
+                            _, meter, summary = event
+                            results = self._empty_results(meter, summary)
+                            out = self._meter_event(results, len(poem_verses) if meter else 0)
+                        else:
+                            _, pair, verse_data = event
+                            idx = len(results['verses_analysis']) + 1
+                            verse_result = self._shape_verse(idx, pair, verse_data, results['meter_ar'], selected)
+                            results['verses_analysis'].append(verse_result)
+                            out = {'event': 'verse', 'data': verse_result}
+                    yield out
+
+        except (AnalysisTimeout, AnalysisCancelled):
+            raise
+        except Exception as e:
+            raise Exception(f"PyArud analysis failed: {str(e)}")
+        finally:
+            scanning.record()
+            shaping.record()
+
+        self.cache.set(cache_key, results)
+        self.verse_cache.set(('poem', poem_key), poem_verses)
+        yield {'event': 'done', 'verse_count': len(results['verses_analysis'])}
+
+    def poem_stats(
+        self, verses: List[str], detection: str = 'full', diacritics: str = 'keep'
+    ) -> CorpusStats:
+        """
+        Analyze a poem into corpus statistics
+
+        Each verse scan is folded into the counts as soon as it exists and
+        then dropped: nothing is shaped into verses_analysis or cached, so
+        callers can merge the counts of any number of poems in constant
+        memory. The per-verse memo is still used.
+        """
+        self._check_detection(detection)
+        poem_verses = self._prepare_verses(verses, diacritics)
+        stats, meter, names = CorpusStats(), None, {}
+        try:
+            with self.processors.lease() as processor:
+                for event in self._iter_detection(processor, poem_verses, detection):
+                    if event[0] == 'meter':
+                        # A later meter restarts the scan
+                        stats, meter = CorpusStats(), event[1]
+                        names = zihaf_names(getattr(processor, 'meter_classes', {}).get(meter))
+                        continue
+                    stats.add_verse(meter, event[2], names)
         except Exception as e:
             raise Exception(f"PyArud analysis failed: {str(e)}")
+        stats.add_poem(meter, len(poem_verses))
+        return stats
+
+    @staticmethod
+    def _empty_results(meter: Optional[str], detection: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        # Normalize meter name for robustness
+        meter_en = (meter or 'unknown').lower()
+        results = {
+            'bahr': meter_en,
+            'meter_ar': PyArudService._translate_meter(meter_en),
+            'verses_analysis': []
+        }
+        if detection is not None:
+            results['detection'] = detection
+        return results
+
+    @staticmethod
+    def _meter_event(results: Dict[str, Any], verse_count: int) -> Dict[str, Any]:
+        event = {
+            'event': 'meter',
+            'bahr': results['bahr'],
+            'meter_ar': results['meter_ar'],
+            'verse_count': verse_count
+        }
+        if 'detection' in results:
+            event['detection'] = results['detection']
+        return event
+
+    def remember(
+        self, verses: List[str], results: Dict[str, Any], view: str = 'full',
+        fields: Optional[List[str]] = None, detection: str = 'full', diacritics: str = 'keep'
+    ) -> None:
+        """Cache a result computed elsewhere (e.g. in a worker process) as analyze_poem would"""
+        poem_verses = self._prepare_verses(verses, diacritics)
+        poem_key = self._poem_key(poem_verses)
+        self.cache.set(self._result_key(poem_key, self.resolve_fields(view, fields), detection), results)
+        self.verse_cache.set(('poem', poem_key), poem_verses)
+
+    def uncached(self) -> 'PyArudService':
+        """A service sharing this one's processors and settings with both caches disabled"""
+        return PyArudService(
+            cache=ResultCache(max_size=0), verse_cache=ResultCache(max_size=0),
+            processors=self.processors, prefix=self.prefix
+        )
+
+    def poem_digest(self, verses: List[str], diacritics: str = 'keep') -> str:
+        """Return the canonical key of the verses: the content hash of their normalized text"""
+        return self._poem_key(self._prepare_verses(verses, diacritics))
+
+    def result_key(
+        self, digest: str, view: str = 'full', fields: Optional[List[str]] = None,
+        detection: str = 'full'
+    ) -> str:
+        """Return the result-cache key of a poem digest shaped with view/fields"""
+        self._check_detection(detection)
+        return self._result_key(digest, self.resolve_fields(view, fields), detection)
+
+    def cache_key(
+        self, verses: List[str], view: str = 'full', fields: Optional[List[str]] = None,
+        detection: str = 'full', diacritics: str = 'keep'
+    ) -> str:
+        """Return the result-cache key analyze_poem would use for these verses"""
+        return self.result_key(self.poem_digest(verses, diacritics), view, fields, detection)
+
+    @staticmethod
+    def _prepare_verses(verses: List[str], diacritics: str = 'keep') -> List[Tuple[str, str]]:
+        """Validate raw input lines and split them into normalized (sadr, ajuz) pairs"""
+        if not verses or not isinstance(verses, list):
+            raise ValueError("Verses must be a non-empty list")
+
+        # Blank lines are skipped by the segmenter, and verses left blank
+        # by normalization (e.g. only tatweel) here
+        poem_verses = [
+            pair for pair in normalize_pairs(PyArudService._split_verses(verses), diacritics)
+            if pair != ('', '')
+        ]
+        if not poem_verses:
+            raise ValueError("No valid verses provided")
+
+        return poem_verses
+
+    @staticmethod
+    def _split_verses(verses: List[str]) -> List[Tuple[str, str]]:
+        """Split input lines into (sadr, ajuz) pairs"""
+        return split_verses(verses)
+
+    @staticmethod
+    def _poem_key(poem_verses: List[Tuple[str, str]]) -> str:
+        """Content hash of the normalized (sadr, ajuz) pairs"""
+        digest = hashlib.sha256()
+        for sadr, ajuz in poem_verses:
+            digest.update(sadr.encode('utf-8'))
+            digest.update(b'\x1f')
+            digest.update(ajuz.encode('utf-8'))
+            digest.update(b'\x1e')
+        return digest.hexdigest()
 
     @staticmethod
     def _translate_meter(meter_en: str) -> str:
         """Translate meter name from English to Arabic"""
-        meter_map = {
-            'taweel': 'الطويل',
-            'madeed': 'المديد',
-            'baseet': 'البسيط',
-            'wafer': 'الوافر',
-            'kamel': 'الكامل',
-            'kāmil': 'الكامل',  # handle alternate spelling
-            'hazaj': 'الهزج',
-            'rajaz': 'الرجز',
-            'ramal': 'الرمل',
-            'sarea': 'السريع',
-            'munsareh': 'المنسرح',
-            'khafeef': 'الخفيف',
-            'mudarae': 'المضارع',
-            'muqtadab': 'المقتضب',
-            'mujtath': 'المجتث',
-            'mutaqareb': 'المتقارب',
-            'mutadarek': 'المتدارك'
-        }
-        return meter_map.get(meter_en, meter_en)
+        return meters.translate(meter_en)
 
     @staticmethod
     def validate_verse(verse: str) -> bool:
-        if not verse or not isinstance(verse, str):
-            return False
-        verse = verse.strip()
-        if len(verse) < 5:
-            return False
-        return any('\u0600' <= char <= '\u06FF' for char in verse)
+        return diagnose_verse(verse).is_valid
 
     @staticmethod
-    def get_bahr_info(bahr_name: str) -> Dict[str, str]:
-        bahr_patterns = {
-            'المتقارب': 'فعولن فعولن فعولن فعولن',
-            'الطويل': 'فعولن مفاعيلن فعولن مفاعيلن',
-            'البسيط': 'مستفعلن فاعلن مستفعلن فاعلن',
-            'الكامل': 'متفاعلن متفاعلن متفاعلن',
-            'الوافر': 'مفاعلتن مفاعلتن فعولن',
-            'الرمل': 'فاعلاتن فاعلاتن فاعلاتن',
-            'الهزج': 'مفاعيلن مفاعيلن',
-            'الرجز': 'مستفعلن مستفعلن مستفعلن',
-            'السريع': 'مستفعلن مستفعلن فاعلن',
-            'المنسرح': 'مستفعلن مفعولات مفتعلن',
-            'الخفيف': 'فاعلاتن مستفعلن فاعلاتن',
-            'المضارع': 'مفاعيلن فاعلاتن',
-            'المقتضب': 'مفعلات مستفعلن',
-            'المجتث': 'مستفعلن فاعلاتن',
-            'المتدارك': 'فاعلن فاعلن فاعلن فاعلن'
-        }
-        return {
-            'name': bahr_name,
-            'pattern': bahr_patterns.get(bahr_name, 'غير معروف')
-        }
+    def get_bahr_info(bahr_name: str) -> Dict[str, Any]:
+        """Return the registry entry for any meter name or alias"""
+        meter = meters.lookup(bahr_name)
+        if meter is None:
+            return {'name': bahr_name, 'pattern': 'غير معروف'}
+        return meters.INFO[meter.key]
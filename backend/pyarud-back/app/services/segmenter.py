@@ -0,0 +1,145 @@
+"""
+Verse segmentation
+Splits input lines into (sadr, ajuz) hemistich spans without copying them
+"""
+import re
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+
+# Hemistich separators, highest priority first: a line containing several is
+# split on the earliest entry of this list, not on the leftmost character.
+# A run of the separator character (***, ،،) counts as one separator.
+SEPARATORS = ('*', '\t', '/', '،', '…', '  ')
+
+# The leftmost separator of any kind, and per separator (by first character)
+# the leftmost of those outranking it
+_SEPARATOR = re.compile('|'.join(re.escape(separator) for separator in SEPARATORS))
+_OUTRANKING = {
+    separator[0]: re.compile('|'.join(re.escape(higher) for higher in SEPARATORS[:rank])) if rank else None
+    for rank, separator in enumerate(SEPARATORS)
+}
+
+
+class Segment(NamedTuple):
+    """One verse as character offsets into the input lines"""
+    sadr_line: int
+    sadr_start: int
+    sadr_end: int
+    ajuz_line: int
+    ajuz_start: int
+    ajuz_end: int
+    separator: Optional[str]  # matched separator, None when built from separate lines
+
+    def text(self, lines: Union[Sequence[str], Dict[int, str]]) -> Tuple[str, str]:
+        """Return the (sadr, ajuz) strings this segment points at"""
+        return (
+            lines[self.sadr_line][self.sadr_start:self.sadr_end],
+            lines[self.ajuz_line][self.ajuz_start:self.ajuz_end]
+        )
+
+
+def _separator_span(line: str, match: re.Match, stop: int) -> Tuple[int, int]:
+    """
+    Return the (start, end) offsets of the separator run to split on
+
+    match is the leftmost _SEPARATOR match in line[:stop]; callers search
+    for it themselves so that lines without a separator cost no call.
+    """
+    position = match.start()
+    # The leftmost separator loses to a higher-priority one further right
+    outranking = _OUTRANKING[line[position]]
+    while outranking is not None:
+        match = outranking.search(line, position + 1, stop)
+        if match is None:
+            break
+        position = match.start()
+        outranking = _OUTRANKING[line[position]]
+    # A run of the separator character counts as one separator
+    return position, stop - len(line[position:stop].lstrip(line[position]))
+
+
+def scan_line(index: int, line: str) -> Union[Segment, Tuple[int, int], None]:
+    """
+    Classify one input line
+
+    Returns:
+        A Segment when the line holds both hemistichs, the (start, end)
+        offsets of the trimmed line when it holds one, or None for a blank line
+    """
+    stop = len(line.rstrip())
+    if not stop:
+        return None
+    start = len(line) - len(line.lstrip())
+
+    match = _SEPARATOR.search(line, start, stop)
+    if match is None:
+        return start, stop
+    position, end = _separator_span(line, match, stop)
+    return Segment(
+        index, start, start + len(line[start:position].rstrip()),
+        index, stop - len(line[end:stop].lstrip()), stop,
+        line[position:end]
+    )
+
+
+def iter_segments(lines: Iterable[str]) -> Iterator[Segment]:
+    """
+    Yield one Segment per verse, consuming lines lazily
+
+    Blank lines are skipped. A line without a separator is paired with the
+    next line without one; if none follows it, the line is used as both
+    hemistichs. Line numbers count every input line, blank ones included.
+    """
+    pending = None
+    for index, line in enumerate(lines):
+        item = scan_line(index, line)
+        if item is None:
+            continue
+        if type(item) is tuple:
+            if pending is None:
+                pending = (index,) + item
+            else:
+                yield Segment(*pending, index, *item, None)
+                pending = None
+            continue
+        if pending is not None:
+            yield Segment(*pending, *pending, None)
+            pending = None
+        yield item
+    if pending is not None:
+        yield Segment(*pending, *pending, None)
+
+
+def iter_pairs(lines: Iterable[str]) -> Iterator[Tuple[str, str]]:
+    """
+    Yield (sadr, ajuz) strings from a stream of lines, holding only an unpaired line
+
+    Pairs lines as iter_segments does, working on the stripped strings
+    instead of building Segments, which cost as much as the scan itself.
+    """
+    pending = None
+    search = _SEPARATOR.search
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        match = search(line)
+        if match is None:
+            if pending is None:
+                pending = line
+            else:
+                yield pending, line
+                pending = None
+            continue
+        if pending is not None:
+            yield pending, pending
+            pending = None
+        position, end = _separator_span(line, match, len(line))
+        yield line[:position].rstrip(), line[end:].lstrip()
+    if pending is not None:
+        yield pending, pending
+
+
+def split_verses(lines: Sequence[str]) -> List[Tuple[str, str]]:
+    """Split a list of input lines into (sadr, ajuz) pairs"""
+    return list(iter_pairs(lines))
@@ -0,0 +1,212 @@
+"""
+Editing sessions: a poem kept server-side so edits only re-scan what changed
+"""
+import threading
+import uuid
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.services.cache import ResultCache
+
+
+class Session:
+    """Input lines of one poem plus the per-verse state of its last analysis"""
+
+    def __init__(self, fields: Tuple[str, ...]):
+        self.fields = fields
+        self.lines: List[str] = []
+        self.pairs: List[Tuple[str, str]] = []
+        self.votes: List[Optional[str]] = []           # meter of each verse on its own
+        self.scans: List[Optional[Dict[str, Any]]] = []  # pyarud details under self.meter
+        self.meter: Optional[str] = None
+        self.lock = threading.Lock()
+
+
+class SessionStore:
+    """
+    Live-editing sessions held in a TTL-bounded LRU cache
+
+    A session remembers the input lines, the meter vote of each verse and
+    its scan against the poem meter. An update sends only the lines that
+    changed: lines are re-split into verses (microseconds), and only verses
+    whose text differs are run through pyarud. A changed verse is scanned
+    against the current meter first; only when it scores below the service's
+    fail_score does it search every meter for its own vote, so an edit that
+    keeps the meter costs one forced scan. When the votes elect a different
+    meter, every verse is rescanned (from the verse memo where possible).
+
+    Sessions live in the memory of one process: with several gunicorn
+    workers, clients need sticky routing or the 404 fallback below.
+    """
+
+    def __init__(self, service, max_size: int = 256, ttl: Optional[float] = 1800):
+        """
+        Args:
+            service: PyArudService providing processors, verse memo and shaping
+            max_size: Maximum live sessions (least recently used are dropped)
+            ttl: Seconds a session survives without being used
+        """
+        self.service = service
+        self.sessions = ResultCache(max_size=max_size, ttl=ttl)
+
+    def init_app(self, app) -> None:
+        """Configure the store from the Flask application config"""
+        self.sessions = ResultCache(
+            max_size=app.config.get('SESSION_CACHE_SIZE', 256),
+            ttl=app.config.get('SESSION_TTL', 1800)
+        )
+
+    def create(self, verses: List[str], view: str = 'full',
+               fields: Optional[List[str]] = None) -> Tuple[str, Dict[str, Any]]:
+        """
+        Analyze a poem and open a session on it
+
+        Returns:
+            Tuple of (session id, analysis shaped like analyze_poem's result)
+        """
+        session = Session(self.service.resolve_fields(view, fields))
+        with session.lock:
+            self._apply(session, list(verses))
+            result = self._result(session)
+        session_id = uuid.uuid4().hex
+        self.sessions.set(session_id, session)
+        return session_id, result
+
+    def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """Return the session's current analysis, or None if it is unknown or expired"""
+        session = self._touch(session_id)
+        if session is None:
+            return None
+        with session.lock:
+            return self._result(session)
+
+    def update(self, session_id: str, changes: List[Dict[str, Any]],
+               verse_count: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """
+        Apply line edits and return what changed
+
+        Args:
+            changes: [{'index': line index, 'verse': new text}, ...]; an index
+                equal to the line count appends a line
+            verse_count: New line count, to drop trailing lines
+
+        Returns:
+            The delta (see _delta), or None if the session is unknown or expired
+
+        Raises:
+            ValueError: If an index is out of range or the poem becomes empty
+        """
+        session = self._touch(session_id)
+        if session is None:
+            return None
+        with session.lock:
+            lines = list(session.lines)
+            for change in sorted(changes, key=lambda change: change['index']):
+                index = change['index']
+                if index == len(lines):
+                    lines.append(change['verse'])
+                elif 0 <= index < len(lines):
+                    lines[index] = change['verse']
+                else:
+                    raise ValueError(f"Verse index {index} is out of range (0-{len(lines)})")
+            if verse_count is not None:
+                if verse_count > len(lines):
+                    raise ValueError(f"verse_count {verse_count} exceeds the {len(lines)} verses sent")
+                del lines[verse_count:]
+
+            previous_meter = session.meter
+            dirty = self._apply(session, lines)
+            return self._delta(session, dirty, session.meter != previous_meter)
+
+    def delete(self, session_id: str) -> bool:
+        """Close a session; returns False if it was unknown"""
+        return self.sessions.pop(session_id) is not None
+
+    def _touch(self, session_id: str) -> Optional[Session]:
+        """Return a live session, restarting its time-to-live"""
+        session = self.sessions.get(session_id)
+        if session is not None:
+            self.sessions.set(session_id, session)
+        return session
+
+    def _apply(self, session: Session, lines: List[str]) -> List[int]:
+        """
+        Bring the session up to date with lines
+
+        Returns:
+            Indices of verses that were rescanned
+        """
+        pairs = self.service._prepare_verses(lines)
+        count = len(pairs)
+        dirty = [i for i in range(count) if i >= len(session.pairs) or session.pairs[i] != pairs[i]]
+        votes = session.votes[:count] + [None] * (count - len(session.votes))
+        scans = session.scans[:count] + [None] * (count - len(session.scans))
+
+        service = self.service
+        with service.processors.lease() as processor:
+            for i in dirty:
+                votes[i] = None
+                scans[i] = None
+                if session.meter is not None:
+                    # A verse that still scans well keeps the meter without a full search
+                    scans[i] = self._scan(processor, pairs[i], session.meter)
+                    if scans[i] is not None and (scans[i].get('score') or 0) >= service.prefix.fail_score:
+                        votes[i] = session.meter
+                        continue
+                votes[i] = service._vote(processor, pairs[i])
+
+            tally = Counter(vote for vote in votes if vote is not None)
+            meter = tally.most_common(1)[0][0] if tally else None
+            if meter != session.meter:
+                dirty = list(range(count))
+                scans = [None] * count
+            if meter is not None:
+                for i in dirty:
+                    if scans[i] is None:
+                        scans[i] = self._scan(processor, pairs[i], meter)
+
+        session.lines = lines
+        session.pairs = pairs
+        session.votes = votes
+        session.scans = scans
+        session.meter = meter
+        return dirty
+
+    def _scan(self, processor, pair: Tuple[str, str], meter: str) -> Optional[Dict[str, Any]]:
+        for _, verse_data in self.service._iter_scans(processor, [pair], meter):
+            return verse_data
+        return None
+
+    def _shaped(self, session: Session) -> Dict[int, Dict[str, Any]]:
+        """Shape every scanned verse, keyed by verse index, numbered as analyze_poem does"""
+        meter_ar = self.service._translate_meter((session.meter or 'unknown').lower())
+        shaped = {}
+        for i, (pair, verse_data) in enumerate(zip(session.pairs, session.scans)):
+            if verse_data is not None:
+                verse_data = dict(verse_data, verse_index=i)
+                shaped[i] = self.service._shape_verse(len(shaped) + 1, pair, verse_data, meter_ar, session.fields)
+        return shaped
+
+    def _result(self, session: Session) -> Dict[str, Any]:
+        results = self.service._empty_results(session.meter)
+        if session.meter is not None:
+            results['verses_analysis'] = list(self._shaped(session).values())
+        return results
+
+    def _delta(self, session: Session, dirty: List[int], meter_changed: bool) -> Dict[str, Any]:
+        """
+        Describe an update: the meter, the new verse count and the verses to replace
+
+        'verses' holds the rescanned entries (every entry when the meter
+        changed); clients keep their other entries and drop those numbered
+        above verse_count.
+        """
+        results = self.service._empty_results(session.meter)
+        shaped = self._shaped(session) if session.meter is not None else {}
+        return {
+            'bahr': results['bahr'],
+            'meter_ar': results['meter_ar'],
+            'meter_changed': meter_changed,
+            'verse_count': len(shaped),
+            'verses': [shaped[i] for i in dirty if i in shaped]
+        }
@@ -0,0 +1,217 @@
+"""
+Deadline-bounded analysis
+Checks a time budget before every pyarud call, so a request cannot outlive it by more than one scan
+"""
+import threading
+import time
+from contextlib import closing, contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+
+class AnalysisTimeout(Exception):
+    """The analysis did not finish within its time budget"""
+
+    def __init__(self, timeout: float, partial: Optional[Dict[str, Any]] = None):
+        super().__init__(f'Analysis exceeded its {timeout:g} s time budget')
+        self.timeout = timeout
+        self.partial = partial
+
+
+class AnalysisCancelled(Exception):
+    """The client went away before the analysis finished"""
+
+
+class Budget:
+    """Deadline of one analysis, and the check for a client that went away"""
+
+    def __init__(self, timeout: float, cancelled: Optional[Callable[[], bool]] = None,
+                 poll_interval: float = 0.25, deadline: Optional[float] = None):
+        """
+        Args:
+            timeout: Seconds allowed, as reported by AnalysisTimeout
+            cancelled: Returns True once the client has disconnected
+            poll_interval: Minimum seconds between two calls of cancelled
+            deadline: time.monotonic() value to stop at (default: timeout from now)
+        """
+        self.timeout = timeout
+        self.deadline = time.monotonic() + timeout if deadline is None else deadline
+        self.cancelled = cancelled
+        self.poll_interval = poll_interval
+        self._polled = float('-inf')
+
+    def check(self) -> None:
+        """Raise AnalysisTimeout past the deadline, AnalysisCancelled once the client is gone"""
+        now = time.monotonic()
+        if now >= self.deadline:
+            raise AnalysisTimeout(self.timeout)
+        if self.cancelled is not None and now - self._polled >= self.poll_interval:
+            self._polled = now
+            if self.cancelled():
+                raise AnalysisCancelled('Client disconnected')
+
+
+# Budget of the analysis running in the current context, if any
+_budget: ContextVar[Optional[Budget]] = ContextVar('analysis_budget', default=None)
+
+
+def check_budget() -> None:
+    """Called by PyArudService before each pyarud call: raise if the current budget is spent"""
+    budget = _budget.get()
+    if budget is not None:
+        budget.check()
+
+
+@contextmanager
+def bounded(budget: Optional[Budget]) -> Iterator[None]:
+    """Check budget before the pyarud calls of the with-block (None lifts any budget)"""
+    token = _budget.set(budget)
+    try:
+        yield
+    finally:
+        _budget.reset(token)
+
+
+class AnalysisSupervisor:
+    """
+    Runs analyses within a time budget
+
+    pyarud cannot be interrupted, so the budget is checked before each of
+    its calls, one verse scan or one meter search, which take well under a
+    second: an analysis over budget stops at the next verse, and the verses
+    finished until then are returned as a partial result. A disconnected
+    client is noticed the same way.
+
+    Analyses run in the calling process, on its warmed processors, result
+    cache and verse memo, and report their stages to /metrics and request
+    traces like any other. With a budget of 0 nothing is checked.
+    """
+
+    def __init__(self, service, timeout: float = 0, stream_timeout: float = 0,
+                 poll_interval: float = 0.25):
+        """
+        Args:
+            service: PyArudService running the analyses
+            timeout: Seconds allowed per /api/analyze, batch or session request (0 = no limit)
+            stream_timeout: Seconds allowed per streamed analysis (0 = no limit)
+            poll_interval: Minimum seconds between checks for a disconnected client
+        """
+        self.service = service
+        self.timeout = timeout
+        self.stream_timeout = stream_timeout
+        self.poll_interval = poll_interval
+        self._lock = threading.Lock()
+        self.timeouts = 0
+        self.cancellations = 0
+
+    def init_app(self, app) -> None:
+        """Configure the supervisor from the Flask application config"""
+        self.timeout = app.config.get('ANALYSIS_TIMEOUT', 0)
+        self.stream_timeout = app.config.get('ANALYSIS_STREAM_TIMEOUT', 0)
+
+    def analyze(self, verses: List[str], view: str = 'full', fields: Optional[List[str]] = None,
+                detection: str = 'full', cancelled: Optional[Callable[[], bool]] = None,
+                diacritics: str = 'keep') -> Dict[str, Any]:
+        """
+        Analyze a poem like PyArudService.analyze_poem, within self.timeout
+
+        Raises:
+            AnalysisTimeout: With the verses completed so far as .partial
+            AnalysisCancelled: If cancelled() became true
+            ValueError: If the verses or options are invalid
+        """
+        if not self.timeout or self._is_cached(verses, view, fields, detection, diacritics):
+            return self.service.analyze_poem(
+                verses, view=view, fields=fields, detection=detection, diacritics=diacritics
+            )
+
+        results = None
+        try:
+            for event in self.iter_analysis(verses, view, fields, detection, self.timeout, cancelled, diacritics):
+                results = self._fold(results, event)
+        except AnalysisTimeout as err:
+            if results is not None:
+                err.partial = dict(results, complete=False, verses_completed=len(results['verses_analysis']))
+            raise
+        return results
+
+    def iter_analysis(self, verses: List[str], view: str = 'full', fields: Optional[List[str]] = None,
+                      detection: str = 'full', timeout: Optional[float] = None,
+                      cancelled: Optional[Callable[[], bool]] = None,
+                      diacritics: str = 'keep') -> Iterator[Dict[str, Any]]:
+        """
+        Yield the events of PyArudService.iter_analysis within timeout seconds
+
+        timeout defaults to stream_timeout. Closing the iterator early (a
+        streaming client that disconnects) releases the processor at once.
+
+        Raises:
+            AnalysisTimeout, AnalysisCancelled, ValueError: As in analyze
+        """
+        timeout = self.stream_timeout if timeout is None else timeout
+        budget = Budget(timeout, cancelled, self.poll_interval) if timeout else None
+        events = self.service.iter_analysis(
+            verses, view=view, fields=fields, detection=detection, diacritics=diacritics
+        )
+        with closing(events):
+            while True:
+                # Set around each step only: the consumer of the events runs outside the budget
+                with self._bounded(budget):
+                    event = next(events, None)
+                if event is None:
+                    return
+                yield event
+
+    @contextmanager
+    def budget(self, cancelled: Optional[Callable[[], bool]] = None) -> Iterator[None]:
+        """
+        Bound the analyses of the with-block by self.timeout
+
+        For routes that analyse through other services (sessions, digests).
+        Raises AnalysisTimeout or AnalysisCancelled from the first pyarud
+        call past the budget.
+        """
+        budget = Budget(self.timeout, cancelled, self.poll_interval) if self.timeout else None
+        with self._bounded(budget):
+            yield
+
+    @contextmanager
+    def _bounded(self, budget: Optional[Budget]) -> Iterator[None]:
+        """bounded(budget), counting the analyses it stops in stats()"""
+        try:
+            with bounded(budget):
+                yield
+        except AnalysisTimeout:
+            with self._lock:
+                self.timeouts += 1
+            raise
+        except AnalysisCancelled:
+            with self._lock:
+                self.cancellations += 1
+            raise
+
+    def _is_cached(self, verses, view, fields, detection, diacritics='keep') -> bool:
+        # Not a cache lookup, so the hit and miss counters stay untouched
+        return self.service.cache_key(verses, view, fields, detection, diacritics) in self.service.cache
+
+    @staticmethod
+    def _fold(results: Optional[Dict[str, Any]], event: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Add one iter_analysis event to the result being assembled"""
+        if event['event'] == 'meter':
+            # A later meter event supersedes the verses sent before it
+            results = {key: value for key, value in event.items() if key != 'event'}
+            results['verses_analysis'] = []
+        elif event['event'] == 'verse':
+            results['verses_analysis'].append(event['data'])
+        elif event['event'] == 'done':
+            results.pop('verse_count', None)
+        return results
+
+    def stats(self) -> Dict[str, Any]:
+        """Budgets and counters for /api/status"""
+        return {
+            'timeout': self.timeout,
+            'stream_timeout': self.stream_timeout,
+            'timeouts': self.timeouts,
+            'cancellations': self.cancellations
+        }
@@ -0,0 +1,94 @@
+"""
+Verse validation
+Checks input lines in bulk and reports per-line diagnostics
+"""
+from typing import Iterable, List, NamedTuple, Optional
+
+from app.services.segmenter import scan_line
+
+
+MIN_LENGTH = 5  # characters in a stripped line
+
+# Character classes, written by str.translate so each line is classified in
+# one C-level pass and then counted with str.count:
+#   L Arabic letter, D diacritic (harakat, tanwin, shadda, sukun, dagger
+#   alef), A other Arabic block character (tatweel, punctuation, digits),
+#   S whitespace, O anything else
+LETTER, DIACRITIC, ARABIC, SPACE, OTHER = 'L', 'D', 'A', 'S', 'O'
+
+
+def _char_class(code: int) -> str:
+    if 0x064B <= code <= 0x065F or code == 0x0670:
+        return DIACRITIC
+    if 0x0621 <= code <= 0x063A or 0x0641 <= code <= 0x064A or 0x0671 <= code <= 0x06D3:
+        return LETTER
+    if 0x0600 <= code <= 0x06FF:
+        return ARABIC
+    if chr(code).isspace():
+        return SPACE
+    return OTHER
+
+
+# Every code point below U+0800 plus the few whitespace characters above it;
+# characters left untranslated are never one of the class letters, so they
+# are counted as OTHER
+CLASS_TABLE = {code: _char_class(code) for code in range(0x0800)}
+CLASS_TABLE.update(
+    (code, SPACE) for code in (0x1680, *range(0x2000, 0x200B), 0x2028, 0x2029, 0x202F, 0x205F, 0x3000)
+)
+
+
+class VerseDiagnostics(NamedTuple):
+    """Validity of one input line and what was measured on it"""
+    index: int
+    is_valid: bool
+    length: int                  # characters after stripping
+    arabic_ratio: float          # Arabic block characters / non-space characters
+    diacritics_coverage: float   # diacritics / Arabic letters, capped at 1
+    separator: Optional[str]     # hemistich separator the segmenter would split on
+    error: Optional[str]
+
+
+def diagnose_verse(verse: str, index: int = 0) -> VerseDiagnostics:
+    """
+    Validate one line
+
+    A line is valid when it is a string of at least MIN_LENGTH characters
+    after stripping that contains an Arabic block character.
+    """
+    if not isinstance(verse, str):
+        return VerseDiagnostics(index, False, 0, 0.0, 0.0, None, 'Verse must be a string')
+    text = verse.strip()
+    classes = text.translate(CLASS_TABLE)
+
+    letters = classes.count(LETTER)
+    diacritics = classes.count(DIACRITIC)
+    arabic = letters + diacritics + classes.count(ARABIC)
+    visible = len(classes) - classes.count(SPACE)
+
+    error = None
+    if len(text) < MIN_LENGTH:
+        error = 'Verse is empty' if not text else f'Verse is shorter than {MIN_LENGTH} characters'
+    elif not arabic:
+        error = 'Verse contains no Arabic text'
+
+    segment = scan_line(index, text) if text else None
+    return VerseDiagnostics(
+        index,
+        error is None,
+        len(text),
+        round(arabic / visible, 4) if visible else 0.0,
+        round(min(diacritics / letters, 1.0), 4) if letters else 0.0,
+        getattr(segment, 'separator', None),
+        error
+    )
+
+
+def validate_verses(verses: Iterable[str]) -> List[VerseDiagnostics]:
+    """Validate every line of a poem, in order"""
+    return [diagnose_verse(verse, index) for index, verse in enumerate(verses)]
+
+
+def first_invalid(diagnostics: Iterable[VerseDiagnostics]) -> Optional[VerseDiagnostics]:
+    """Return the first invalid line, or None when all are valid"""
+    return next((item for item in diagnostics if not item.is_valid), None)
@@ -0,0 +1,156 @@
+"""
+Per-request trace spans written as JSON log lines
+
+Every request gets a request id (X-Request-ID, taken from the client or
+generated) and a trace collecting the metrics.stage() timings it passes
+through, explicit span()s and annotate()d attributes such as the verse
+count or detected meter. When the response is closed, a sampled share of
+the traces, and every trace slower than the slow threshold, is written to
+the "pyarud.trace" logger as one JSON object per line.
+"""
+import contextvars
+import json
+import logging
+import random
+import re
+import sys
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional
+
+from app import metrics
+
+
+logger = logging.getLogger('pyarud.trace')
+
+REQUEST_ID_HEADER = 'X-Request-ID'
+_VALID_REQUEST_ID = re.compile(r'[A-Za-z0-9._:-]{1,64}')
+
+_current: contextvars.ContextVar = contextvars.ContextVar('pyarud_trace', default=None)
+
+
+class Trace:
+    """Spans and attributes of one request"""
+
+    def __init__(self, request_id: str):
+        self.request_id = request_id
+        self.started = time.perf_counter()
+        self.attrs: Dict[str, Any] = {}
+        self.spans: List[Dict[str, Any]] = []
+
+    def add_span(self, name: str, started: float, seconds: float) -> None:
+        self.spans.append({
+            'name': name,
+            'start_ms': round((started - self.started) * 1000, 3),
+            'duration_ms': round(seconds * 1000, 3)
+        })
+
+    def record(self, **fields: Any) -> Dict[str, Any]:
+        """The log record: fields, then the attributes and spans"""
+        return dict(
+            ts=datetime.now(timezone.utc).isoformat(timespec='milliseconds'),
+            request_id=self.request_id,
+            **fields,
+            **self.attrs,
+            spans=sorted(self.spans, key=lambda span: span['start_ms'])
+        )
+
+
+class Tracer:
+    """Starts a trace per request and logs the sampled or slow ones"""
+
+    def __init__(self, sample_rate: float = 0.0, slow_ms: float = 0, enabled: bool = True):
+        """
+        Args:
+            sample_rate: Share of requests logged (0..1)
+            slow_ms: Requests at least this slow are always logged (0 = off)
+            enabled: Record traces at all
+        """
+        self.sample_rate = sample_rate
+        self.slow_ms = slow_ms
+        self.enabled = enabled
+
+    def init_app(self, app) -> None:
+        """Configure sampling and register the request hooks"""
+        self.sample_rate = app.config.get('TRACE_SAMPLE_RATE', 0.0)
+        self.slow_ms = app.config.get('TRACE_SLOW_MS', 0)
+        self.enabled = app.config.get('TRACE_ENABLED', True)
+        if not logger.handlers:
+            handler = logging.StreamHandler(sys.stdout)
+            handler.setFormatter(logging.Formatter('%(message)s'))
+            logger.addHandler(handler)
+            logger.setLevel(logging.INFO)
+            logger.propagate = False
+
+        app.before_request(self._start)
+        app.after_request(self._finish)
+
+    def _start(self) -> None:
+        from flask import request
+        if not self.enabled:
+            return
+        incoming = request.headers.get(REQUEST_ID_HEADER, '')
+        request_id = incoming if _VALID_REQUEST_ID.fullmatch(incoming) else uuid.uuid4().hex
+        _current.set(Trace(request_id))
+
+    def _finish(self, response):
+        from flask import request
+        trace = _current.get()
+        if trace is None:
+            return response
+        response.headers[REQUEST_ID_HEADER] = trace.request_id
+        fields = {
+            'method': request.method,
+            'path': request.path,
+            'route': request.endpoint or 'unmatched',
+            'status': response.status_code
+        }
+        # Logged once the body is sent, so streamed responses count in full
+        response.call_on_close(lambda: self._emit(trace, fields))
+        return response
+
+    def _emit(self, trace: Trace, fields: Dict[str, Any]) -> None:
+        if _current.get() is trace:
+            _current.set(None)
+        duration_ms = (time.perf_counter() - trace.started) * 1000
+        slow = bool(self.slow_ms) and duration_ms >= self.slow_ms
+        if not slow and random.random() >= self.sample_rate:
+            return
+        record = trace.record(duration_ms=round(duration_ms, 3), slow=slow, **fields)
+        logger.info(json.dumps(record, ensure_ascii=False, default=str))
+
+
+def current() -> Optional[Trace]:
+    """The trace of the request being handled, if any"""
+    return _current.get()
+
+
+def annotate(**attrs: Any) -> None:
+    """Add attributes to the current request's trace (no-op outside a request)"""
+    trace = _current.get()
+    if trace is not None:
+        trace.attrs.update(attrs)
+
+
+def record_span(name: str, started: float, seconds: float) -> None:
+    """Add a span to the current trace (no-op outside a traced request)"""
+    trace = _current.get()
+    if trace is not None:
+        trace.add_span(name, started, seconds)
+
+
+@contextmanager
+def span(name: str) -> Iterator[None]:
+    """Time the with-block as a span of the current trace only (no metric)"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_span(name, started, time.perf_counter() - started)
+
+
+metrics.add_stage_listener(record_span)
+
+tracer = Tracer()
@@ -0,0 +1,50 @@
+"""
+Meter Detection Benchmark
+Full detection (every verse searches all meters) against prefix detection
+(the first verses search, the rest are scanned against their meter only)
+
+The verse memo is disabled so repeated synthetic verses cost as much as
+distinct ones; a full-detection run takes about 1.7 s per verse, so
+500 verses take about 15 minutes.
+
+Usage (from backend/pyarud-back):
+    python -m benchmarks.bench_detection [verses] [meter]
+"""
+import sys
+import time
+
+from app.services import PyArudService
+from app.services.cache import ResultCache
+from benchmarks.corpus import synthetic_poem
+
+
+def run(service, verses, detection):
+    started = time.perf_counter()
+    result = service.analyze_poem(verses, detection=detection)
+    return time.perf_counter() - started, result
+
+
+def main():
+    verse_count = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    meter = sys.argv[2] if len(sys.argv) > 2 else 'taweel'
+    verses = synthetic_poem(meter, verse_count)
+
+    service = PyArudService(cache=ResultCache(max_size=0), verse_cache=ResultCache(max_size=0))
+    service.processors.preload()
+
+    print(f"\n{'='*64}")
+    print(f"  Meter detection ({verse_count} verses, meter={meter})")
+    print(f"{'='*64}")
+
+    timings = {}
+    for detection in ('full', 'prefix'):
+        elapsed, result = run(service, verses, detection)
+        timings[detection] = elapsed
+        summary = result.get('detection', {})
+        print(f"  {detection.ljust(8)} {elapsed:>9.2f} s   {elapsed / verse_count * 1000:>8.1f} ms/verse"
+              f"   bahr={result['bahr']}   fallback={summary.get('fallback')}")
+    print(f"\n  speedup: {timings['full'] / timings['prefix']:.1f}x\n")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+"""
+Response Format Micro-benchmark
+Encode/decode time and size of an analysis response per wire format
+
+Usage (from backend/pyarud-back):
+    python -m benchmarks.bench_formats [verses] [meter]
+"""
+import json
+import statistics
+import sys
+import time
+
+from app.serialization import CODECS
+from app.services import PyArudService
+from benchmarks.corpus import synthetic_poem
+
+
+def timed(fn, repeat=200):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples)
+
+
+def formats():
+    yield 'json (ascii)', lambda obj: json.dumps(obj).encode('utf-8'), json.loads
+    yield 'json (utf-8)', lambda obj: json.dumps(obj, ensure_ascii=False).encode('utf-8'), json.loads
+    for mimetype, codec in CODECS.items():
+        if codec.mimetype == mimetype:
+            yield mimetype.split('/')[1], codec.dumps, codec.loads
+
+
+def main():
+    verse_count = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    meter = sys.argv[2] if len(sys.argv) > 2 else 'taweel'
+    # Repeated verses are scanned once thanks to the verse memo
+    service = PyArudService()
+
+    print(f"\n{'='*64}")
+    print(f"  Wire formats ({verse_count} verses, meter={meter})")
+    print(f"{'='*64}")
+    if len(CODECS) == 0:
+        print("  msgpack/cbor2 not installed; only JSON is measured")
+
+    for view in ('full', 'compact'):
+        payload = {'success': True, 'data': service.analyze_poem(synthetic_poem(meter, verse_count), view=view)}
+        print(f"\n  view={view}")
+        print(f"  {'format'.ljust(14)} {'bytes':>10} {'encode ms':>10} {'decode ms':>10}")
+        for name, dumps, loads in formats():
+            body = dumps(payload)
+            encode_s = timed(lambda: dumps(payload))
+            decode_s = timed(lambda: loads(body))
+            print(f"  {name.ljust(14)} {len(body):>10} {encode_s * 1000:>10.3f} {decode_s * 1000:>10.3f}")
+    print()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""
+Normalization Throughput Benchmark
+Normalizes a large corpus hemistich by hemistich and in bulk, on clean text
+and on the same verses as typed with tatweel, invisible characters and
+presentation forms, in both diacritics modes
+
+Usage (from backend/pyarud-back):
+    python -m benchmarks.bench_normalize [verses]
+"""
+import statistics
+import sys
+import time
+
+from app.services.normalization import normalize_pairs, normalize_text
+from app.services.segmenter import split_verses
+from benchmarks.corpus import METER_FEET, synthetic_poem
+
+
+def corpus(verse_count):
+    """Vocalised verses cycling through every meter, as (sadr, ajuz) pairs"""
+    per_meter = verse_count // len(METER_FEET) + 1
+    lines = [line for meter in METER_FEET for line in synthetic_poem(meter, per_meter)]
+    return split_verses(lines[:verse_count])
+
+
+def typed(pairs):
+    """The same verses with the variants seen in pasted text"""
+    def dirty(text, index):
+        if index % 3 == 0:
+            text = text.replace('ع', 'عـــ')
+        if index % 3 == 1:
+            text = text.replace(' ', ' \u200f', 1) + '\u200c'
+        if index % 5 == 0:
+            text = text.replace('لا', 'ﻻ')
+        return '  ' + text
+    return [(dirty(sadr, index), dirty(ajuz, index + 1)) for index, (sadr, ajuz) in enumerate(pairs)]
+
+
+def timed(fn, repeat=5):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples)
+
+
+def main():
+    verse_count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    clean = corpus(verse_count)
+    inputs = {'clean': clean, 'typed': typed(clean)}
+
+    print(f"\n{'='*74}")
+    print(f"  Normalization ({verse_count} verses, median of 5)")
+    print(f"{'='*74}")
+    print(f"  {'input':<8}{'mode':<7}{'per hemistich':>16}{'bulk':>12}{'verses/s':>14}{'MB/s':>10}")
+    for name, pairs in inputs.items():
+        size = sum(len(sadr.encode('utf-8')) + len(ajuz.encode('utf-8')) for sadr, ajuz in pairs)
+        for mode in ('keep', 'strip'):
+            single = timed(lambda: [(normalize_text(sadr, mode), normalize_text(ajuz, mode)) for sadr, ajuz in pairs])
+            bulk = timed(lambda: normalize_pairs(pairs, mode))
+            print(f"  {name:<8}{mode:<7}{single * 1000:13.1f} ms{bulk * 1000:9.1f} ms"
+                  f"{len(pairs) / bulk:14,.0f}{size / bulk / 1e6:10.1f}")
+
+    same = normalize_pairs(inputs['typed']) == normalize_pairs(clean)
+    print(f"\n  Typed copies normalize to the clean text: {same}\n")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+"""
+Processor Lifecycle Micro-benchmark
+Compares building an ArudhProcessor per request with leasing a warmed one
+
+Usage (from backend/pyarud-back):
+    python -m benchmarks.bench_processor [iterations]
+"""
+import statistics
+import sys
+import time
+
+from pyarud.processor import ArudhProcessor
+from app.services.processor_pool import ProcessorProvider, WARMUP_VERSE
+
+METER = 'mutadarak'
+
+
+def scan(processor):
+    """Representative per-request work kept small so setup cost is visible"""
+    processor.process_poem([WARMUP_VERSE], meter_name=METER)
+
+
+def per_request(iterations):
+    timings = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        scan(ArudhProcessor())
+        timings.append(time.perf_counter() - started)
+    return timings
+
+
+def leased(iterations):
+    provider = ProcessorProvider(warmup=True)
+    provider.preload()
+    timings = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        with provider.lease() as processor:
+            scan(processor)
+        timings.append(time.perf_counter() - started)
+    return timings, provider.stats()
+
+
+def report(name, timings):
+    print(f"  {name.ljust(22)} mean {statistics.mean(timings) * 1000:8.2f} ms"
+          f"   median {statistics.median(timings) * 1000:8.2f} ms")
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+
+    print(f"\n{'='*60}")
+    print(f"  ArudhProcessor lifecycle ({iterations} requests, meter={METER})")
+    print(f"{'='*60}")
+
+    before = per_request(iterations)
+    after, stats = leased(iterations)
+
+    report('new per request', before)
+    report('warmed, leased', after)
+    print(f"\n  One-time cost: build {stats['build_seconds'] * 1000:.1f} ms,"
+          f" warmup {stats['warmup_seconds'] * 1000:.1f} ms ({stats['warmed_meters']} meters)")
+    print(f"  Speedup: {statistics.mean(before) / statistics.mean(after):.1f}x\n")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+"""
+Verse Segmentation Micro-benchmark
+Compares the previous separator loop with the segmenter on a large pasted
+corpus written in the conventions both understand
+
+Usage (from backend/pyarud-back):
+    python -m benchmarks.bench_segmenter [lines]
+"""
+import statistics
+import sys
+import time
+
+from app.services.segmenter import iter_pairs, split_verses
+from benchmarks.corpus import METER_FEET, synthetic_poem
+
+# Conventions the previous loop understood, so both sides produce verses
+LEGACY_SEPARATORS = [' *** ', ' ، ', '  ']
+
+
+def legacy_split(verses):
+    """The separator loop PyArudService used before the segmenter"""
+    verses = [v.strip() for v in verses if v.strip()]
+    poem_verses = []
+    i = 0
+    while i < len(verses):
+        verse = verses[i].strip()
+        parts = None
+        for separator in ['***', '،', '،،', '  ']:
+            if separator in verse:
+                parts = verse.split(separator, 1)
+                if len(parts) == 2:
+                    poem_verses.append((parts[0].strip(), parts[1].strip()))
+                    break
+        if not parts:
+            if i + 1 < len(verses):
+                poem_verses.append((verse, verses[i + 1].strip()))
+                i += 1
+            else:
+                poem_verses.append((verse, verse))
+        i += 1
+    return poem_verses
+
+
+def pasted_corpus(line_count):
+    """Lines as pasted from mixed sources: separators vary, some verses span two lines"""
+    lines = []
+    meters = list(METER_FEET)
+    while len(lines) < line_count:
+        meter = meters[len(lines) % len(meters)]
+        sadr, ajuz = synthetic_poem(meter, 1)[0].split(' *** ')
+        style = len(lines) % (len(LEGACY_SEPARATORS) + 1)
+        if style == len(LEGACY_SEPARATORS):
+            lines.extend([sadr, ajuz, ''])
+        else:
+            lines.append(sadr + LEGACY_SEPARATORS[style] + ajuz)
+    return lines[:line_count]
+
+
+def timed(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples)
+
+
+def main():
+    line_count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    lines = pasted_corpus(line_count)
+
+    print(f"\n{'='*60}")
+    print(f"  Verse segmentation ({line_count} pasted lines)")
+    print(f"{'='*60}")
+
+    before = timed(lambda: legacy_split(lines), 5)
+    after = timed(lambda: split_verses(lines), 5)
+    streamed = timed(lambda: sum(1 for _ in iter_pairs(iter(lines))), 5)
+
+    print(f"  {'separator loop'.ljust(22)} {before * 1000:10.1f} ms")
+    print(f"  {'segmenter (list)'.ljust(22)} {after * 1000:10.1f} ms")
+    print(f"  {'segmenter (stream)'.ljust(22)} {streamed * 1000:10.1f} ms")
+    print(f"\n  Per line: {before / line_count * 1e6:.2f} us before, {after / line_count * 1e6:.2f} us after")
+    print(f"  Verses: {len(split_verses(lines))}, same pairs: {legacy_split(lines) == split_verses(lines)}\n")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+"""
+Cold-Start Benchmark
+Import time, create_app time and first-request latency of a fresh process
+for each processor preload and warm-up mode, with the default configuration
+(including the ANALYSIS_TIMEOUT budget)
+
+Every measurement runs in a new interpreter, so nothing is cached between
+modes. "first analyze" is the latency of the first /api/analyze request
+sent right after create_app, "to first result" adds the import and
+create_app time, and "next analyze" is a second, different poem sent once
+any preload has finished.
+
+Usage (from backend/pyarud-back):
+    python -m benchmarks.bench_startup [runs]
+"""
+import json
+import statistics
+import subprocess
+import sys
+import time
+
+MODES = {
+    'lazy': {'PROCESSOR_PRELOAD': False},
+    'blocking': {'PROCESSOR_PRELOAD': True, 'PROCESSOR_PRELOAD_BACKGROUND': False, 'PROCESSOR_WARMUP': False},
+    'blocking+warm': {'PROCESSOR_PRELOAD': True, 'PROCESSOR_PRELOAD_BACKGROUND': False, 'PROCESSOR_WARMUP': True},
+    'background': {'PROCESSOR_PRELOAD': True, 'PROCESSOR_PRELOAD_BACKGROUND': True, 'PROCESSOR_WARMUP': False},
+    'background+warm': {'PROCESSOR_PRELOAD': True, 'PROCESSOR_PRELOAD_BACKGROUND': True, 'PROCESSOR_WARMUP': True},
+}
+
+POEM = ['أَلا لَيتَ شِعري هَل أَبيتَنَّ لَيلَةً *** بِجَنبِ الغَضى أُزجي القِلاصَ النَواجِيا']
+NEXT_POEM = ['لِخَولَةَ أَطلالٌ بِبُرقَةِ ثَهمَدِ *** تَلوحُ كَباقي الوَشمِ في ظاهِرِ اليَدِ']
+
+
+def child(mode):
+    """Measure one cold start and print it as JSON"""
+    started = time.perf_counter()
+    from app import create_app
+    from app.config import Config
+    imported = time.perf_counter()
+
+    class StartupConfig(Config):
+        TESTING = True
+        RATE_LIMIT_PER_MINUTE = 0
+        TRACE_ENABLED = False
+
+    for key, value in MODES[mode].items():
+        setattr(StartupConfig, key, value)
+
+    app = create_app(StartupConfig)
+    ready = time.perf_counter()
+    client = app.test_client()
+
+    timings = {'import': imported - started, 'create_app': ready - imported}
+    for name, path in (('health', '/health'), ('status', '/api/status'), ('bahr', '/api/bahr/taweel')):
+        request_started = time.perf_counter()
+        client.get(path)
+        timings[name] = time.perf_counter() - request_started
+    request_started = time.perf_counter()
+    response = client.post('/api/analyze', json={'verses': POEM})
+    assert response.status_code == 200, response.json
+    timings['analyze'] = time.perf_counter() - request_started
+
+    from app.routes import pyarud_service
+    pyarud_service.processors.wait()
+    request_started = time.perf_counter()
+    response = client.post('/api/analyze', json={'verses': NEXT_POEM})
+    assert response.status_code == 200, response.json
+    timings['next_analyze'] = time.perf_counter() - request_started
+    print(json.dumps(timings))
+
+
+def measure(mode, runs):
+    samples = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, '-m', 'benchmarks.bench_startup', '--child', mode],
+            capture_output=True, text=True, check=True
+        ).stdout
+        samples.append(json.loads(output.strip().splitlines()[-1]))
+    return {key: statistics.median(sample[key] for sample in samples) for key in samples[0]}
+
+
+def main():
+    if len(sys.argv) > 2 and sys.argv[1] == '--child':
+        child(sys.argv[2])
+        return
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+
+    print(f"\n{'='*105}")
+    print(f"  Cold start (median of {runs} fresh processes, milliseconds)")
+    print(f"{'='*105}")
+    print(f"  {'mode':<16}{'import':>9}{'create_app':>12}{'/health':>9}{'/status':>9}{'/bahr':>8}"
+          f"{'first analyze':>15}{'to first result':>17}{'next analyze':>14}")
+    for mode in MODES:
+        result = measure(mode, runs)
+        ms = {key: value * 1000 for key, value in result.items()}
+        print(f"  {mode:<16}{ms['import']:>9.0f}{ms['create_app']:>12.0f}{ms['health']:>9.1f}{ms['status']:>9.1f}"
+              f"{ms['bahr']:>8.1f}{ms['analyze']:>15.0f}{ms['import'] + ms['create_app'] + ms['analyze']:>17.0f}"
+              f"{ms['next_analyze']:>14.0f}")
+    print()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+"""
+Response View Micro-benchmark
+Payload size and shaping/serialization time of each response view
+
+Usage (from backend/pyarud-back):
+    python -m benchmarks.bench_views [verses] [meter]
+"""
+import statistics
+import sys
+import time
+
+from app import create_app
+from app.services import PyArudService
+from app.services.pyarud_service import VIEWS
+from benchmarks.corpus import synthetic_poem
+
+
+def timed(fn, repeat=200):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples)
+
+
+def main():
+    verse_count = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    meter = sys.argv[2] if len(sys.argv) > 2 else 'taweel'
+    verses = synthetic_poem(meter, verse_count)
+
+    app = create_app()
+    service = PyArudService()
+    # Repeated verses are scanned once thanks to the verse memo
+    full = service.analyze_poem(verses)
+    pairs = service._split_verses(verses)
+    details = [verse['details'] for verse in full['verses_analysis']]
+
+    print(f"\n{'='*64}")
+    print(f"  Response views ({verse_count} verses, meter={meter})")
+    print(f"{'='*64}")
+    print(f"  {'view'.ljust(10)} {'bytes':>10} {'shape ms':>10} {'jsonify ms':>11}")
+
+    with app.app_context():
+        for view, fields in VIEWS.items():
+            def shape():
+                return [
+                    PyArudService._shape_verse(idx, pair, verse_data, full['meter_ar'], fields)
+                    for idx, (pair, verse_data) in enumerate(zip(pairs, details), 1)
+                ]
+
+            payload = {'success': True, 'data': dict(full, verses_analysis=shape())}
+            body = app.json.response(payload).get_data()
+            shape_s = timed(shape)
+            serialize_s = timed(lambda: app.json.response(payload).get_data())
+            print(f"  {view.ljust(10)} {len(body):>10} {shape_s * 1000:>10.3f} {serialize_s * 1000:>11.3f}")
+    print()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""
+Benchmark inputs: sample poems shipped with the repo and synthetic poems
+"""
+import ast
+import json
+import os
+from typing import Dict, List
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Fully vocalised feet; a hemistich made of a meter's feet scans as that meter
+FEET = {
+    'فعولن': 'فَعُولُنْ',
+    'مفاعيلن': 'مَفَاعِيلُنْ',
+    'فاعلن': 'فَاعِلُنْ',
+    'مستفعلن': 'مُسْتَفْعِلُنْ',
+    'متفاعلن': 'مُتَفَاعِلُنْ',
+    'مفاعلتن': 'مُفَاعَلَتُنْ',
+    'فاعلاتن': 'فَاعِلَاتُنْ',
+    'مفعولات': 'مَفْعُولَاتُ',
+    'مفتعلن': 'مُفْتَعِلُنْ',
+    'مفعلات': 'مَفْعُلَاتُ',
+    'مستعلن': 'مُسْتَعِلُنْ',
+}
+
+# Feet of one hemistich per meter
+METER_FEET = {
+    'taweel': ['فعولن', 'مفاعيلن', 'فعولن', 'مفاعيلن'],
+    'madeed': ['فاعلاتن', 'فاعلن', 'فاعلاتن'],
+    'baseet': ['مستفعلن', 'فاعلن', 'مستفعلن', 'فاعلن'],
+    'wafer': ['مفاعلتن', 'مفاعلتن', 'فعولن'],
+    'kamel': ['متفاعلن', 'متفاعلن', 'متفاعلن'],
+    'hazaj': ['مفاعيلن', 'مفاعيلن'],
+    'rajaz': ['مستفعلن', 'مستفعلن', 'مستفعلن'],
+    'ramal': ['فاعلاتن', 'فاعلاتن', 'فاعلاتن'],
+    'saree': ['مستفعلن', 'مستفعلن', 'فاعلن'],
+    'munsareh': ['مستفعلن', 'مفعولات', 'مفتعلن'],
+    'khafeef': ['فاعلاتن', 'مستفعلن', 'فاعلاتن'],
+    'mudhare': ['مفاعيلن', 'فاعلاتن'],
+    'muqtadheb': ['مفعلات', 'مستعلن'],
+    'mujtath': ['مستفعلن', 'فاعلاتن'],
+    'mutakareb': ['فعولن', 'فعولن', 'فعولن', 'فعولن'],
+    'mutadarak': ['فاعلن', 'فاعلن', 'فاعلن', 'فاعلن'],
+}
+
+
+def repo_poems() -> Dict[str, List[str]]:
+    """Return the sample poems of test_comprehensive.py and test_poem.json"""
+    poems = {}
+
+    # test_comprehensive.py imports requests; read TEST_POEMS without importing it
+    with open(os.path.join(BACKEND_DIR, 'test_comprehensive.py'), encoding='utf-8') as handle:
+        tree = ast.parse(handle.read())
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and any(
+            isinstance(target, ast.Name) and target.id == 'TEST_POEMS' for target in node.targets
+        ):
+            for poem in ast.literal_eval(node.value):
+                poems[poem['name']] = poem['verses']
+
+    with open(os.path.join(BACKEND_DIR, 'test_poem.json'), encoding='utf-8') as handle:
+        poems['test_poem.json'] = json.load(handle)['verses']
+
+    return poems
+
+
+def synthetic_poem(meter: str, verse_count: int) -> List[str]:
+    """Build a poem of verse_count "sadr *** ajuz" lines written out in meter's feet"""
+    hemistich = ' '.join(FEET[name] for name in METER_FEET[meter])
+    return [f"{hemistich} *** {hemistich}"] * verse_count
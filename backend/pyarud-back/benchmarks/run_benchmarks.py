@@ -0,0 +1,184 @@
+"""
+Analysis Pipeline Benchmark Suite
+Times the analysis pipeline in-process, without a running server
+
+Benchmarks:
+    split      PyArudService._split_verses on every input poem
+    shape      result shaping (_shape_verse) over precomputed pyarud output
+    service    PyArudService.analyze_poem with caches disabled
+    cached     PyArudService.analyze_poem answered from the result cache
+    flask      POST /api/analyze through the Flask test client, caches disabled
+
+Inputs are the TEST_POEMS of test_comprehensive.py, test_poem.json and
+synthetic poems of --sizes verses for every meter in --meters.
+
+Usage (from backend/pyarud-back):
+    python -m benchmarks.run_benchmarks -o results.json
+    python -m benchmarks.run_benchmarks --save-baseline benchmarks/baseline.json
+    python -m benchmarks.run_benchmarks --baseline benchmarks/baseline.json --threshold 0.2
+
+With --baseline the run exits with status 1 when any benchmark's median is
+more than --threshold (as a fraction) slower than the stored median.
+"""
+import argparse
+import json
+import platform
+import statistics
+import sys
+import time
+from typing import Any, Callable, Dict, List
+
+from benchmarks.corpus import METER_FEET, repo_poems, synthetic_poem
+
+
+def measure(fn: Callable[[], Any], repeat: int, number: int = 1) -> Dict[str, float]:
+    """Run fn number times per sample, repeat samples; return per-call timings"""
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(number):
+            fn()
+        samples.append((time.perf_counter() - started) / number)
+    return {
+        'runs': repeat * number,
+        'mean_s': statistics.mean(samples),
+        'median_s': statistics.median(samples),
+        'min_s': min(samples)
+    }
+
+
+def build_inputs(sizes: List[int], meters: List[str]) -> Dict[str, List[str]]:
+    poems = repo_poems()
+    for meter in meters:
+        for size in sizes:
+            poems[f'synthetic/{meter}/{size}'] = synthetic_poem(meter, size)
+    return poems
+
+
+def run(poems: Dict[str, List[str]], repeat: int, stages: List[str]) -> List[Dict[str, Any]]:
+    from app import create_app
+    from app.config import Config
+    from app.services import PyArudService
+    from app.services.cache import ResultCache
+
+    class BenchmarkConfig(Config):
+        TESTING = True
+        ANALYSIS_CACHE_SIZE = 0
+        VERSE_CACHE_SIZE = 0
+        RATE_LIMIT_PER_MINUTE = 0
+        # No time budget: the sweep times poems of up to hundreds of verses
+        ANALYSIS_TIMEOUT = 0
+        ANALYSIS_STREAM_TIMEOUT = 0
+        MAX_VERSES_PER_REQUEST = max(len(verses) for verses in poems.values())
+
+    app = create_app(BenchmarkConfig)
+    client = app.test_client()
+    uncached = PyArudService(cache=ResultCache(max_size=0), verse_cache=ResultCache(max_size=0))
+    uncached.processors.preload()
+    cached = PyArudService()
+
+    results = []
+
+    def record(stage, name, verses, timing):
+        results.append(dict({'name': f'{stage}:{name}', 'stage': stage, 'verses': len(verses)}, **timing))
+        print(f"  {stage.ljust(8)} {name[:44].ljust(44)} {timing['median_s'] * 1000:>11.3f} ms")
+
+    for name, verses in poems.items():
+        lines = [v.strip() for v in verses if v.strip()]
+
+        if 'split' in stages:
+            record('split', name, verses, measure(lambda: PyArudService._split_verses(lines), repeat, 1000))
+
+        if 'shape' in stages or 'cached' in stages:
+            analysis = cached.analyze_poem(verses)
+
+        if 'shape' in stages:
+            pairs = PyArudService._split_verses(lines)
+            details = [v['details'] for v in analysis['verses_analysis']]
+
+            def shape():
+                for idx, (pair, verse_data) in enumerate(zip(pairs, details), 1):
+                    PyArudService._shape_verse(idx, pair, verse_data, analysis['meter_ar'])
+
+            record('shape', name, verses, measure(shape, repeat, 100))
+
+        if 'cached' in stages:
+            record('cached', name, verses, measure(lambda: cached.analyze_poem(verses), repeat, 1000))
+
+        if 'service' in stages:
+            record('service', name, verses, measure(lambda: uncached.analyze_poem(verses), repeat))
+
+        if 'flask' in stages:
+            def post():
+                response = client.post('/api/analyze', json={'verses': verses})
+                if response.status_code not in (200, 400):
+                    raise RuntimeError(f'{name}: HTTP {response.status_code}')
+
+            record('flask', name, verses, measure(post, repeat))
+
+    return results
+
+
+def compare(results: List[Dict[str, Any]], baseline_path: str, threshold: float) -> List[str]:
+    """Return a message for every benchmark slower than baseline by more than threshold"""
+    with open(baseline_path, encoding='utf-8') as handle:
+        baseline = {entry['name']: entry for entry in json.load(handle)['results']}
+
+    regressions = []
+    for entry in results:
+        reference = baseline.get(entry['name'])
+        if not reference or not reference['median_s']:
+            continue
+        ratio = entry['median_s'] / reference['median_s']
+        if ratio > 1 + threshold:
+            regressions.append(
+                f"{entry['name']}: {entry['median_s'] * 1000:.3f} ms vs "
+                f"{reference['median_s'] * 1000:.3f} ms baseline ({(ratio - 1) * 100:+.0f}%)"
+            )
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the PyArud analysis pipeline')
+    parser.add_argument('-o', '--output', help='write results as JSON to this file')
+    parser.add_argument('--sizes', default='1,10', help='synthetic poem sizes (verses), e.g. 1,10,100,500')
+    parser.add_argument('--meters', default=','.join(METER_FEET), help='meters for synthetic poems')
+    parser.add_argument('--stages', default='split,shape,cached,service,flask', help='benchmarks to run')
+    parser.add_argument('--repeat', type=int, default=3, help='samples per benchmark')
+    parser.add_argument('--baseline', help='baseline JSON to compare against')
+    parser.add_argument('--threshold', type=float, default=0.2, help='allowed slowdown vs baseline')
+    parser.add_argument('--save-baseline', help='write results to this baseline file')
+    args = parser.parse_args(argv)
+
+    sizes = [int(size) for size in args.sizes.split(',') if size]
+    meters = [meter for meter in args.meters.split(',') if meter]
+    stages = [stage for stage in args.stages.split(',') if stage]
+
+    print(f"\n{'='*72}")
+    print(f"  PyArud benchmarks (repeat={args.repeat}, sizes={sizes})")
+    print(f"{'='*72}")
+    results = run(build_inputs(sizes, meters), args.repeat, stages)
+
+    report = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'results': results
+    }
+    for path in filter(None, [args.output, args.save_baseline]):
+        with open(path, 'w', encoding='utf-8') as handle:
+            json.dump(report, handle, indent=2, ensure_ascii=False)
+        print(f"\n  Results written to {path}")
+
+    if args.baseline:
+        regressions = compare(results, args.baseline, args.threshold)
+        if regressions:
+            print(f"\n  {len(regressions)} regression(s) beyond {args.threshold * 100:.0f}%:")
+            for message in regressions:
+                print(f"    - {message}")
+            sys.exit(1)
+        print(f"\n  No regressions beyond {args.threshold * 100:.0f}% against {args.baseline}")
+
+
+if __name__ == '__main__':
+    main()
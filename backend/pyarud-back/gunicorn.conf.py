@@ -0,0 +1,76 @@
+"""
+Gunicorn Configuration
+Production server: python run.py --production, or gunicorn -c gunicorn.conf.py wsgi:app
+
+The app, pyarud and every cache/registry are loaded once in the master,
+warmed with a real request and frozen before workers are forked, so
+workers share those pages copy-on-write instead of each building its own.
+Analyses run in the worker that received the request; no other process
+is started.
+"""
+import multiprocessing
+import os
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+bind = f"{os.environ.get('HOST', '0.0.0.0')}:{os.environ.get('PORT', '5000')}"
+
+# Analysis is CPU-bound and holds the GIL, so one request per process:
+# sync workers, one per CPU. Put a buffering proxy (nginx) in front so slow
+# clients do not tie up a worker.
+workers = int(os.environ.get('GUNICORN_WORKERS', '0')) or multiprocessing.cpu_count()
+worker_class = 'sync'
+preload_app = os.environ.get('GUNICORN_PRELOAD', 'True').lower() == 'true'
+# With threads > 1 gunicorn runs gthread workers: one thread analyses
+# (ADMISSION_MAX_ACTIVE) while the others queue or shed the excess with 503
+# (ADMISSION_MAX_QUEUE) instead of leaving it in the listen backlog.
+threads = int(os.environ.get('GUNICORN_THREADS', '1'))
+
+# A long poem may legitimately scan for minutes
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', '300'))
+graceful_timeout = 30
+keepalive = 5
+
+# Recycle workers: after a number of requests, and when RSS grows past a limit
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', '1000'))
+max_requests_jitter = max_requests // 10
+max_worker_rss_mb = int(os.environ.get('GUNICORN_MAX_WORKER_RSS_MB', '1024'))  # 0 = no limit
+
+warmup_enabled = os.environ.get('GUNICORN_WARMUP', 'True').lower() == 'true'
+
+accesslog = os.environ.get('GUNICORN_ACCESS_LOG') or None
+errorlog = '-'
+
+
+def when_ready(server):
+    """Warm the preloaded app in the master, then freeze it for sharing"""
+    if not server.cfg.preload_app:
+        return
+    from app.production import freeze_heap, rss_bytes, warmup
+    from app.routes import pyarud_service
+
+    # No thread may still be building a processor when the workers are forked
+    pyarud_service.processors.wait()
+    if warmup_enabled:
+        timings = warmup(server.app.wsgi())
+        server.log.info(
+            'Warm-up done: %s', ', '.join(f'{name} {seconds * 1000:.0f} ms' for name, seconds in timings.items())
+        )
+    freeze_heap()
+    rss = rss_bytes()
+    if rss is not None:
+        server.log.info('Master RSS before fork: %.1f MB', rss / 2 ** 20)
+
+
+def post_request(worker, req, environ, resp):
+    """Restart a worker gracefully once its RSS passes max_worker_rss_mb"""
+    if not max_worker_rss_mb:
+        return
+    from app.production import rss_bytes
+
+    rss = rss_bytes()
+    if rss is not None and rss > max_worker_rss_mb * 2 ** 20:
+        worker.log.info('Worker %s RSS %.1f MB over limit, recycling', worker.pid, rss / 2 ** 20)
+        worker.alive = False
@@ -1,7 +1,17 @@
 """
 Application Entry Point
+
+    python run.py                 Flask development server
+    python run.py --production    gunicorn with gunicorn.conf.py (extra args are passed on)
 """
 import os
+import sys
+
+if __name__ == '__main__' and '--production' in sys.argv[1:]:
+    # Hand over to gunicorn before building an app in this process
+    from app.production import serve
+    serve([arg for arg in sys.argv[1:] if arg != '--production'])
+
 from app import create_app
 from app.config import config
 
@@ -25,9 +35,18 @@ if __name__ == '__main__':
 ╠════════════════════════════════════════════════╣
 ║  API Endpoints:                                ║
 ║  - POST /api/analyze                           ║
+║  - GET  /api/analyze/<digest>                  ║
+║  - POST /api/analyze/stream                    ║
+║  - POST /api/analyze/batch                     ║
+║  - POST /api/jobs                              ║
+║  - GET  /api/jobs/<id>                         ║
 ║  - GET  /api/bahr/<name>                       ║
+║  - GET  /api/bahrs                             ║
 ║  - POST /api/validate                          ║
+║  - POST /api/validate/batch                    ║
+║  - POST /api/sessions                          ║
 ║  - GET  /api/status                            ║
+║  - GET  /metrics                               ║
 ║  - GET  /health                                ║
 ╚════════════════════════════════════════════════╝
     """)
@@ -0,0 +1,33 @@
+"""
+Shared pytest fixtures
+"""
+import pytest
+from app import create_app
+from app.config import Config
+from app.services.processor_pool import ProcessorProvider
+from tests.fakes import FakeProcessor
+
+
+class TestConfig(Config):
+    """Configuration for tests: no processor is built at startup, default time budgets, no rate limit"""
+    TESTING = True
+    PROCESSOR_PRELOAD = False
+    PROCESSOR_WARMUP = False
+    BATCH_MAX_WORKERS = 1
+    RATE_LIMIT_PER_MINUTE = 0
+
+
+@pytest.fixture
+def app():
+    """Flask application used by pytest-flask's client fixture"""
+    return create_app(TestConfig)
+
+
+@pytest.fixture
+def fake_processor(app, monkeypatch):
+    """Route the API service to FakeProcessor instead of pyarud"""
+    from app.routes import pyarud_service
+    monkeypatch.setattr(
+        pyarud_service, 'processors', ProcessorProvider(factory=FakeProcessor, warmup=False)
+    )
+    return pyarud_service
@@ -0,0 +1,40 @@
+"""
+Test doubles shared by the test modules
+"""
+
+
+class FakeProcessor:
+    """Minimal stand-in for ArudhProcessor that records scanned verses"""
+
+    meter_classes = {'mutakareb': None}
+
+    def __init__(self, meter='mutakareb'):
+        self.meter = meter
+        self.scanned = []
+
+    def process_poem(self, verses, meter_name=None):
+        self.scanned.extend(verses)
+        return {
+            'meter': meter_name or self.meter,
+            'verses': [
+                {'verse_index': i, 'score': 1.0, 'sadr_text': sadr, 'ajuz_text': ajuz}
+                for i, (sadr, ajuz) in enumerate(verses)
+            ]
+        }
+
+
+class VotingProcessor(FakeProcessor):
+    """FakeProcessor whose verses each belong to the meter named in their ajuz"""
+
+    def __init__(self):
+        super().__init__()
+        self.searches = []
+
+    def process_poem(self, verses, meter_name=None):
+        if meter_name is None:
+            self.searches.extend(verses)
+        result = super().process_poem(verses, meter_name)
+        own = verses[0][1]
+        result['meter'] = meter_name or own
+        result['verses'][0]['score'] = 1.0 if result['meter'] == own else 0.2
+        return result
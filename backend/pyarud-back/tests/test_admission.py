@@ -0,0 +1,142 @@
+"""
+Unit tests for admission control
+"""
+import threading
+import time
+
+import pytest
+
+from app import metrics
+from app.admission import ConcurrencyLimiter, Overloaded, RateLimiter
+
+
+VERSES = ['صدر البيت الأول *** عجز البيت الأول', 'صدر البيت الثاني *** عجز البيت الثاني']
+
+
+class TestConcurrencyLimiter:
+    """Test cases for ConcurrencyLimiter"""
+
+    def test_queue_full(self):
+        """Test that a request beyond active slots and queue is rejected at once"""
+        limiter = ConcurrencyLimiter(max_active=1, max_queue=0)
+        with limiter.slot():
+            started = time.monotonic()
+            with pytest.raises(Overloaded) as info:
+                limiter.acquire()
+            assert time.monotonic() - started < 0.5
+        assert info.value.reason == 'queue_full'
+        assert info.value.retry_after >= 1
+        assert limiter.stats()['rejected'] == {'queue_full': 1, 'queue_timeout': 0}
+
+    def test_queue_timeout(self):
+        """Test that a queued request gives up after queue_timeout"""
+        limiter = ConcurrencyLimiter(max_active=1, max_queue=1, queue_timeout=0.1)
+        with limiter.slot():
+            with pytest.raises(Overloaded) as info:
+                limiter.acquire()
+        assert info.value.reason == 'queue_timeout'
+        assert limiter.stats()['queue_depth'] == 0
+
+    def test_queued_request_admitted_on_release(self):
+        """Test that a waiting request takes the slot released before its deadline"""
+        limiter = ConcurrencyLimiter(max_active=1, max_queue=1, queue_timeout=5)
+        started = limiter.acquire()
+        admitted = []
+        waiter = threading.Thread(target=lambda: admitted.append(limiter.acquire()))
+        waiter.start()
+        while limiter.stats()['queue_depth'] == 0:
+            time.sleep(0.01)
+        limiter.release(started)
+        waiter.join(timeout=5)
+        assert admitted
+        assert limiter.stats()['active'] == 1
+        assert limiter.stats()['admitted'] == 2
+
+    def test_unlimited(self):
+        """Test that max_active=0 admits everything"""
+        limiter = ConcurrencyLimiter()
+        for _ in range(10):
+            limiter.acquire()
+        assert limiter.stats()['active'] == 10
+
+
+class TestRateLimiter:
+    """Test cases for the per-client token bucket"""
+
+    def test_burst_then_refill(self):
+        """Test that a client gets its burst, then waits for tokens"""
+        limiter = RateLimiter(rate=10, burst=3)
+        assert [limiter.check('a') for _ in range(3)] == [0, 0, 0]
+        wait = limiter.check('a')
+        assert 0 < wait <= 0.1
+        assert limiter.check('b') == 0  # buckets are per client
+        time.sleep(0.15)
+        assert limiter.check('a') == 0
+        assert limiter.stats()['rejected'] == 1
+
+    def test_clients_bounded(self):
+        """Test that least recently seen buckets are dropped"""
+        limiter = RateLimiter(rate=1, burst=1, max_clients=2)
+        for client in ('a', 'b', 'c'):
+            limiter.check(client)
+        assert limiter.stats()['clients'] == 2
+        assert limiter.check('a') == 0  # forgotten, so full again
+
+
+class TestAdmissionApi:
+    """Test cases for 429/503 responses on the analysis routes"""
+
+    @pytest.fixture
+    def admission(self, app):
+        from app.routes import admission
+        return admission
+
+    def test_rate_limited_429(self, client, fake_processor, admission, monkeypatch):
+        """Test that a client over its rate gets 429 with Retry-After"""
+        monkeypatch.setattr(admission, 'rates', RateLimiter(rate=1 / 60, burst=1))
+        assert client.post('/api/analyze', json={'verses': VERSES}).status_code == 200
+        response = client.post('/api/analyze', json={'verses': VERSES})
+        assert response.status_code == 429
+        assert int(response.headers['Retry-After']) >= 1
+        assert metrics.REGISTRY.render().count('pyarud_admission_rejected_total{reason="rate_limited"} 1') == 1
+
+    def test_client_header(self, client, fake_processor, admission, monkeypatch):
+        """Test that behind a proxy each forwarded client has its own bucket"""
+        monkeypatch.setattr(admission, 'rates', RateLimiter(rate=1 / 60, burst=1))
+        monkeypatch.setattr(admission, 'client_header', 'X-Forwarded-For')
+        for address in ('10.0.0.1', '10.0.0.2'):
+            response = client.post(
+                '/api/analyze', json={'verses': VERSES}, headers={'X-Forwarded-For': f'1.2.3.4, {address}'}
+            )
+            assert response.status_code == 200
+
+    def test_saturated_503(self, client, fake_processor, admission, monkeypatch):
+        """Test that an uncached analysis is shed while every slot is busy"""
+        monkeypatch.setattr(admission, 'limiter', ConcurrencyLimiter(max_active=1, max_queue=0))
+        with admission.slot():
+            response = client.post('/api/analyze', json={'verses': VERSES})
+            assert response.status_code == 503
+            assert 'Retry-After' in response.headers
+            assert client.post('/api/analyze/stream', json={'verses': VERSES}).status_code == 503
+            assert client.post('/api/analyze/batch', json={'poems': [{'verses': VERSES}]}).status_code == 503
+            assert client.post('/api/sessions', json={'verses': VERSES}).status_code == 503
+            status = client.get('/api/status').json['admission']['concurrency']
+            assert status['active'] == 1
+            assert status['rejected']['queue_full'] == 4
+
+    def test_cached_result_bypasses_queue(self, client, fake_processor, admission, monkeypatch):
+        """Test that cached analyses are answered while every slot is busy"""
+        assert client.post('/api/analyze', json={'verses': VERSES}).status_code == 200
+        monkeypatch.setattr(admission, 'limiter', ConcurrencyLimiter(max_active=1, max_queue=0))
+        with admission.slot():
+            assert client.post('/api/analyze', json={'verses': VERSES}).status_code == 200
+            assert client.post('/api/analyze/stream', json={'verses': VERSES}).status_code == 200
+
+    def test_stream_releases_slot(self, client, fake_processor, admission, monkeypatch):
+        """Test that a stream holds its slot until the response is closed"""
+        monkeypatch.setattr(admission, 'limiter', ConcurrencyLimiter(max_active=1, max_queue=0))
+        response = client.post('/api/analyze/stream', json={'verses': VERSES})
+        assert response.data.decode('utf-8').splitlines()[-1].startswith('{"event": "done"')
+        response.close()
+        assert admission.limiter.stats()['active'] == 0
+        assert admission.limiter.stats()['admitted'] == 1
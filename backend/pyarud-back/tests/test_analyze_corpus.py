@@ -0,0 +1,70 @@
+"""
+Unit tests for the offline corpus analyzer
+"""
+import json
+from multiprocessing.dummy import Pool
+
+import pytest
+
+from analyze_corpus import imap_bounded, read_poems, load_checkpoint, save_checkpoint
+
+
+class TestCorpusInput:
+    """Test cases for corpus reading and checkpoints"""
+
+    def test_read_text_and_jsonl(self, tmp_path):
+        """Test that poems are read from both formats in order"""
+        text = tmp_path / 'diwan.txt'
+        text.write_text('صدر أول\nعجز أول\n\n\nصدر ثان\nعجز ثان\n', encoding='utf-8')
+        lines = tmp_path / 'more.jsonl'
+        lines.write_text(json.dumps({'id': 'p3', 'verses': ['صدر', 'عجز']}) + '\n', encoding='utf-8')
+
+        poems = list(read_poems([str(text), str(lines)]))
+        assert [poem_id for poem_id, _ in poems] == ['diwan.txt:1', 'diwan.txt:5', 'p3']
+        assert poems[1][1] == ['صدر ثان', 'عجز ثان']
+
+    def test_checkpoint_roundtrip(self, tmp_path):
+        """Test that a checkpoint is only reused for the same inputs"""
+        path = str(tmp_path / 'run.checkpoint')
+        save_checkpoint(path, {'inputs': ['a.txt'], 'completed': 7, 'output_bytes': 120})
+        assert load_checkpoint(path, ['a.txt'])['completed'] == 7
+        assert load_checkpoint(path, ['b.txt'])['completed'] == 0
+
+    def test_checkpoint_mode(self, tmp_path):
+        """Test that a --stats run does not resume from a results checkpoint"""
+        path = str(tmp_path / 'run.checkpoint')
+        save_checkpoint(path, {'inputs': ['a.txt'], 'completed': 7, 'output_bytes': 120})
+        assert load_checkpoint(path, ['a.txt'], 'stats')['completed'] == 0
+        save_checkpoint(path, load_checkpoint(path, ['a.txt'], 'stats'))
+        assert load_checkpoint(path, ['a.txt'], 'stats')['mode'] == 'stats'
+
+    def test_checkpoint_options(self, tmp_path):
+        """Test that a run with other analysis options refuses to resume"""
+        path = str(tmp_path / 'run.checkpoint')
+        options = {'detection': 'prefix', 'diacritics': 'strip'}
+        checkpoint = load_checkpoint(path, ['a.txt'], options=options)
+        save_checkpoint(path, dict(checkpoint, completed=7))
+        assert load_checkpoint(path, ['a.txt'], options=options)['completed'] == 7
+        with pytest.raises(SystemExit, match='--detection prefix --diacritics strip'):
+            load_checkpoint(path, ['a.txt'], options={'detection': 'full', 'diacritics': 'strip'})
+
+        # Checkpoints without options were made with the defaults
+        save_checkpoint(path, {'inputs': ['a.txt'], 'completed': 7, 'output_bytes': 120})
+        assert load_checkpoint(path, ['a.txt'], options={'detection': 'full'})['completed'] == 7
+        with pytest.raises(SystemExit):
+            load_checkpoint(path, ['a.txt'], options=options)
+
+    def test_imap_bounded(self):
+        """Test that results keep input order and input is read a window at a time"""
+        read = []
+
+        def items():
+            for item in range(100):
+                read.append(item)
+                yield item
+
+        with Pool(2) as pool:
+            results = imap_bounded(pool, lambda item: item * 2, items(), chunksize=3, window=2)
+            assert next(results) == 0
+            assert len(read) <= 3 * 2 + 1
+            assert list(results) == [item * 2 for item in range(1, 100)]
@@ -0,0 +1,80 @@
+"""
+Unit tests for batch analysis
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+from app.services import PyArudService, batch
+from app.services.batch import BatchAnalyzer
+from app.services.cache import ResultCache
+from app.services.processor_pool import ProcessorProvider
+from tests.fakes import FakeProcessor
+
+
+VERSES = ['يا ليلُ الصَّبُّ متى غَدُهُ', 'أقيامُ الساعةِ مَوْعِدُهُ']
+
+
+class TestBatchAnalyzer:
+    """Test cases for BatchAnalyzer"""
+
+    def setup_method(self):
+        """Setup test fixtures"""
+        self.service = PyArudService(cache=ResultCache(max_size=8))
+        self.analyzer = BatchAnalyzer(self.service, max_workers=1)
+
+    def test_cached_poems_skip_the_pool(self):
+        """Test that cached poems are answered without starting workers"""
+        cached = {'bahr': 'mutadarak', 'verses_analysis': []}
+        self.service.cache.set(self.service.cache_key(VERSES), cached)
+        results = self.analyzer.analyze([VERSES])
+        assert results == [{'success': True, 'data': cached}]
+        assert self.analyzer._executor is None
+
+    def test_invalid_poem_is_isolated(self):
+        """Test that an invalid poem only fails its own entry"""
+        cached = {'bahr': 'mutadarak', 'verses_analysis': []}
+        self.service.cache.set(self.service.cache_key(VERSES), cached)
+        results = self.analyzer.analyze([['   '], VERSES])
+        assert results[0]['success'] is False
+        assert results[1]['data'] is cached
+
+
+class TestBatchRoute:
+    """Test cases for POST /api/analyze/batch"""
+
+    def test_results_keep_ids_and_order(self, client):
+        """Test per-poem validation errors are reported in input order"""
+        response = client.post('/api/analyze/batch', json={
+            'poems': [{'id': 'first', 'verses': ['abc']}, {'id': 'second'}]
+        })
+        assert response.status_code == 200
+        results = response.json['data']['results']
+        assert [r['id'] for r in results] == ['first', 'second']
+        assert all(r['success'] is False for r in results)
+
+    def test_results_are_served_by_digest(self, client, fake_processor, monkeypatch):
+        """Test that a poem analysed in a batch can be fetched by its digest afterwards"""
+        from app.routes import batch_analyzer
+        monkeypatch.setattr(
+            batch, '_worker_service', PyArudService(processors=ProcessorProvider(factory=FakeProcessor, warmup=False))
+        )
+        executor = ThreadPoolExecutor(max_workers=1)
+        monkeypatch.setattr(batch_analyzer, '_get_executor', lambda: executor)
+        response = client.post('/api/analyze/batch', json={'poems': [{'verses': VERSES}], 'diacritics': 'strip'})
+        executor.shutdown()
+        assert response.json['data']['results'][0]['success'] is True
+
+        # Another view is shaped from the remembered verses
+        digest = fake_processor.poem_digest(VERSES, 'strip')
+        response = client.get(f'/api/analyze/{digest}?view=compact')
+        assert response.status_code == 200
+        assert response.json['data'] == client.post(
+            '/api/analyze', json={'verses': VERSES, 'diacritics': 'strip', 'view': 'compact'}
+        ).json['data']
+
+    def test_too_many_poems(self, client, app):
+        """Test the BATCH_MAX_POEMS limit"""
+        app.config['BATCH_MAX_POEMS'] = 1
+        response = client.post('/api/analyze/batch', json={
+            'poems': [{'verses': VERSES}, {'verses': VERSES}]
+        })
+        assert response.status_code == 400
@@ -0,0 +1,32 @@
+"""
+Unit tests for the benchmark suite helpers
+"""
+import json
+from benchmarks.corpus import METER_FEET, repo_poems, synthetic_poem
+from benchmarks.run_benchmarks import compare
+
+
+class TestBenchmarkSuite:
+    """Test cases for benchmark inputs and baseline comparison"""
+
+    def test_inputs(self):
+        """Test that repo poems are found and synthetic poems cover every meter"""
+        assert 'test_poem.json' in repo_poems()
+        for meter in METER_FEET:
+            assert len(synthetic_poem(meter, 3)) == 3
+
+    def test_compare_flags_regressions(self, tmp_path):
+        """Test that only slowdowns beyond the threshold are reported"""
+        baseline = tmp_path / 'baseline.json'
+        baseline.write_text(json.dumps({'results': [
+            {'name': 'service:a', 'median_s': 1.0},
+            {'name': 'service:b', 'median_s': 1.0}
+        ]}))
+        results = [
+            {'name': 'service:a', 'median_s': 1.1},
+            {'name': 'service:b', 'median_s': 1.5},
+            {'name': 'service:new', 'median_s': 9.0}
+        ]
+        regressions = compare(results, str(baseline), threshold=0.2)
+        assert len(regressions) == 1
+        assert regressions[0].startswith('service:b')
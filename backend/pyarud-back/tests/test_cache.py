@@ -0,0 +1,88 @@
+"""
+Unit tests for the analysis result cache
+"""
+from app.services.cache import ResultCache
+from app.services import PyArudService
+from tests.fakes import FakeProcessor
+
+
+class TestResultCache:
+    """Test cases for ResultCache"""
+
+    def test_get_miss_and_hit(self):
+        """Test hit/miss counters"""
+        cache = ResultCache(max_size=2)
+        assert cache.get('a') is None
+        cache.set('a', 1)
+        assert cache.get('a') == 1
+        stats = cache.stats()
+        assert stats['hits'] == 1
+        assert stats['misses'] == 1
+
+    def test_lru_eviction(self):
+        """Test that the least recently used entry is evicted"""
+        cache = ResultCache(max_size=2)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+        cache.set('c', 3)
+        assert cache.get('b') is None
+        assert cache.get('a') == 1
+        assert cache.stats()['evictions'] == 1
+
+    def test_ttl_expiry(self, monkeypatch):
+        """Test that expired entries are treated as misses"""
+        now = [100.0]
+        monkeypatch.setattr('app.services.cache.time.monotonic', lambda: now[0])
+        cache = ResultCache(max_size=2, ttl=10)
+        cache.set('a', 1)
+        now[0] += 11
+        assert cache.get('a') is None
+        assert cache.stats()['expirations'] == 1
+        assert len(cache) == 0
+
+    def test_zero_size_disables_cache(self):
+        """Test that a zero-sized cache stores nothing"""
+        cache = ResultCache(max_size=0)
+        cache.set('a', 1)
+        assert cache.get('a') is None
+
+
+class TestAnalysisCache:
+    """Test cases for PyArudService result caching"""
+
+    def test_poem_key_is_stable(self):
+        """Test that whitespace-only differences map to the same key"""
+        pairs_a = PyArudService._split_verses(['يا ليلُ الصَّبُّ متى غَدُهُ ***  أقيامُ الساعةِ مَوْعِدُهُ'])
+        pairs_b = PyArudService._split_verses(['يا ليلُ الصَّبُّ متى غَدُهُ', 'أقيامُ الساعةِ مَوْعِدُهُ'])
+        assert PyArudService._poem_key(pairs_a) == PyArudService._poem_key(pairs_b)
+
+    def test_cached_result_is_returned(self):
+        """Test that a cached analysis skips the prosody engine"""
+        service = PyArudService(cache=ResultCache(max_size=4))
+        verses = ['يا ليلُ الصَّبُّ متى غَدُهُ', 'أقيامُ الساعةِ مَوْعِدُهُ']
+        key = service._poem_key(service._split_verses(verses))
+        sentinel = {'bahr': 'mutadarak', 'verses_analysis': []}
+        service.cache.set(key, sentinel)
+        assert service.analyze_poem(verses) is sentinel
+
+
+class TestVerseMemo:
+    """Test cases for per-verse memoization"""
+
+    def setup_method(self):
+        """Setup test fixtures"""
+        self.service = PyArudService(verse_cache=ResultCache(max_size=64))
+        self.pairs = [('صدر أول', 'عجز أول'), ('صدر ثان', 'عجز ثان'), ('صدر ثالث', 'عجز ثالث')]
+
+    def test_edited_poem_rescans_changed_verse_only(self):
+        """Test that only the edited verse reaches the processor"""
+        processor = FakeProcessor()
+        self.service._scan_verses(processor, self.pairs)
+        processor.scanned.clear()
+
+        edited = self.pairs[:2] + [('صدر جديد', 'عجز جديد')]
+        meter, details = self.service._scan_verses(processor, edited)
+        assert meter == 'mutakareb'
+        assert processor.scanned == [('صدر جديد', 'عجز جديد')]
+        assert [data['verse_index'] for _, data in details] == [0, 1, 2]
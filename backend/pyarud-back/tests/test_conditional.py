@@ -0,0 +1,55 @@
+"""
+Unit tests for conditional analysis requests
+"""
+
+
+VERSES = ['يا ليلُ الصَّبُّ متى غَدُهُ', 'أقيامُ الساعةِ مَوْعِدُهُ']
+
+
+class TestConditionalAnalyze:
+    """Test cases for ETags on /api/analyze and the GET variant"""
+
+    def test_if_none_match_skips_analysis(self, client, fake_processor):
+        """Test that a repeat submission with the ETag gets 304 without scanning"""
+        first = client.post('/api/analyze', json={'verses': VERSES})
+        etag = first.headers['ETag']
+        leases = fake_processor.processors.stats()['leases']
+        
+        repeat = client.post('/api/analyze', json={'verses': VERSES}, headers={'If-None-Match': etag})
+        assert repeat.status_code == 304
+        assert repeat.data == b''
+        assert fake_processor.processors.stats()['leases'] == leases
+
+    def test_etag_ignores_whitespace_and_depends_on_view(self, client, fake_processor):
+        """Test that the ETag hashes the normalized poem and the view"""
+        a = client.post('/api/analyze', json={'verses': VERSES})
+        b = client.post('/api/analyze', json={'verses': ['  ' + VERSES[0], VERSES[1] + ' ']})
+        c = client.post('/api/analyze', json={'verses': VERSES, 'view': 'compact'})
+        assert a.headers['ETag'] == b.headers['ETag']
+        assert a.headers['ETag'] != c.headers['ETag']
+
+    def test_get_by_digest(self, client, fake_processor):
+        """Test that Content-Location serves the same analysis with cache headers"""
+        posted = client.post('/api/analyze', json={'verses': VERSES, 'view': 'compact'})
+        location = posted.headers['Content-Location']
+        assert 'view=compact' in location
+        
+        fetched = client.get(location)
+        assert fetched.status_code == 200
+        assert fetched.json == posted.json
+        assert fetched.headers['ETag'] == posted.headers['ETag']
+        assert 'public' in fetched.headers['Cache-Control']
+
+    def test_get_rebuilds_evicted_result(self, client, fake_processor):
+        """Test that a remembered poem is re-analysed after its result is evicted"""
+        posted = client.post('/api/analyze', json={'verses': VERSES})
+        fake_processor.cache.clear()
+        fetched = client.get(posted.headers['Content-Location'])
+        assert fetched.json == posted.json
+
+    def test_unknown_digest(self, client, fake_processor):
+        """Test that an unknown digest is a non-cacheable 404"""
+        response = client.get('/api/analyze/' + '0' * 64)
+        assert response.status_code == 404
+        assert 'ETag' not in response.headers
+        assert 'no-store' in response.headers['Cache-Control']
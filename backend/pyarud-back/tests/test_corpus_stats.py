@@ -0,0 +1,138 @@
+"""
+Unit tests for corpus statistics and the /api/corpus/stats endpoint
+"""
+import json
+
+import pytest
+
+from app.services import PyArudService
+from app.services.corpus_stats import CorpusStats, zihaf_names
+from app.services.processor_pool import ProcessorProvider
+from tests.fakes import FakeProcessor
+
+
+NAMES = {(0, 0, '1101'): 'qabadh', (0, 0, '11010'): 'salim'}
+
+
+def foot(index, pattern, status='ok'):
+    return {'foot_index': index, 'expected_pattern': pattern, 'status': status}
+
+
+class ScanningProcessor(FakeProcessor):
+    """FakeProcessor reporting feet: a sadr containing 'كسر' breaks its first foot"""
+
+    def process_poem(self, verses, meter_name=None):
+        result = super().process_poem(verses, meter_name)
+        for verse, (sadr, _) in zip(result['verses'], verses):
+            broken = 'كسر' in sadr
+            verse['sadr_analysis'] = [foot(0, '1101', 'broken' if broken else 'ok'), foot(1, '11010')]
+            verse['ajuz_analysis'] = [foot(0, '11010'), foot(1, '11010')]
+        return result
+
+
+class TestCorpusStats:
+    """Test cases for the CorpusStats fold"""
+
+    def fold(self):
+        stats = CorpusStats()
+        stats.add_verse('taweel', {'score': 1.0, 'sadr_analysis': [foot(0, '1101')]}, NAMES)
+        stats.add_verse('taweel', {'score': 0.5, 'sadr_analysis': [foot(0, '11010', 'broken')]}, NAMES)
+        stats.add_poem('taweel', 2)
+        stats.add_verse(None, {'score': 1.0, 'ajuz_analysis': [foot(0, '11010')]})
+        stats.add_poem(None, 1)
+        stats.add_failure()
+        return stats
+
+    def test_summary(self):
+        """Test meter shares, broken rates and named zihaf counts"""
+        summary = self.fold().summary()
+        assert (summary['poems'], summary['failed_poems'], summary['verses']) == (3, 1, 3)
+        assert summary['broken_rate'] == pytest.approx(1 / 3, abs=1e-4)
+        assert list(summary['meters']) == ['taweel', 'unknown']
+
+        taweel = summary['meters']['taweel']
+        assert (taweel['share'], taweel['broken_rate'], taweel['mean_score']) == (0.6667, 0.5, 0.75)
+        assert taweel['feet']['sadr'] == [
+            {'position': 0, 'status': {'ok': 1, 'broken': 1}, 'zihaf': {'qabadh': 1}}
+        ]
+        # Without names the raw pattern is counted
+        assert summary['meters']['unknown']['feet']['ajuz'][0]['zihaf'] == {'11010': 1}
+
+    def test_merge(self):
+        """Test that merging two folds equals folding everything into one"""
+        merged = CorpusStats()
+        merged.merge(self.fold())
+        merged.merge(self.fold())
+        summary = merged.summary()
+        assert (summary['poems'], summary['verses']) == (6, 6)
+        assert summary['meters']['taweel']['feet']['sadr'][0]['status'] == {'ok': 2, 'broken': 2}
+
+    def test_dict_roundtrip(self):
+        """Test that to_dict survives JSON and keeps merging"""
+        stats = self.fold()
+        restored = CorpusStats.from_dict(json.loads(json.dumps(stats.to_dict())))
+        assert restored.summary() == stats.summary()
+        restored.merge(stats)
+        assert restored.summary()['meters']['taweel']['feet']['sadr'][0]['zihaf'] == {'qabadh': 2}
+
+    def test_zihaf_names(self):
+        """Test that pyarud's taweel definition names its foot forms"""
+        pytest.importorskip('pyarud')
+        from pyarud.bahr import Taweel
+        names = zihaf_names(Taweel)
+        assert names[(0, 0, '11010')] == 'salim'
+        assert names[(0, 0, '1101')] == 'qabadh'
+        assert names[(1, 3, '11010')] == 'hadhf'
+        assert zihaf_names(None) == {}
+
+
+class TestPoemStats:
+    """Test cases for PyArudService.poem_stats"""
+
+    def test_counts_without_results(self):
+        """Test that a poem is folded into counts"""
+        service = PyArudService(processors=ProcessorProvider(factory=ScanningProcessor, warmup=False))
+        stats = service.poem_stats(['صدر أول', 'عجز أول', 'صدر كسر', 'عجز ثان'])
+        mutakareb = stats.summary()['meters']['mutakareb']
+        assert (mutakareb['poems'], mutakareb['verses'], mutakareb['broken_verses']) == (1, 2, 1)
+        assert mutakareb['feet']['sadr'][0]['zihaf'] == {'1101': 1}
+
+
+class TestCorpusStatsEndpoint:
+    """Test cases for /api/corpus/stats"""
+
+    @pytest.fixture
+    def scanning(self, app, monkeypatch):
+        from app.routes import pyarud_service
+        monkeypatch.setattr(
+            pyarud_service, 'processors', ProcessorProvider(factory=ScanningProcessor, warmup=False)
+        )
+
+    def test_stream(self, client, scanning):
+        """Test progress events, failed poems and the final summary"""
+        poems = [
+            {'verses': ['صدر أول', 'عجز أول']},
+            {'verses': ['صدر كسر', 'عجز ثان']},
+            {'verses': ['not arabic']},
+        ]
+        body = '\n'.join(json.dumps(poem, ensure_ascii=False) for poem in poems) + '\n\n{broken json\n'
+        response = client.post('/api/corpus/stats?progress=2', data=body.encode('utf-8'))
+        assert response.status_code == 200
+        assert response.mimetype == 'application/x-ndjson'
+
+        events = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+        response.close()
+        assert [event['event'] for event in events] == ['progress', 'progress', 'stats']
+        summary = events[-1]['data']
+        assert (summary['poems'], summary['failed_poems'], summary['broken_verses']) == (4, 2, 1)
+        assert summary['meters']['mutakareb']['verses'] == 2
+
+    def test_invalid_options(self, client, scanning):
+        """Test that unknown option values are refused"""
+        response = client.post('/api/corpus/stats?detection=guess', data=b'')
+        assert response.status_code == 400
+
+    def test_listed_in_status(self, client):
+        """Test that /api/status lists the endpoint"""
+        endpoints = client.get('/api/status').json['endpoints']
+        assert endpoints['corpus_stats'] == '/api/corpus/stats [POST]'
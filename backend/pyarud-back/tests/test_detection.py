@@ -0,0 +1,109 @@
+"""
+Unit tests for prefix meter detection
+"""
+import json
+
+from app.services import PyArudService
+from app.services.processor_pool import ProcessorProvider
+from app.services.pyarud_service import PrefixDetection
+from tests.fakes import VotingProcessor
+
+
+def poem(*meters):
+    """One verse per meter, e.g. poem('kamel', 'kamel', 'taweel')"""
+    return [f'صدر رقم {i} *** {meter}' for i, meter in enumerate(meters)]
+
+
+class TestPrefixDetection:
+    """Test cases for analyze_poem(detection='prefix')"""
+
+    def setup_method(self):
+        """Setup test fixtures"""
+        self.processor = VotingProcessor()
+        self.service = PyArudService(
+            processors=ProcessorProvider(factory=lambda: self.processor, warmup=False),
+            prefix=PrefixDetection(verses=3, confidence=0.6, fail_score=0.5)
+        )
+
+    def test_locked_meter_searches_prefix_only(self):
+        """Test that only the prefix verses run a full meter search"""
+        result = self.service.analyze_poem(poem(*['kamel'] * 10), detection='prefix')
+        assert result['bahr'] == 'kamel'
+        assert len(self.processor.searches) == 3
+        assert [v['verse_number'] for v in result['verses_analysis']] == list(range(1, 11))
+        assert result['detection'] == {
+            'mode': 'prefix', 'verses_sampled': 3, 'confidence': 1.0, 'rechecked': 0, 'fallback': None
+        }
+
+    def test_low_confidence_falls_back(self):
+        """Test that a split prefix vote runs full detection"""
+        result = self.service.analyze_poem(poem('kamel', 'taweel', 'wafer', 'taweel'), detection='prefix')
+        assert result['bahr'] == 'taweel'
+        assert result['detection']['fallback'] == 'low_confidence'
+        assert len(self.processor.searches) == 4
+
+    def test_stray_verse_is_rechecked(self):
+        """Test that a failing verse votes without overturning a clear majority"""
+        meters = ['kamel'] * 4 + ['taweel']
+        result = self.service.analyze_poem(poem(*meters), detection='prefix')
+        assert result['bahr'] == 'kamel'
+        assert result['detection']['rechecked'] == 1
+        assert result['detection']['fallback'] is None
+
+    def test_disagreement_falls_back(self):
+        """Test that later verses can overturn the prefix meter"""
+        meters = ['kamel'] * 3 + ['taweel'] * 6
+        result = self.service.analyze_poem(poem(*meters), detection='prefix')
+        assert result['bahr'] == 'taweel'
+        assert result['detection']['fallback'] == 'disagreement'
+        assert [v['verse_number'] for v in result['verses_analysis']] == list(range(1, 10))
+
+    def test_full_detection_is_unchanged(self):
+        """Test that the default mode votes with every verse and adds no summary"""
+        result = self.service.analyze_poem(poem(*['kamel'] * 5))
+        assert 'detection' not in result
+        assert len(self.processor.searches) == 5
+
+    def test_modes_are_cached_separately(self):
+        """Test that the detection mode is part of the cache key"""
+        verses = poem(*['kamel'] * 4)
+        assert self.service.cache_key(verses) != self.service.cache_key(verses, detection='prefix')
+        prefix = self.service.analyze_poem(verses, detection='prefix')
+        assert 'detection' not in self.service.analyze_poem(verses)
+        assert self.service.analyze_poem(verses, detection='prefix') is prefix
+
+
+class TestDetectionApi:
+    """Test cases for the detection option of the analysis endpoints"""
+
+    def test_prefix_option(self, client, fake_processor):
+        """Test that the summary is returned and the GET variant keeps the mode"""
+        verses = ['يا ليلُ الصَّبُّ متى غَدُهُ', 'أقيامُ الساعةِ مَوْعِدُهُ']
+        response = client.post('/api/analyze', json={'verses': verses, 'detection': 'prefix'})
+        assert response.status_code == 200
+        assert response.json['data']['detection']['mode'] == 'prefix'
+        assert 'detection=prefix' in response.headers['Content-Location']
+        assert client.get(response.headers['Content-Location']).json['data'] == response.json['data']
+
+    def test_unknown_mode(self, client, fake_processor):
+        """Test that an unknown detection mode is rejected"""
+        response = client.post('/api/analyze', json={'verses': ['صدر *** عجز'], 'detection': 'fast'})
+        assert response.status_code == 400
+        assert 'detection' in response.json['details']
+
+    def test_stream_restarts_on_disagreement(self, client, fake_processor, monkeypatch):
+        """Test that an overturned prefix meter sends a second meter event"""
+        processor = VotingProcessor()
+        monkeypatch.setattr(
+            fake_processor, 'processors', ProcessorProvider(factory=lambda: processor, warmup=False)
+        )
+        monkeypatch.setattr(fake_processor, 'prefix', PrefixDetection(verses=1))
+        response = client.post(
+            '/api/analyze/stream', json={'verses': poem('kamel', 'taweel', 'taweel'), 'detection': 'prefix'}
+        )
+        events = [json.loads(line) for line in response.data.decode('utf-8').splitlines()]
+        # A tie keeps the locked meter: the third verse overturns it
+        assert [e['event'] for e in events] == ['meter'] + ['verse'] * 3 + ['meter'] + ['verse'] * 3 + ['done']
+        assert events[4]['bahr'] == 'taweel'
+        assert events[4]['detection']['fallback'] == 'disagreement'
+        assert events[-1]['verse_count'] == 3
@@ -0,0 +1,164 @@
+"""
+Unit tests for background analysis jobs
+"""
+import subprocess
+import sys
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+
+from app.services import PyArudService, jobs
+from app.services.jobs import INTERRUPTED, JobManager, JobStore
+from app.services.processor_pool import ProcessorProvider
+from app.services.pyarud_service import PrefixDetection
+from tests.fakes import FakeProcessor
+
+
+def dead_pid():
+    """Pid of a process that has exited"""
+    process = subprocess.Popen([sys.executable, '-c', 'pass'])
+    process.wait()
+    return process.pid
+
+
+class TestJobStore:
+    """Test cases for the SQLite job store"""
+
+    def setup_method(self):
+        """Setup test fixtures"""
+        self.verses = ['صدر أول', 'عجز أول', 'صدر ثان', 'عجز ثان']
+
+    def test_job_lifecycle(self, tmp_path):
+        """Test status, progress and paged results of a job"""
+        store = JobStore(str(tmp_path / 'jobs.sqlite3'))
+        job_id = store.create(self.verses)
+        assert store.get(job_id)['status'] == 'queued'
+        assert store.get_input(job_id) == self.verses
+
+        store.update(job_id, status='running', bahr='taweel', meter_ar='الطويل', verse_count=2)
+        store.add_results(job_id, [{'verse_number': 1, 'sadr': 'صدر أول'}])
+        job = store.get(job_id)
+        assert job['verses_done'] == 1
+        assert job['progress'] == 0.5
+
+        store.add_results(job_id, [{'verse_number': 2, 'sadr': 'صدر ثان'}])
+        assert [r['verse_number'] for r in store.results(job_id, 1, 10)] == [2]
+
+    def test_purge_old_jobs(self, tmp_path):
+        """Test that jobs past retention are deleted with their results"""
+        store = JobStore(str(tmp_path / 'jobs.sqlite3'))
+        job_id = store.create(self.verses)
+        store.add_results(job_id, [{'verse_number': 1}])
+        assert store.purge(older_than=float('inf')) == 1
+        assert store.get(job_id) is None
+        assert store.results(job_id, 0, 10) == []
+
+
+class TestRunJob:
+    """Test cases for running a job in a worker"""
+
+    def test_run_job(self, tmp_path, monkeypatch):
+        """Test that a job is analysed with its options and its results stored in order"""
+        monkeypatch.setattr(
+            jobs, '_worker_service', PyArudService(processors=ProcessorProvider(factory=FakeProcessor, warmup=False))
+        )
+        monkeypatch.setattr(jobs, 'RESULT_FLUSH_SIZE', 2)
+        store = JobStore(str(tmp_path / 'jobs.sqlite3'))
+        verses = [f'صدر {word} *** عجز {word}' for word in ('أول', 'ثان', 'ثالث')]
+        options = {'view': 'full', 'fields': ['sadr', 'score'], 'detection': 'prefix', 'diacritics': 'keep'}
+        job_id = store.create(verses, options)
+
+        jobs._run_job(store.path, job_id)
+        job = store.get(job_id)
+        assert (job['status'], job['bahr'], job['verse_count'], job['progress']) == ('completed', 'mutakareb', 3, 1.0)
+        assert store.results(job_id, 0, 10) == [
+            {'sadr': f'صدر {word}', 'score': 1.0} for word in ('أول', 'ثان', 'ثالث')
+        ]
+
+    def test_failed_job(self, tmp_path, monkeypatch):
+        """Test that an analysis error fails the job"""
+        monkeypatch.setattr(
+            jobs, '_worker_service', PyArudService(processors=ProcessorProvider(factory=FakeProcessor, warmup=False))
+        )
+        store = JobStore(str(tmp_path / 'jobs.sqlite3'))
+        job_id = store.create(['صدر *** عجز'], {'detection': 'guess'})
+        jobs._run_job(store.path, job_id)
+        assert store.get(job_id)['status'] == 'failed'
+
+
+class TestJobWorkers:
+    """Test cases for the job worker pool"""
+
+    def test_workers_use_the_service_prefix_settings(self, app, monkeypatch):
+        """Test that job workers detect meters with the app's prefix settings, like /api/analyze"""
+        from app.routes import job_manager, pyarud_service
+        prefix = PrefixDetection(verses=3, confidence=0.9, fail_score=0.5)
+        monkeypatch.setattr(pyarud_service, 'prefix', prefix)
+        executor = job_manager._get_executor()
+        try:
+            assert executor._initargs == (job_manager.warmup, prefix)
+        finally:
+            job_manager.shutdown()
+
+
+class TestJobRecovery:
+    """Test cases for jobs left behind by a process that went away"""
+
+    def test_orphaned_jobs(self, tmp_path, monkeypatch):
+        """Test that orphaned queued jobs are requeued and running ones failed, once"""
+        path = str(tmp_path / 'jobs.sqlite3')
+        store = JobStore(path)
+        dead = dead_pid()
+        queued = store.create(['صدر *** عجز'], owner=dead)
+        running = store.create(['صدر *** عجز'], owner=dead)
+        store.update(running, status='running')
+        live = store.create(['صدر *** عجز'], owner=jobs.os.getpid())
+
+        manager = JobManager(db_path=path)
+        requeued = []
+        monkeypatch.setattr(manager, '_queue', lambda store, job_id: requeued.append(job_id))
+        assert manager.store.get(running)['status'] == 'failed'
+        assert manager.store.get(running)['error'] == INTERRUPTED
+        assert requeued == [queued]
+        assert store.get(live)['status'] == 'queued'
+
+        # The jobs now belong to this process, so nobody takes them over again
+        assert JobManager(db_path=path).recover(store) == {'requeued': 0, 'failed': 0}
+
+    def test_dead_worker_fails_job(self, tmp_path):
+        """Test that a job whose worker process died is failed"""
+        store = JobStore(str(tmp_path / 'jobs.sqlite3'))
+        job_id = store.create(['صدر *** عجز'])
+        future = Future()
+        future.set_exception(BrokenProcessPool('A process in the process pool was terminated abruptly'))
+        JobManager._finished(store, job_id, future)
+        assert store.get(job_id)['status'] == 'failed'
+
+
+class TestJobRoutes:
+    """Test cases for /api/jobs"""
+
+    def test_unknown_job(self, client, app, tmp_path):
+        """Test that an unknown job id returns 404"""
+        from app.routes import job_manager
+        job_manager.db_path = str(tmp_path / 'jobs.sqlite3')
+        response = client.get('/api/jobs/does-not-exist')
+        assert response.status_code == 404
+
+    def test_invalid_submission(self, client):
+        """Test that invalid verses are rejected before queueing"""
+        response = client.post('/api/jobs', json={'verses': ['abc']})
+        assert response.status_code == 400
+
+    def test_submission_keeps_options(self, client, app, tmp_path, monkeypatch):
+        """Test that the analysis options of a submission are stored with the job"""
+        from app.routes import job_manager
+        monkeypatch.setattr(job_manager, 'db_path', str(tmp_path / 'jobs.sqlite3'))
+        monkeypatch.setattr(job_manager, '_store', None)
+        monkeypatch.setattr(job_manager, '_queue', lambda store, job_id: None)
+        response = client.post('/api/jobs', json={
+            'verses': ['صدر البيت *** عجز البيت'], 'view': 'compact', 'detection': 'prefix', 'diacritics': 'strip'
+        })
+        assert response.status_code == 202
+        assert job_manager.store.get_options(response.json['data']['job_id']) == {
+            'view': 'compact', 'fields': None, 'detection': 'prefix', 'diacritics': 'strip'
+        }
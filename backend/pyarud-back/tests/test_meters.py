@@ -0,0 +1,55 @@
+"""
+Unit tests for the meter registry
+"""
+from app.services import meters
+
+
+class TestMeterRegistry:
+    """Test cases for meter lookup"""
+
+    def test_all_aliases_resolve(self):
+        """Test that every alias maps back to its own meter"""
+        assert len(meters.METERS) == 16
+        for meter in meters.METERS.values():
+            for alias in meter.aliases:
+                assert meters.lookup(alias) is meter
+
+    def test_normalized_lookup(self):
+        """Test case, accents, diacritics and the definite article are ignored"""
+        for name in ['Kāmil', 'KAMIL', 'الكامل', 'كامل', 'الْكَامِلُ']:
+            assert meters.lookup(name).key == 'kamel'
+        assert meters.lookup('nothing') is None
+
+    def test_translate(self):
+        """Test that pyarud keys translate, including the previously missing ones"""
+        assert meters.translate('mutakareb') == 'المتقارب'
+        assert meters.translate('saree') == 'السريع'
+        assert meters.translate('unknown') == 'unknown'
+
+    def test_templates(self):
+        """Test binary templates are built from the feet"""
+        assert meters.METERS['taweel'].template == '11010' + '1101010' + '11010' + '1101010'
+
+
+class TestBahrEndpoints:
+    """Test cases for /api/bahr/<name> and /api/bahrs"""
+
+    def test_bahr_info(self, client):
+        """Test that a bahr is found by its Arabic name"""
+        response = client.get('/api/bahr/المتقارب')
+        assert response.status_code == 200
+        assert response.json['data']['pattern'] == 'فعولن فعولن فعولن فعولن'
+        assert response.headers['ETag']
+        assert 'max-age=' in response.headers['Cache-Control']
+
+    def test_unknown_bahr(self, client):
+        """Test that unknown names are a 404"""
+        assert client.get('/api/bahr/nothing').status_code == 404
+
+    def test_catalog_conditional_get(self, client):
+        """Test that a matching If-None-Match is answered with 304"""
+        response = client.get('/api/bahrs')
+        assert response.json['data']['count'] == 16
+        cached = client.get('/api/bahrs', headers={'If-None-Match': response.headers['ETag']})
+        assert cached.status_code == 304
+        assert cached.data == b''
@@ -0,0 +1,77 @@
+"""
+Unit tests for the Prometheus-style metrics
+"""
+from app import metrics
+from app.metrics import Counter, Histogram, Registry
+
+
+VERSES = ['يا ليلُ الصَّبُّ متى غَدُهُ', 'أقيامُ الساعةِ مَوْعِدُهُ']
+
+
+class TestRegistry:
+    """Test cases for metric rendering"""
+
+    def setup_method(self):
+        """Set up a registry with one counter and one histogram"""
+        self.registry = Registry()
+        self.counter = self.registry.register(Counter('demo_total', 'Demo counter', ['kind']))
+        self.histogram = self.registry.register(Histogram('demo_seconds', 'Demo latency', buckets=(0.1, 1)))
+
+    def test_counter(self):
+        """Test counter samples per label set"""
+        self.counter.inc(kind='a')
+        self.counter.inc(2, kind='a')
+        text = self.registry.render()
+        assert '# TYPE demo_total counter' in text
+        assert 'demo_total{kind="a"} 3' in text
+
+    def test_histogram_buckets_are_cumulative(self):
+        """Test that bucket counts include every smaller bucket"""
+        for value in (0.05, 0.1, 0.5, 5):
+            self.histogram.observe(value)
+        text = self.registry.render()
+        assert 'demo_seconds_bucket{le="0.1"} 2' in text
+        assert 'demo_seconds_bucket{le="1.0"} 3' in text
+        assert 'demo_seconds_bucket{le="+Inf"} 4' in text
+        assert 'demo_seconds_count 4' in text
+
+    def test_collector_samples_are_grouped(self):
+        """Test that collected samples of one metric are contiguous"""
+        def collector():
+            yield 'demo_size', 'gauge', 'Size', {'cache': 'a'}, 1
+            yield 'demo_hits', 'counter', 'Hits', {'cache': 'a'}, 2
+            yield 'demo_size', 'gauge', 'Size', {'cache': 'b'}, 3
+
+        self.registry.register_collector(collector)
+        lines = self.registry.render().splitlines()
+        start = lines.index('# TYPE demo_size gauge')
+        assert lines[start + 1:start + 3] == ['demo_size{cache="a"} 1', 'demo_size{cache="b"} 3']
+
+    def test_label_escaping(self):
+        """Test that quotes in label values are escaped"""
+        self.counter.inc(kind='say "hi"')
+        assert 'demo_total{kind="say \\"hi\\""} 1' in self.registry.render()
+
+
+class TestMetricsEndpoint:
+    """Test cases for GET /metrics"""
+
+    def test_exposition(self, client, fake_processor):
+        """Test that analysis requests show up in the scrape"""
+        before = metrics.METER_TOTAL.value(meter='mutakareb')
+        client.post('/api/analyze', json={'verses': VERSES})
+        response = client.get('/metrics')
+        assert response.status_code == 200
+        assert response.content_type == metrics.CONTENT_TYPE
+        text = response.data.decode('utf-8')
+        assert 'pyarud_stage_seconds_count{stage="process_poem"}' in text
+        assert 'pyarud_request_seconds_count{route="api.analyze_poem"}' in text
+        assert 'pyarud_cache_events_total{cache="analysis",event="misses"}' in text
+        assert 'pyarud_processor_leases_total' in text
+        assert metrics.METER_TOTAL.value(meter='mutakareb') == before + 1
+
+    def test_errors_counted(self, client, fake_processor):
+        """Test that error responses are counted by route and status"""
+        before = metrics.ERRORS_TOTAL.value(route='api.analyze_poem', status=400)
+        client.post('/api/analyze', json={'verses': []})
+        assert metrics.ERRORS_TOTAL.value(route='api.analyze_poem', status=400) == before + 1
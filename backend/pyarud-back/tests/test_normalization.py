@@ -0,0 +1,103 @@
+"""
+Unit tests for Arabic text normalization
+"""
+import pytest
+
+from app.services import PyArudService
+from app.services.normalization import BULK_SEPARATOR, normalize_pairs, normalize_text
+
+
+VERSE = ('يا ليلُ الصَّبُّ متى غَدُهُ', 'أقيامُ الساعةِ مَوْعِدُهُ')
+
+
+class TestNormalizeText:
+    """Test cases for normalize_text"""
+
+    def test_clean_text_is_unchanged(self):
+        """Test that an already normal hemistich comes back as is"""
+        for text in VERSE:
+            assert normalize_text(text) == text
+
+    def test_typing_variants(self):
+        """Test that tatweel, invisible characters and odd whitespace are removed"""
+        assert normalize_text('\ufeff يا ليـــلُ\u200c الصَّبُّ  متى\u200f غَدُهُ\t') == VERSE[0]
+
+    def test_letter_variants(self):
+        """Test that presentation forms, letter variants and decomposed hamza are folded"""
+        assert normalize_text('ﻻ') == 'لا'
+        assert normalize_text('ﺑﺤﺮ') == 'بحر'
+        assert normalize_text('ٱلليل') == 'الليل'
+        assert normalize_text('کیف') == 'كيف'
+        assert normalize_text('ا\u0654مل') == 'أمل'
+        assert normalize_text('ا\u0653ه') == 'آه'
+
+    def test_hamza_forms_are_kept(self):
+        """Test that a written hamza is not folded into hamzat al-wasl"""
+        assert normalize_text('أمل إلى آه') == 'أمل إلى آه'
+
+    def test_diacritic_order(self):
+        """Test that shadda and its haraka map to one order"""
+        assert normalize_text('الص\u0651\u064eب\u0651\u064f') == normalize_text('الص\u064e\u0651ب\u064f\u0651')
+
+    def test_strip_diacritics(self):
+        """Test that strip mode removes diacritics but keeps hamza"""
+        assert normalize_text(VERSE[1], 'strip') == 'أقيام الساعة موعده'
+
+    def test_unknown_mode(self):
+        """Test that an unknown diacritics mode is refused"""
+        with pytest.raises(ValueError):
+            normalize_text(VERSE[0], 'drop')
+
+
+class TestNormalizePairs:
+    """Test cases for normalize_pairs"""
+
+    def test_matches_normalize_text(self):
+        """Test that bulk normalization equals normalizing each hemistich"""
+        pairs = [(' صدرـ  أول', 'عجز\u200b أول '), VERSE, ('', 'ﻻ')]
+        for mode in ('keep', 'strip'):
+            expected = [(normalize_text(sadr, mode), normalize_text(ajuz, mode)) for sadr, ajuz in pairs]
+            assert normalize_pairs(pairs, mode) == expected
+
+    def test_separator_in_input(self):
+        """Test that a hemistich containing the bulk separator is still normalized alone"""
+        pairs = [('صدر' + BULK_SEPARATOR, 'عجز'), VERSE]
+        assert normalize_pairs(pairs) == [('صدر' + BULK_SEPARATOR, 'عجز'), VERSE]
+
+
+class TestCanonicalKey:
+    """Test cases for keys of normalized poems"""
+
+    def setup_method(self):
+        """Setup test fixtures"""
+        self.service = PyArudService()
+
+    def test_variants_share_a_key(self):
+        """Test that differently typed copies of a poem get one digest"""
+        typed = ['يا ليـلُ الصَّبُّ متى\u200c غَدُهُ *** أقيامُ  الساعةِ مَوْعِدُهُ\u200f']
+        assert self.service.poem_digest(typed) == self.service.poem_digest(list(VERSE))
+
+    def test_diacritics_mode(self):
+        """Test that only strip mode keys vocalised and bare copies together"""
+        bare = ['يا ليل الصب متى غده', 'أقيام الساعة موعده']
+        assert self.service.poem_digest(bare) != self.service.poem_digest(list(VERSE))
+        assert self.service.poem_digest(bare, 'strip') == self.service.poem_digest(list(VERSE), 'strip')
+
+    def test_blank_after_normalization(self):
+        """Test that verses made only of tatweel are skipped"""
+        with pytest.raises(ValueError):
+            self.service.poem_digest(['ـــــــ'])
+
+    def test_strip_shares_analysis(self, client, fake_processor):
+        """Test that diacritics=strip answers a bare copy from the vocalised poem's cache entry"""
+        first = client.post('/api/analyze', json={'verses': list(VERSE), 'diacritics': 'strip'})
+        assert first.json['data']['verses_analysis'][0]['sadr'] == 'يا ليل الصب متى غده'
+        leases = fake_processor.processors.stats()['leases']
+
+        bare = ['يا ليل الصب متى غده', 'أقيام الساعة موعده']
+        second = client.post('/api/analyze', json={'verses': bare, 'diacritics': 'strip'})
+        assert second.json == first.json
+        assert second.headers['ETag'] == first.headers['ETag']
+        assert fake_processor.processors.stats()['leases'] == leases
+
+        assert client.post('/api/analyze', json={'verses': bare, 'diacritics': 'none'}).status_code == 400
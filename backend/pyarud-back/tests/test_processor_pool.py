@@ -0,0 +1,112 @@
+"""
+Unit tests for the processor pool
+"""
+import threading
+from app.services.processor_pool import ProcessorProvider
+
+
+class CountingProcessor:
+    """Processor stand-in that records warmup scans"""
+
+    meter_classes = {'taweel': None, 'kamel': None}
+
+    def __init__(self):
+        self.scans = []
+
+    def process_poem(self, verses, meter_name=None):
+        self.scans.append(meter_name)
+        return {'meter': meter_name, 'verses': []}
+
+
+class TestProcessorProvider:
+    """Test cases for ProcessorProvider"""
+
+    def test_preload_warms_every_meter(self):
+        """Test that preloading scans one verse per meter"""
+        provider = ProcessorProvider(factory=CountingProcessor)
+        provider.preload()
+        stats = provider.stats()
+        assert stats['warm'] is True
+        assert stats['instances'] == 1
+        assert stats['warmed_meters'] == 2
+
+    def test_sequential_leases_reuse_one_instance(self):
+        """Test that a processor is reused once returned"""
+        provider = ProcessorProvider(factory=CountingProcessor, warmup=False)
+        with provider.lease() as first:
+            pass
+        with provider.lease() as second:
+            pass
+        assert first is second
+        assert provider.stats()['instances'] == 1
+
+    def test_concurrent_leases_get_distinct_instances(self):
+        """Test that a leased processor is never shared between threads"""
+        provider = ProcessorProvider(factory=CountingProcessor, warmup=False)
+        leased = []
+        release = threading.Event()
+
+        def worker():
+            with provider.lease() as processor:
+                leased.append(processor)
+                release.wait(1)
+
+        threads = [threading.Thread(target=worker) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        while len(leased) < 2:
+            pass
+        release.set()
+        for thread in threads:
+            thread.join()
+        assert leased[0] is not leased[1]
+        assert provider.stats()['idle'] == 2
+
+    def test_background_preload(self):
+        """Test that a background preload returns at once and a lease waits for its processor"""
+        gate = threading.Event()
+
+        def slow_factory():
+            gate.wait(5)
+            return CountingProcessor()
+
+        provider = ProcessorProvider(factory=slow_factory, warmup=False)
+        provider.preload(background=True)
+        assert provider.stats()['preloading'] is True
+        assert provider.wait(timeout=0.05) is False
+
+        leased = []
+
+        def worker():
+            with provider.lease() as processor:
+                leased.append(processor)
+
+        thread = threading.Thread(target=worker)
+        thread.start()
+        gate.set()
+        thread.join(5)
+        assert provider.wait(timeout=5) is True
+        assert leased and provider.stats()['instances'] == 1
+        assert provider.stats()['preloading'] is False
+
+    def test_warmup_yields_to_waiting_request(self):
+        """Test that a background warm-up stops once a request waits for the processor"""
+        gate = threading.Event()
+
+        class GatedProcessor(CountingProcessor):
+            def process_poem(self, verses, meter_name=None):
+                gate.wait(5)
+                return super().process_poem(verses, meter_name)
+
+        provider = ProcessorProvider(factory=GatedProcessor)
+        provider.preload(background=True)
+        leased = []
+        thread = threading.Thread(target=lambda: leased.append(provider.lease().__enter__()))
+        thread.start()
+        while not provider._waiting:
+            pass
+        gate.set()
+        thread.join(5)
+        assert leased
+        assert provider.stats()['warmed_meters'] == 1
+        assert provider.stats()['instances'] == 1
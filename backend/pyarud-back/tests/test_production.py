@@ -0,0 +1,44 @@
+"""
+Unit tests for the production server support
+"""
+import importlib.util
+from types import SimpleNamespace
+
+from app import production
+
+
+def load_gunicorn_config():
+    """Import gunicorn.conf.py as a module"""
+    spec = importlib.util.spec_from_file_location('gunicorn_conf', production.GUNICORN_CONFIG)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class TestProduction:
+    """Test cases for warm-up and worker recycling"""
+
+    def test_warmup_fills_the_shared_cache(self, app, fake_processor):
+        """Test that the warm-up poem is analysed and left in the result cache"""
+        timings = production.warmup(app)
+        assert set(timings) == {'analyze', 'validate', 'bahrs'}
+        assert fake_processor.cache.get(fake_processor.cache_key(production.WARMUP_POEM)) is not None
+
+    def test_rss(self):
+        """Test that the current RSS is reported"""
+        assert production.rss_bytes() > 0
+
+    def test_worker_recycled_over_rss_limit(self, monkeypatch):
+        """Test that post_request stops a worker whose RSS is over the limit"""
+        conf = load_gunicorn_config()
+        assert conf.preload_app is True
+        assert conf.worker_class == 'sync'
+        worker = SimpleNamespace(alive=True, pid=1, log=SimpleNamespace(info=lambda *args: None))
+
+        monkeypatch.setattr(production, 'rss_bytes', lambda: (conf.max_worker_rss_mb - 1) * 2 ** 20)
+        conf.post_request(worker, None, None, None)
+        assert worker.alive is True
+
+        monkeypatch.setattr(production, 'rss_bytes', lambda: (conf.max_worker_rss_mb + 1) * 2 ** 20)
+        conf.post_request(worker, None, None, None)
+        assert worker.alive is False
@@ -0,0 +1,75 @@
+"""
+Unit tests for on-demand request profiling
+"""
+import os
+
+from app import profiling
+
+
+VERSES = ['صدر البيت الأول *** عجز البيت الأول', 'صدر البيت الثاني *** عجز البيت الثاني']
+
+
+class TestProfiling:
+    """Test cases for ?profile=1 on /api/analyze"""
+
+    def test_ignored_unless_enabled(self, client, fake_processor):
+        """Test that the flag does nothing while PROFILING_ENABLED is off"""
+        response = client.post('/api/analyze?profile=1', json={'verses': VERSES})
+        assert response.status_code == 200
+        assert 'profile' not in response.json
+
+    def test_profile_inline(self, app, client, fake_processor):
+        """Test that a profiled request reports stages and functions next to the result"""
+        app.config['PROFILING_ENABLED'] = True
+        # Cached first: the profiled request must still run the whole pipeline
+        expected = client.post('/api/analyze', json={'verses': VERSES}).json['data']
+
+        response = client.post('/api/analyze', json={'verses': VERSES}, headers={'X-Profile': '1'})
+        assert response.status_code == 200
+        assert response.json['data'] == expected
+        assert response.headers['Cache-Control'] == 'no-store'
+        report = response.json['profile']
+        assert {'split', 'cache_lookup', 'process_poem', 'shape', 'serialize'} <= set(report['stages'])
+        assert report['stages']['process_poem']['calls'] == 1
+        assert report['wall_seconds'] >= report['stages']['process_poem']['seconds']
+        functions = report['functions']
+        assert 0 < len(functions) <= 25
+        assert functions == sorted(functions, key=lambda row: row['tottime'], reverse=True)
+
+    def test_profile_only(self, app, client, fake_processor):
+        """Test that profile=only returns the profile without the analysis"""
+        app.config['PROFILING_ENABLED'] = True
+        app.config['PROFILING_SORT'] = 'cumtime'
+        response = client.post('/api/analyze?profile=only', json={'verses': VERSES})
+        assert response.json['success'] is True
+        assert 'data' not in response.json
+        functions = response.json['profile']['functions']
+        assert functions == sorted(functions, key=lambda row: row['cumtime'], reverse=True)
+        assert any(row['function'].startswith('app/services/pyarud_service.py') for row in functions)
+
+    def test_token_required(self, app, client, fake_processor):
+        """Test that PROFILING_TOKEN gates profiling"""
+        app.config.update(PROFILING_ENABLED=True, PROFILING_TOKEN='s3cret')
+        assert client.post('/api/analyze?profile=1', json={'verses': VERSES}).status_code == 403
+        response = client.post(
+            '/api/analyze?profile=1', json={'verses': VERSES}, headers={'X-Profile-Token': 's3cret'}
+        )
+        assert response.status_code == 200
+        assert 'profile' in response.json
+
+    def test_dump(self, app, client, fake_processor, tmp_path):
+        """Test that profiles are written in pstats format to PROFILING_DIR"""
+        import pstats
+        app.config.update(PROFILING_ENABLED=True, PROFILING_DIR=str(tmp_path))
+        response = client.post('/api/analyze?profile=1', json={'verses': VERSES})
+        name = response.json['profile']['dump']
+        assert name.startswith('analyze_poem-') and name.endswith('.prof')
+        assert os.listdir(tmp_path) == [name]
+        assert pstats.Stats(str(tmp_path / name)).total_calls > 0
+
+    def test_one_profile_at_a_time(self, app, client, fake_processor):
+        """Test that a second concurrent profile is refused"""
+        app.config['PROFILING_ENABLED'] = True
+        with profiling.profile():
+            response = client.post('/api/analyze?profile=1', json={'verses': VERSES})
+        assert response.status_code == 409
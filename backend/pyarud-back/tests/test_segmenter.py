@@ -0,0 +1,46 @@
+"""
+Unit tests for verse segmentation
+"""
+from app.services.segmenter import iter_pairs, iter_segments, split_verses
+
+
+class TestSegmenter:
+    """Test cases for splitting lines into hemistichs"""
+
+    def test_separators(self):
+        """Test every supported separator convention"""
+        for line in ['صدر *** عجز', 'صدر * عجز', 'صدر\tعجز', 'صدر / عجز',
+                     'صدر ، عجز', 'صدر ،، عجز', 'صدر … عجز', 'صدر    عجز']:
+            assert split_verses([line]) == [('صدر', 'عجز')], line
+
+    def test_priority(self):
+        """Test that *** wins over an earlier comma"""
+        assert split_verses(['صدر، ثم *** عجز']) == [('صدر، ثم', 'عجز')]
+
+    def test_priority_past_several_separators(self):
+        """Test that the highest-priority separator wins wherever it is in the line"""
+        line = 'صدر  أول … ثم، ثان / عجز'
+        assert split_verses([line]) == [('صدر  أول … ثم، ثان', 'عجز')]
+        assert next(iter_segments([line])).separator == '/'
+
+    def test_line_pairing(self):
+        """Test that unsplit lines pair up and blank lines are skipped"""
+        lines = ['  صدر أول ', '', 'عجز أول', 'صدر *** عجز', 'وحيد']
+        assert split_verses(lines) == [('صدر أول', 'عجز أول'), ('صدر', 'عجز'), ('وحيد', 'وحيد')]
+
+    def test_lone_line_before_split_line(self):
+        """Test that a lone line is not paired with a complete verse"""
+        assert split_verses(['وحيد', 'صدر *** عجز']) == [('وحيد', 'وحيد'), ('صدر', 'عجز')]
+
+    def test_spans(self):
+        """Test that segments point into the input lines"""
+        lines = ['', '  صدر *** عجز  ']
+        segment = next(iter_segments(lines))
+        assert (segment.sadr_line, segment.sadr_start, segment.sadr_end) == (1, 2, 5)
+        assert lines[1][segment.ajuz_start:segment.ajuz_end] == 'عجز'
+        assert segment.separator == '***'
+
+    def test_streaming_input(self):
+        """Test that a line iterator yields the same pairs as a list"""
+        lines = ['صدر أول', 'عجز أول', '', 'صدر *** عجز', 'وحيد']
+        assert list(iter_pairs(iter(lines))) == split_verses(lines)
@@ -0,0 +1,53 @@
+"""
+Unit tests for response format negotiation
+"""
+import pytest
+
+
+VERSES = ['يا ليلُ الصَّبُّ متى غَدُهُ', 'أقيامُ الساعةِ مَوْعِدُهُ']
+
+
+class TestContentNegotiation:
+    """Test cases for JSON, MessagePack and CBOR responses"""
+
+    def test_json_is_default(self, client):
+        """Test that browsers and clients without a preference get JSON"""
+        response = client.get('/api/status', headers={'Accept': 'text/html,*/*;q=0.8'})
+        assert response.mimetype == 'application/json'
+        assert 'Accept' in response.headers['Vary']
+
+    def test_arabic_is_not_escaped(self, client, fake_processor):
+        """Test that JSON_AS_ASCII = False keeps Arabic text as UTF-8"""
+        response = client.post('/api/analyze', json={'verses': VERSES})
+        assert 'صحيح'.encode('utf-8') in response.data
+
+    def test_msgpack(self, client, fake_processor):
+        """Test a MessagePack request and response round trip"""
+        msgpack = pytest.importorskip('msgpack')
+        response = client.post(
+            '/api/analyze',
+            data=msgpack.packb({'verses': VERSES}),
+            headers={'Content-Type': 'application/msgpack', 'Accept': 'application/msgpack'}
+        )
+        assert response.status_code == 200
+        assert response.mimetype == 'application/msgpack'
+        body = msgpack.unpackb(response.data)
+        assert body['data']['verses_analysis'][0]['sadr'] == VERSES[0]
+
+    def test_cbor(self, client, fake_processor):
+        """Test a CBOR request and response round trip"""
+        cbor2 = pytest.importorskip('cbor2')
+        response = client.post(
+            '/api/analyze',
+            data=cbor2.dumps({'verses': VERSES}),
+            headers={'Content-Type': 'application/cbor', 'Accept': 'application/cbor'}
+        )
+        assert response.mimetype == 'application/cbor'
+        assert cbor2.loads(response.data)['data']['bahr'] == 'mutakareb'
+
+    def test_binary_errors(self, client):
+        """Test that error responses follow the Accept header too"""
+        msgpack = pytest.importorskip('msgpack')
+        response = client.get('/api/missing', headers={'Accept': 'application/msgpack'})
+        assert response.status_code == 404
+        assert msgpack.unpackb(response.data) == {'error': 'Resource not found'}
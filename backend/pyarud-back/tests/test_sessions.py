@@ -0,0 +1,121 @@
+"""
+Unit tests for live-editing sessions
+"""
+from app.services import PyArudService
+from app.services.processor_pool import ProcessorProvider
+from app.services.pyarud_service import PrefixDetection
+from app.services.sessions import SessionStore
+from tests.fakes import VotingProcessor
+
+
+def lines(*meters):
+    """One verse line per meter, e.g. lines('kamel', 'taweel')"""
+    return [f'صدر رقم {i} *** {meter}' for i, meter in enumerate(meters)]
+
+
+class TestSessionStore:
+    """Test cases for SessionStore"""
+
+    def setup_method(self):
+        """Setup test fixtures"""
+        self.processor = VotingProcessor()
+        service = PyArudService(
+            processors=ProcessorProvider(factory=lambda: self.processor, warmup=False),
+            prefix=PrefixDetection(fail_score=0.5)
+        )
+        self.store = SessionStore(service, max_size=4, ttl=60)
+
+    def test_create_matches_analyze(self):
+        """Test that a new session returns the analyze_poem result"""
+        verses = lines('kamel', 'kamel', 'taweel')
+        session_id, result = self.store.create(verses)
+        assert result == self.store.service.analyze_poem(verses)
+        assert self.store.get(session_id) == result
+
+    def test_edit_rescans_changed_verse_only(self):
+        """Test that an edit keeping the meter costs one forced scan"""
+        verses = lines('kamel', 'kamel', 'kamel')
+        session_id, _ = self.store.create(verses)
+        self.processor.scanned.clear()
+        self.processor.searches.clear()
+
+        delta = self.store.update(session_id, [{'index': 1, 'verse': 'صدر معدل *** kamel'}])
+        assert delta['meter_changed'] is False
+        assert [v['verse_number'] for v in delta['verses']] == [2]
+        assert delta['verses'][0]['sadr'] == 'صدر معدل'
+        assert self.processor.scanned == [('صدر معدل', 'kamel')]
+        assert self.processor.searches == []
+
+    def test_meter_change_returns_every_verse(self):
+        """Test that failing edits vote, and a new meter rescans the poem"""
+        session_id, _ = self.store.create(lines('kamel', 'kamel', 'taweel'))
+        delta = self.store.update(session_id, [{'index': 0, 'verse': 'صدر معدل *** taweel'}])
+        assert delta['meter_changed'] is True
+        assert delta['bahr'] == 'taweel'
+        assert len(delta['verses']) == 3
+
+    def test_append_and_truncate(self):
+        """Test that lines can be appended and dropped"""
+        session_id, _ = self.store.create(lines('kamel', 'kamel'))
+        delta = self.store.update(session_id, [{'index': 2, 'verse': 'صدر جديد *** kamel'}])
+        assert delta['verse_count'] == 3
+        assert [v['verse_number'] for v in delta['verses']] == [3]
+        delta = self.store.update(session_id, [], verse_count=1)
+        assert delta['verse_count'] == 1
+        assert delta['verses'] == []
+
+    def test_expired_and_deleted(self, monkeypatch):
+        """Test that unknown, expired and deleted sessions are reported as None"""
+        now = [100.0]
+        monkeypatch.setattr('app.services.cache.time.monotonic', lambda: now[0])
+        session_id, _ = self.store.create(lines('kamel'))
+        assert self.store.update('missing', []) is None
+        now[0] += 61
+        assert self.store.get(session_id) is None
+        session_id, _ = self.store.create(lines('kamel'))
+        assert self.store.delete(session_id) is True
+        assert self.store.get(session_id) is None
+
+
+class TestSessionApi:
+    """Test cases for the /api/sessions endpoints"""
+
+    VERSES = ['يا ليلُ الصَّبُّ متى غَدُهُ', 'أقيامُ الساعةِ مَوْعِدُهُ']
+
+    def test_round_trip(self, client, fake_processor):
+        """Test create, update, get and delete"""
+        response = client.post('/api/sessions', json={'verses': self.VERSES})
+        assert response.status_code == 201
+        session_id = response.json['data']['session_id']
+        assert response.headers['Location'].endswith(f'/api/sessions/{session_id}')
+
+        response = client.patch(f'/api/sessions/{session_id}', json={
+            'changes': [{'index': 1, 'verse': 'أقيامُ الساعةِ موعدُه'}]
+        })
+        assert response.status_code == 200
+        assert response.json['data']['verses'][0]['ajuz'] == 'أقيامُ الساعةِ موعدُه'
+
+        response = client.get(f'/api/sessions/{session_id}')
+        assert response.json['data']['verses_analysis'][0]['ajuz'] == 'أقيامُ الساعةِ موعدُه'
+        assert client.delete(f'/api/sessions/{session_id}').status_code == 200
+        assert client.get(f'/api/sessions/{session_id}').status_code == 404
+
+    def test_invalid_edit(self, client, fake_processor):
+        """Test that bad indices and invalid verses are rejected"""
+        session_id = client.post('/api/sessions', json={'verses': self.VERSES}).json['data']['session_id']
+        response = client.patch(f'/api/sessions/{session_id}', json={'changes': [{'index': 5, 'verse': 'نص عربي طويل'}]})
+        assert response.status_code == 400
+        response = client.patch(f'/api/sessions/{session_id}', json={'changes': [{'index': 0, 'verse': 'abc'}]})
+        assert response.status_code == 400
+
+    def test_unknown_session(self, client, fake_processor):
+        """Test that an expired session answers 404 so clients start over"""
+        response = client.patch('/api/sessions/unknown', json={'changes': []})
+        assert response.status_code == 404
+
+    def test_long_poem(self, client, fake_processor):
+        """Test that a session may hold more verses than fit a plain request body"""
+        response = client.post('/api/sessions', json={'verses': self.VERSES * 100})
+        assert response.status_code == 201
+        # Each pair of lines is one verse
+        assert len(response.json['data']['verses_analysis']) == 100
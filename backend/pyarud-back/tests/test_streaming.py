@@ -0,0 +1,42 @@
+"""
+Unit tests for streaming analysis
+"""
+import json
+
+
+VERSES = ['يا ليلُ الصَّبُّ متى غَدُهُ', 'أقيامُ الساعةِ مَوْعِدُهُ', 'صدر ثان *** عجز ثان']
+
+
+class TestAnalyzeStream:
+    """Test cases for POST /api/analyze/stream"""
+
+    def test_ndjson_events(self, client, fake_processor):
+        """Test that the meter comes first, then one line per verse"""
+        response = client.post('/api/analyze/stream', json={'verses': VERSES})
+        assert response.mimetype == 'application/x-ndjson'
+        events = [json.loads(line) for line in response.data.decode('utf-8').splitlines()]
+        assert [e['event'] for e in events] == ['meter', 'verse', 'verse', 'done']
+        assert events[0]['bahr'] == 'mutakareb'
+        assert events[2]['data']['sadr'] == 'صدر ثان'
+
+    def test_stream_matches_analyze(self, client, fake_processor):
+        """Test that streamed verses equal the /api/analyze payload"""
+        streamed = client.post('/api/analyze/stream', json={'verses': VERSES})
+        verses = [json.loads(line)['data'] for line in streamed.data.decode('utf-8').splitlines()[1:-1]]
+        analyzed = client.post('/api/analyze', json={'verses': VERSES})
+        assert analyzed.json['data']['verses_analysis'] == verses
+
+    def test_server_sent_events(self, client, fake_processor):
+        """Test SSE framing when requested through Accept"""
+        response = client.post(
+            '/api/analyze/stream',
+            json={'verses': VERSES},
+            headers={'Accept': 'text/event-stream'}
+        )
+        assert response.mimetype == 'text/event-stream'
+        assert response.data.decode('utf-8').startswith('event: meter\ndata: ')
+
+    def test_invalid_request(self, client, fake_processor):
+        """Test that validation errors are reported before streaming"""
+        response = client.post('/api/analyze/stream', json={'verses': ['abc']})
+        assert response.status_code == 400
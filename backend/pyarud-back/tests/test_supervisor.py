@@ -0,0 +1,170 @@
+"""
+Unit tests for deadline-bounded analysis
+"""
+import time
+
+import pytest
+
+from app import metrics
+from app.services import PyArudService, batch
+from app.services.processor_pool import ProcessorProvider
+from app.services.pyarud_service import PrefixDetection
+from app.services.supervisor import AnalysisCancelled, AnalysisSupervisor, AnalysisTimeout
+from tests.fakes import FakeProcessor
+
+
+VERSES = ['صدر البيت الأول *** عجز البيت الأول', 'صدر البيت الثاني *** عجز البيت الثاني']
+SLOW_VERSES = [f'صدر بطيء {word} *** عجز بطيء {word}' for word in ('أول', 'ثان', 'ثالث', 'رابع', 'خامس')]
+SCAN_SECONDS = 0.3
+
+
+class SlowProcessor(FakeProcessor):
+    """
+    FakeProcessor taking SCAN_SECONDS for each call on a SLOW_VERSES line
+
+    Poems are analysed with two-verse prefix detection, so the first two
+    verses vote quickly and every trailing slow verse costs one slow scan.
+    """
+
+    def process_poem(self, verses, meter_name=None):
+        if verses[0][0].startswith('صدر بطيء'):
+            time.sleep(SCAN_SECONDS)
+        return super().process_poem(verses, meter_name)
+
+
+def slow_service():
+    """Service scanning with SlowProcessor"""
+    return PyArudService(
+        processors=ProcessorProvider(factory=SlowProcessor, warmup=False), prefix=PrefixDetection(verses=2)
+    )
+
+
+class TestAnalysisSupervisor:
+    """Test cases for AnalysisSupervisor"""
+
+    def setup_method(self):
+        """Setup test fixtures"""
+        self.service = slow_service()
+        self.supervisor = AnalysisSupervisor(self.service, timeout=1, stream_timeout=1, poll_interval=0)
+
+    def test_result_matches_unbounded_analysis(self):
+        """Test that a bounded result equals analyze_poem's and fills the caches it uses"""
+        result = self.supervisor.analyze(VERSES)
+        assert result == slow_service().analyze_poem(VERSES)
+        assert self.service.cache.get(self.service.cache_key(VERSES)) == result
+        assert self.service.verse_cache.get(('poem', self.service.poem_digest(VERSES))) is not None
+        assert self.supervisor.analyze(VERSES) == result
+        assert self.service.processors.stats()['leases'] == 1
+
+    def test_cache_check_is_not_a_lookup(self):
+        """Test that testing for a cached result leaves the hit and miss counters alone"""
+        self.supervisor.analyze(VERSES)
+        self.supervisor.analyze(VERSES)
+        stats = self.service.cache.stats()
+        assert (stats['hits'], stats['misses']) == (1, 1)
+
+    def test_timeout_returns_partial(self):
+        """Test that the deadline stops the analysis at the next scan and keeps the finished verses"""
+        started = time.monotonic()
+        with pytest.raises(AnalysisTimeout) as info:
+            self.supervisor.analyze(VERSES + SLOW_VERSES, detection='prefix')
+        assert time.monotonic() - started < 1 + 2 * SCAN_SECONDS
+        partial = info.value.partial
+        assert partial['complete'] is False
+        assert partial['verse_count'] == 7
+        assert 2 <= partial['verses_completed'] < 7
+        numbers = [verse['verse_number'] for verse in partial['verses_analysis']]
+        assert numbers == list(range(1, partial['verses_completed'] + 1))
+        assert self.supervisor.timeouts == 1
+
+        # The processor went back to the pool, and the scans done stay memoized
+        assert self.service.processors.stats()['idle'] == 1
+        assert self.service.verse_cache.get(('scan', 'mutakareb') + ('صدر بطيء أول', 'عجز بطيء أول'))
+
+    def test_cancelled_by_client(self):
+        """Test that a disconnected client stops the analysis"""
+        with pytest.raises(AnalysisCancelled):
+            self.supervisor.analyze(VERSES + SLOW_VERSES, detection='prefix', cancelled=lambda: True)
+        assert self.supervisor.cancellations == 1
+
+    def test_closing_a_stream_releases_the_processor(self):
+        """Test that abandoning the event stream returns the processor"""
+        events = self.supervisor.iter_analysis(VERSES + SLOW_VERSES, detection='prefix')
+        assert next(events)['event'] == 'meter'
+        assert self.service.processors.stats()['idle'] == 0
+        events.close()
+        assert self.service.processors.stats()['idle'] == 1
+
+    def test_budget_is_scoped(self):
+        """Test that the budget only applies inside the supervisor's calls"""
+        with pytest.raises(AnalysisTimeout):
+            self.supervisor.analyze(VERSES + SLOW_VERSES, detection='prefix')
+        self.service.cache.clear()
+        self.service.verse_cache.clear()
+        assert len(self.service.analyze_poem(VERSES + SLOW_VERSES)['verses_analysis']) == 7
+
+    def test_invalid_poem(self):
+        """Test that invalid input is reported as such"""
+        with pytest.raises(ValueError):
+            self.supervisor.analyze(['   '])
+
+    def test_batch_deadline(self, monkeypatch):
+        """Test that a batch poem still scanning at the batch deadline fails with the timeout"""
+        monkeypatch.setattr(batch, '_worker_service', slow_service())
+        entry = batch._analyze_in_worker(VERSES, timeout=25, deadline=time.time() - 1)
+        assert entry == {'success': False, 'error': 'Analysis exceeded its 25 s time budget'}
+        assert batch._analyze_in_worker(VERSES, timeout=25, deadline=time.time() + 25)['success'] is True
+
+
+class TestTimeoutApi:
+    """Test cases for the time budget of the API routes"""
+
+    @pytest.fixture
+    def supervisor(self, fake_processor, monkeypatch):
+        """Route the API through a 1 s budget and SlowProcessor"""
+        from app.routes import analysis_supervisor
+        monkeypatch.setattr(
+            fake_processor, 'processors', ProcessorProvider(factory=SlowProcessor, warmup=False)
+        )
+        monkeypatch.setattr(fake_processor, 'prefix', PrefixDetection(verses=2))
+        monkeypatch.setattr(analysis_supervisor, 'timeout', 1)
+        monkeypatch.setattr(analysis_supervisor, 'stream_timeout', 1)
+        return analysis_supervisor
+
+    def test_bounded_analysis_reports_stages(self, client, supervisor, fake_processor):
+        """Test that a bounded analysis runs on the warmed pool and times every stage"""
+        before = {name: metrics.STAGE_SECONDS.count(stage=name)
+                  for name in ('split', 'cache_lookup', 'process_poem', 'shape')}
+        response = client.post('/api/analyze', json={'verses': VERSES})
+        response.close()
+        assert response.status_code == 200
+        assert all(metrics.STAGE_SECONDS.count(stage=name) == count + 1 for name, count in before.items())
+        assert fake_processor.processors.stats()['leases'] == 1
+
+    def test_analyze_504(self, client, supervisor):
+        """Test that an analysis over budget answers 504 with the finished verses"""
+        response = client.post('/api/analyze', json={'verses': VERSES + SLOW_VERSES, 'detection': 'prefix'})
+        assert response.status_code == 504
+        assert response.json['success'] is False
+        assert response.json['data']['verses_completed'] >= 2
+
+    def test_stream_timeout_event(self, client, supervisor):
+        """Test that a stream over budget ends with a 504 error event"""
+        response = client.post('/api/analyze/stream', json={'verses': VERSES + SLOW_VERSES, 'detection': 'prefix'})
+        lines = response.data.decode('utf-8').splitlines()
+        response.close()
+        assert '"status": 504' in lines[-1]
+
+    def test_session_budget(self, client, supervisor, fake_processor):
+        """Test that opening or editing a session over budget answers 504 and keeps the session"""
+        response = client.post('/api/sessions', json={'verses': SLOW_VERSES})
+        assert response.status_code == 504
+
+        session = client.post('/api/sessions', json={'verses': VERSES}).json['data']
+        fake_processor.verse_cache.clear()
+        changes = [{'index': index + 2, 'verse': verse} for index, verse in enumerate(SLOW_VERSES)]
+        response = client.patch(f"/api/sessions/{session['session_id']}", json={'changes': changes})
+        assert response.status_code == 504
+        assert client.get(f"/api/sessions/{session['session_id']}").json['data'] == {
+            key: value for key, value in session.items() if key != 'session_id'
+        }
@@ -0,0 +1,90 @@
+"""
+Unit tests for per-request trace logging
+"""
+import json
+import logging
+
+import pytest
+
+from app import tracing
+
+
+VERSES = ['صدر البيت الأول *** عجز البيت الأول', 'صدر البيت الثاني *** عجز البيت الثاني']
+
+
+class ListHandler(logging.Handler):
+    """Keep the JSON records written to the trace logger"""
+
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(json.loads(record.getMessage()))
+
+
+@pytest.fixture
+def traces(monkeypatch):
+    """Records logged by the tracer, every request sampled"""
+    handler = ListHandler()
+    tracing.logger.addHandler(handler)
+    monkeypatch.setattr(tracing.tracer, 'sample_rate', 1.0)
+    yield handler.records
+    tracing.logger.removeHandler(handler)
+
+
+def post(client, url, **kwargs):
+    """POST and close the response, as a WSGI server does once it is sent"""
+    response = client.post(url, **kwargs)
+    response.close()
+    return response
+
+
+class TestTracing:
+    """Test cases for trace records of /api/analyze"""
+
+    def test_analyze_trace(self, client, fake_processor, traces):
+        """Test that a trace of a bounded analysis holds the request id, input size, meter, cache outcome and spans"""
+        response = post(client, '/api/analyze', json={'verses': VERSES}, headers={'X-Request-ID': 'req-42'})
+        assert response.headers['X-Request-ID'] == 'req-42'
+        record = traces[-1]
+        assert record['request_id'] == 'req-42'
+        assert record['route'] == 'api.analyze_poem'
+        assert record['status'] == 200
+        assert record['verse_count'] == 2
+        assert record['meter'] == 'mutakareb'
+        assert record['cache'] == 'miss'
+        names = [span['name'] for span in record['spans']]
+        assert names[:3] == ['parse', 'schema', 'validate_verse']
+        assert {'analyze', 'split', 'cache_lookup', 'process_poem', 'shape', 'serialize'} <= set(names)
+        assert record['duration_ms'] >= max(span['start_ms'] + span['duration_ms'] for span in record['spans'])
+
+    def test_cache_outcomes(self, client, fake_processor, traces):
+        """Test that repeats are traced as cache hits, and 304s as not_modified"""
+        etag = post(client, '/api/analyze', json={'verses': VERSES}).headers['ETag']
+        post(client, '/api/analyze', json={'verses': VERSES})
+        post(client, '/api/analyze', json={'verses': VERSES}, headers={'If-None-Match': etag})
+        assert [record['cache'] for record in traces] == ['miss', 'hit', 'not_modified']
+
+    def test_generated_request_id(self, client, traces):
+        """Test that a missing or malformed request id is replaced"""
+        response = client.get('/health', headers={'X-Request-ID': 'bad id <x>'})
+        assert len(response.headers['X-Request-ID']) == 32
+
+    def test_sampling(self, client, fake_processor, traces, monkeypatch):
+        """Test that unsampled fast requests are not logged and slow ones always are"""
+        monkeypatch.setattr(tracing.tracer, 'sample_rate', 0.0)
+        monkeypatch.setattr(tracing.tracer, 'slow_ms', 60000)
+        post(client, '/api/analyze', json={'verses': VERSES})
+        assert traces == []
+
+        monkeypatch.setattr(tracing.tracer, 'slow_ms', 0.001)
+        post(client, '/api/analyze', json={'verses': VERSES})
+        assert traces[-1]['slow'] is True
+
+    def test_stage_outside_request(self):
+        """Test that stages outside a request do not fail"""
+        from app.metrics import stage
+        with stage('split'), tracing.span('analyze'):
+            pass
+        tracing.annotate(meter='taweel')
@@ -0,0 +1,76 @@
+"""
+Unit tests for bulk verse validation
+"""
+from app.services import PyArudService
+from app.services.validation import diagnose_verse, first_invalid, validate_verses
+
+
+class TestDiagnoseVerse:
+    """Test cases for diagnose_verse"""
+
+    def test_matches_validate_verse(self):
+        """Test that validity follows the single-verse rules"""
+        for verse in ['يا ليلُ الصَّبُّ متى غَدُهُ', '', '   ', 'abc', 'This is English text',
+                      'عربي', 'نص عربي', None, 42]:
+            assert diagnose_verse(verse).is_valid is PyArudService.validate_verse(verse)
+
+    def test_measurements(self):
+        """Test length, Arabic ratio, diacritics coverage and separator"""
+        result = diagnose_verse('  قِفا نَبْكِ *** من ذكرى  ', index=3)
+        assert result.index == 3
+        assert result.is_valid is True
+        assert result.length == len('قِفا نَبْكِ *** من ذكرى')
+        assert result.separator == '***'
+        # 16 Arabic characters out of 19 visible ones
+        assert result.arabic_ratio == round(16 / 19, 4)
+        # 4 diacritics over 12 letters
+        assert result.diacritics_coverage == round(4 / 12, 4)
+        assert result.error is None
+
+    def test_errors(self):
+        """Test that invalid lines say why"""
+        assert diagnose_verse('').error == 'Verse is empty'
+        assert diagnose_verse('abc').error == 'Verse is shorter than 5 characters'
+        assert diagnose_verse('English text').error == 'Verse contains no Arabic text'
+        assert diagnose_verse('English text').arabic_ratio == 0.0
+        assert diagnose_verse(None).error == 'Verse must be a string'
+
+    def test_bulk(self):
+        """Test that every line is reported in order"""
+        results = validate_verses(['صدر البيت *** عجزه', 'abc', 'سطر عربي'])
+        assert [r.index for r in results] == [0, 1, 2]
+        assert [r.is_valid for r in results] == [True, False, True]
+        assert first_invalid(results).index == 1
+        assert first_invalid(results[:1]) is None
+
+
+class TestValidateApi:
+    """Test cases for POST /api/validate/batch"""
+
+    def test_batch(self, client):
+        """Test diagnostics for a pasted poem in one round-trip"""
+        response = client.post('/api/validate/batch', json={
+            'verses': ['يا ليلُ الصَّبُّ متى غَدُهُ', 'abc']
+        })
+        assert response.status_code == 200
+        data = response.json['data']
+        assert data['count'] == 2
+        assert data['valid_count'] == 1
+        assert data['all_valid'] is False
+        assert data['results'][1] == {
+            'index': 1, 'is_valid': False, 'length': 3, 'arabic_ratio': 0.0,
+            'diacritics_coverage': 0.0, 'separator': None, 'error': 'Verse is shorter than 5 characters'
+        }
+
+    def test_limits(self, client, app):
+        """Test that empty and oversized requests are rejected"""
+        assert client.post('/api/validate/batch', json={'verses': []}).status_code == 400
+        app.config['VALIDATE_MAX_VERSES'] = 2
+        response = client.post('/api/validate/batch', json={'verses': ['نص عربي'] * 3})
+        assert response.status_code == 400
+
+    def test_large_poem(self, client):
+        """Test that a long poem is not held to the single-request body limit"""
+        response = client.post('/api/validate/batch', json={'verses': ['يا ليلُ الصَّبُّ متى غَدُهُ'] * 500})
+        assert response.status_code == 200
+        assert response.json['data']['valid_count'] == 500
@@ -0,0 +1,53 @@
+"""
+Unit tests for response views
+"""
+import json
+from app.services.pyarud_service import VIEWS
+
+
+VERSES = ['يا ليلُ الصَّبُّ متى غَدُهُ', 'أقيامُ الساعةِ مَوْعِدُهُ']
+
+
+class TestResponseViews:
+    """Test cases for the view and fields request options"""
+
+    def test_default_is_full(self, client, fake_processor):
+        """Test that omitting view keeps the original payload"""
+        response = client.post('/api/analyze', json={'verses': VERSES})
+        verse = response.json['data']['verses_analysis'][0]
+        assert set(verse) == set(VIEWS['full'])
+        assert verse['details']['score'] == 1.0
+
+    def test_compact(self, client, fake_processor):
+        """Test that the compact view leaves out feet and raw details"""
+        response = client.post('/api/analyze', json={'verses': VERSES, 'view': 'compact'})
+        verse = response.json['data']['verses_analysis'][0]
+        assert set(verse) == set(VIEWS['compact'])
+        assert verse['score'] == 1.0
+
+    def test_fields_override_view(self, client, fake_processor):
+        """Test that an explicit fields list selects exactly those fields"""
+        response = client.post(
+            '/api/analyze', json={'verses': VERSES, 'view': 'compact', 'fields': ['ajuz', 'sadr']}
+        )
+        assert response.json['data']['verses_analysis'][0] == {
+            'sadr': 'يا ليلُ الصَّبُّ متى غَدُهُ',
+            'ajuz': 'أقيامُ الساعةِ مَوْعِدُهُ'
+        }
+
+    def test_views_cached_separately(self, client, fake_processor):
+        """Test that a cached full result is not served for another view"""
+        client.post('/api/analyze', json={'verses': VERSES})
+        response = client.post('/api/analyze', json={'verses': VERSES, 'view': 'standard'})
+        assert 'details' not in response.json['data']['verses_analysis'][0]
+
+    def test_stream_view(self, client, fake_processor):
+        """Test that the stream endpoint honours the view"""
+        response = client.post('/api/analyze/stream', json={'verses': VERSES, 'view': 'compact'})
+        events = [json.loads(line) for line in response.data.decode('utf-8').splitlines()]
+        assert set(events[1]['data']) == set(VIEWS['compact'])
+
+    def test_invalid_options(self, client, fake_processor):
+        """Test that unknown views and fields are rejected"""
+        assert client.post('/api/analyze', json={'verses': VERSES, 'view': 'tiny'}).status_code == 400
+        assert client.post('/api/analyze', json={'verses': VERSES, 'fields': ['meter']}).status_code == 400
@@ -0,0 +1,9 @@
+"""
+WSGI Entry Point
+Used by gunicorn (see gunicorn.conf.py); defaults to the production config
+"""
+import os
+from app import create_app
+from app.config import config
+
+app = create_app(config.get(os.environ.get('FLASK_ENV', 'production'), config['production']))
@@ -1,6 +1,6 @@
-import { useState, useEffect } from "react";
+import { useState, useEffect, useRef } from "react";
 import { PoemInput, Results, ErrorAlert, LoadingSpinner } from "./components";
-import { analyzePoem } from "./services/api";
+import { analyzePoemStream, createSession, updateSession } from "./services/api";
 
 // Example poems for quick testing
 const EXAMPLES = {
@@ -19,6 +19,9 @@ export default function App() {
   const [error, setError] = useState("");
   const [results, setResults] = useState(null);
   const [debugMode, setDebugMode] = useState(false);
+  const [streaming, setStreaming] = useState(false);
+  // Editing session: once a poem is analysed, later clicks send only the changed lines
+  const session = useRef({ id: null, verses: [] });
 
   // Load last analysis from localStorage
   useEffect(() => {
@@ -43,7 +46,6 @@ export default function App() {
     }
 
     setError("");
-    setResults(null);
     setLoading(true);
 
     try {
@@ -60,18 +62,56 @@ export default function App() {
         throw new Error("⚠️ Maximum 200 vers autorisés. Vous avez " + verses.length + " vers.");
       }
 
-      const response = await analyzePoem(verses);
+      if (session.current.id && results) {
+        try {
+          const updated = await analyzeEdits(verses);
+          setResults(updated);
+          localStorage.setItem('lastAnalysis', JSON.stringify({
+            poem: poemText,
+            results: updated
+          }));
+          return;
+        } catch (err) {
+          if (err.status !== 404) throw err;
+          // Session expired: analyse the whole poem again
+          session.current = { id: null, verses: [] };
+        }
+      }
 
-      if (response.success) {
-        setResults(response.data);
-        // Save to localStorage
-        localStorage.setItem('lastAnalysis', JSON.stringify({
-          poem: poemText,
-          results: response.data
-        }));
-      } else {
-        throw new Error(response.error || "Erreur lors de l'analyse");
+      setResults(null);
+      // Results render progressively: the meter arrives first, then each verse
+      let partial = null;
+      await analyzePoemStream(verses, (event) => {
+        if (event.event === 'meter') {
+          partial = {
+            bahr: event.bahr,
+            meter_ar: event.meter_ar,
+            expected_verses: event.verse_count,
+            verses_analysis: [],
+          };
+          setStreaming(true);
+          setLoading(false);
+          setResults(partial);
+        } else if (event.event === 'verse' && partial) {
+          partial = { ...partial, verses_analysis: [...partial.verses_analysis, event.data] };
+          setResults(partial);
+        }
+      });
+
+      if (!partial) {
+        throw new Error("Erreur lors de l'analyse");
       }
+      const { expected_verses: _expected, ...finalResults } = partial;
+      setResults(finalResults);
+      // Every verse is in the server's memo now, so opening the session is cheap
+      createSession(verses)
+        .then((response) => { session.current = { id: response.data.session_id, verses }; })
+        .catch(() => { session.current = { id: null, verses: [] }; });
+      // Save to localStorage
+      localStorage.setItem('lastAnalysis', JSON.stringify({
+        poem: poemText,
+        results: finalResults
+      }));
     } catch (err) {
       if (err.message.includes("Unable to connect")) {
         setError("🔌 Impossible de se connecter au serveur. Vérifiez que l'API est en cours d'exécution.");
@@ -80,9 +120,25 @@ export default function App() {
       }
     } finally {
       setLoading(false);
+      setStreaming(false);
     }
   };
 
+  // Send the lines that differ from the session's and merge the returned verses
+  const analyzeEdits = async (verses) => {
+    const { id, verses: previous } = session.current;
+    const changes = verses
+      .map((verse, index) => ({ index, verse }))
+      .filter(({ index, verse }) => previous[index] !== verse);
+    const { data: delta } = await updateSession(id, changes, verses.length);
+    const merged = delta.meter_changed ? [] : results.verses_analysis.slice(0, delta.verse_count);
+    delta.verses.forEach((verse) => {
+      merged[verse.verse_number - 1] = verse;
+    });
+    session.current = { id, verses };
+    return { bahr: delta.bahr, meter_ar: delta.meter_ar, verses_analysis: merged };
+  };
+
   const handleFillExample = (type) => {
     setPoemText(EXAMPLES[type]);
     setError("");
@@ -162,6 +218,7 @@ export default function App() {
             <Results
               data={results}
               inputLineCount={getVerseCount()}
+              streaming={streaming}
               debugMode={debugMode}
               onToggleDebug={() => setDebugMode(!debugMode)}
             />
@@ -6,7 +6,7 @@ import Toast from './Toast';
  * Results Component
  * Displays comprehensive analysis results with summary and verse-by-verse breakdown
  */
-export default function Results({ data, inputLineCount, debugMode, onToggleDebug }) {
+export default function Results({ data, inputLineCount, streaming = false, debugMode, onToggleDebug }) {
   const [showRawJSON, setShowRawJSON] = useState(false);
   const [toast, setToast] = useState(null);
 
@@ -251,7 +251,9 @@ export default function Results({ data, inputLineCount, debugMode, onToggleDebug
               Verse-by-Verse Analysis
             </h2>
             <span className="text-sm text-gray-500">
-              {verses.length} verse{verses.length === 1 ? '' : 's'}
+              {streaming && data.expected_verses
+                ? `${verses.length} / ${data.expected_verses} verses analyzed…`
+                : `${verses.length} verse${verses.length === 1 ? '' : 's'}`}
             </span>
           </div>
           <div className="space-y-6">
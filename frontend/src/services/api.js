@@ -5,6 +5,7 @@
 import axios from 'axios';
 
 const API_BASE_URL = import.meta.env.VITE_API_URL || 'http://localhost:5000/api';
+const REQUEST_TIMEOUT = 30000; // 30 seconds
 
 // Create axios instance with default config
 const apiClient = axios.create({
@@ -12,7 +13,7 @@ const apiClient = axios.create({
   headers: {
     'Content-Type': 'application/json',
   },
-  timeout: 30000, // 30 seconds
+  timeout: REQUEST_TIMEOUT,
 });
 
 // Response interceptor for error handling
@@ -21,7 +22,9 @@ apiClient.interceptors.response.use(
   (error) => {
     if (error.response) {
       // Server responded with error
-      throw new Error(error.response.data.error || 'Server error');
+      const serverError = new Error(error.response.data.error || 'Server error');
+      serverError.status = error.response.status;
+      throw serverError;
     } else if (error.request) {
       // Request made but no response
       throw new Error('Unable to connect to server. Please check if the API is running.');
@@ -42,6 +45,112 @@ export const analyzePoem = async (verses) => {
   return response.data;
 };
 
+/**
+ * Analyze a poem, receiving results verse by verse as they are scanned
+ *
+ * The request is aborted when the server sends nothing for REQUEST_TIMEOUT:
+ * a long poem may stream for minutes, but never waits that long between verses.
+ * @param {string[]} verses - Array of verse strings
+ * @param {Function} onEvent - Called with each event: meter, verse, done or error
+ * @param {AbortSignal} [signal] - Optional signal to cancel the request
+ * @returns {Promise<void>} Resolves when the stream ends
+ */
+export const analyzePoemStream = async (verses, onEvent, signal) => {
+  const controller = new AbortController();
+  const cancel = () => controller.abort();
+  if (signal?.aborted) cancel();
+  signal?.addEventListener('abort', cancel);
+  let timedOut = false;
+  let timer;
+  const restartTimer = () => {
+    clearTimeout(timer);
+    timer = setTimeout(() => {
+      timedOut = true;
+      controller.abort();
+    }, REQUEST_TIMEOUT);
+  };
+
+  try {
+    restartTimer();
+    let response;
+    try {
+      response = await fetch(`${API_BASE_URL}/analyze/stream`, {
+        method: 'POST',
+        headers: {
+          'Content-Type': 'application/json',
+          Accept: 'application/x-ndjson',
+        },
+        body: JSON.stringify({ verses }),
+        signal: controller.signal,
+      });
+    } catch (error) {
+      if (error.name === 'AbortError') throw error;
+      throw new Error('Unable to connect to server. Please check if the API is running.');
+    }
+
+    if (!response.ok) {
+      const data = await response.json().catch(() => ({}));
+      throw new Error(data.error || 'Server error');
+    }
+
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder('utf-8');
+    let buffer = '';
+
+    for (;;) {
+      const { value, done } = await reader.read();
+      if (done) break;
+      restartTimer();
+      buffer += decoder.decode(value, { stream: true });
+
+      let newline;
+      while ((newline = buffer.indexOf('\n')) >= 0) {
+        const line = buffer.slice(0, newline).trim();
+        buffer = buffer.slice(newline + 1);
+        if (!line) continue;
+        const event = JSON.parse(line);
+        if (event.event === 'error') {
+          throw new Error(event.error || 'Analysis failed');
+        }
+        onEvent(event);
+      }
+    }
+  } catch (error) {
+    if (timedOut) {
+      throw new Error('The server took too long to respond. Please try again.');
+    }
+    throw error;
+  } finally {
+    clearTimeout(timer);
+    signal?.removeEventListener('abort', cancel);
+  }
+};
+
+/**
+ * Open an editing session on a poem
+ * @param {string[]} verses - Array of verse strings
+ * @returns {Promise<Object>} Analysis result with its session_id
+ */
+export const createSession = async (verses) => {
+  const response = await apiClient.post('/sessions', { verses });
+  return response.data;
+};
+
+/**
+ * Send the edited lines of a session and receive only the verses that changed
+ * @param {string} sessionId - Id returned by createSession
+ * @param {{index: number, verse: string}[]} changes - Changed or appended lines
+ * @param {number} verseCount - New line count
+ * @returns {Promise<Object>} Delta: bahr, meter_changed, verse_count and changed verses
+ */
+export const updateSession = async (sessionId, changes, verseCount) => {
+  const response = await apiClient.patch(`/sessions/${sessionId}`, {
+    changes,
+    verse_count: verseCount,
+  });
+  return response.data;
+};
+
 /**
  * Get information about a specific bahr (meter)
  * @param {string} bahrName - Name of the bahr
@@ -62,6 +171,16 @@ export const validateVerse = async (verse) => {
   return response.data;
 };
 
+/**
+ * Validate every line of a poem in one request
+ * @param {string[]} verses - Array of verse strings
+ * @returns {Promise<Object>} Per-line validity and diagnostics
+ */
+export const validateVerses = async (verses) => {
+  const response = await apiClient.post('/validate/batch', { verses });
+  return response.data;
+};
+
 /**
  * Get API status
  * @returns {Promise<Object>} API status
@@ -73,7 +192,11 @@ export const getApiStatus = async () => {
 
 export default {
   analyzePoem,
+  analyzePoemStream,
+  createSession,
+  updateSession,
   getBahrInfo,
   validateVerse,
+  validateVerses,
   getApiStatus,
 };